@@ -0,0 +1,196 @@
+import os
+import shutil
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable
+
+# pyarrow est importé dans les fonctions : il ne sert qu'aux exports analytiques
+
+# Colonnes typées de l'export (ordre du schéma) ; content est stocké à part, compressé en zstd
+SCORE_COLUMNS = ["impact_score", "urgency_score", "complexity_score", "risk_score",
+                 "reliability_score", "global_score"]
+ANALYTICS_COLUMNS = ["id", "date", "month", "model", "focus_area", "urgency_level", "company_size",
+                     *SCORE_COLUMNS, "priority_level", "content"]
+
+# Compression par colonne : zstd fort pour le texte, snappy (rapide à lire) pour le reste
+CONTENT_COMPRESSION = "zstd"
+CONTENT_COMPRESSION_LEVEL = 9
+DEFAULT_COMPRESSION = "snappy"
+
+# Nombre de lignes accumulées avant d'écrire un lot (mémoire bornée)
+BATCH_ROWS = 5000
+
+
+def analytics_schema(include_month: bool = True):
+    """
+    Schéma Arrow de l'export (catégories en dictionnaire, scores en float32).
+    Dans les fichiers, la colonne month est absente : elle est portée par le chemin de partition.
+    """
+    import pyarrow as pa
+
+    category = pa.dictionary(pa.int32(), pa.string())
+    month = [("month", pa.string())] if include_month else []
+    return pa.schema([
+        ("id", pa.string()),
+        ("date", pa.timestamp("us")),
+        *month,
+        ("model", category),
+        ("focus_area", category),
+        ("urgency_level", category),
+        ("company_size", category),
+        *[(column, pa.float32()) for column in SCORE_COLUMNS],
+        ("priority_level", category),
+        ("content", pa.large_string()),
+    ])
+
+
+def analytics_row(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Aplatit une analyse formatée (métadonnées + métriques) en ligne de l'export"""
+    metadata = analysis.get("metadata") or {}
+    metrics = analysis.get("metrics") or {}
+    date = datetime.fromisoformat(analysis["date"])
+    row = {
+        "id": analysis["id"],
+        "date": date,
+        "month": date.strftime("%Y-%m"),
+        "model": metrics.get("ai_model") or metadata.get("ai_model"),
+        "focus_area": metadata.get("focus_area"),
+        "urgency_level": metadata.get("urgency_level"),
+        "company_size": metadata.get("company_size"),
+        "priority_level": metrics.get("priority_level"),
+        "content": analysis["content"],
+    }
+    for column in SCORE_COLUMNS:
+        row[column] = metrics.get(column)
+    return row
+
+
+def write_analytics(analyses: Iterable[Dict[str, Any]], output_dir: str, format: str = "parquet") -> int:
+    """
+    Écrit les analyses dans output_dir, partitionnées par mois (month=AAAA-MM/part-0.<ext>),
+    au format "parquet" ou "arrow" (IPC). Les lignes sont écrites par lots de BATCH_ROWS ;
+    le répertoire est remplacé en une fois à la fin. Retourne le nombre d'analyses écrites.
+    """
+    format = format.lower()
+    if format not in ("parquet", "arrow"):
+        raise ValueError(f"Format analytique non supporté: {format}")
+
+    schema = analytics_schema(include_month=False)
+    tmp_dir = f"{output_dir.rstrip(os.sep)}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    writers = {}
+    # Dictionnaires cumulés par partition et par colonne catégorielle (format arrow)
+    dictionaries: Dict[str, Dict[str, Dict[str, int]]] = {}
+    pending: Dict[str, List[Dict[str, Any]]] = {}
+    total = 0
+    try:
+        try:
+            for analysis in analyses:
+                row = analytics_row(analysis)
+                pending.setdefault(row["month"], []).append(row)
+                total += 1
+                if total % BATCH_ROWS == 0:
+                    _flush(pending, writers, dictionaries, schema, tmp_dir, format)
+            _flush(pending, writers, dictionaries, schema, tmp_dir, format)
+            if total == 0:
+                # Jeu vide mais lisible : un fichier sans ligne, hors partition, porte le schéma
+                _writer(writers, None, schema, tmp_dir, format).write_table(schema.empty_table())
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.replace(tmp_dir, output_dir)
+    finally:
+        # Après un échec, l'export précédent reste en place et le répertoire temporaire disparaît
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return total
+
+
+def read_analytics(output_dir: str, columns: Optional[List[str]] = None,
+                   months: Optional[List[str]] = None, format: str = "parquet"):
+    """
+    Lit l'export analytique sous forme de table Arrow. Seules les colonnes demandées
+    sont décodées (le contenu n'est lu que s'il est demandé) et seules les partitions
+    des mois demandés (« AAAA-MM ») sont ouvertes.
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(output_dir, format="ipc" if format.lower() == "arrow" else "parquet",
+                         partitioning="hive", schema=analytics_schema())
+    expression = ds.field("month").isin(months) if months else None
+    return dataset.to_table(columns=columns, filter=expression)
+
+
+def scores_by(output_dir: str, key: str = "month", format: str = "parquet"):
+    """Moyenne des scores par critère groupée par key (mois, modèle, domaine...) ; le contenu n'est pas lu"""
+    table = read_analytics(output_dir, columns=[key, *SCORE_COLUMNS], format=format)
+    if key != "month":
+        # group_by ne sait pas regrouper sur une colonne dictionnaire
+        table = table.set_column(0, key, table.column(key).cast("string"))
+    return table.group_by(key).aggregate([(column, "mean") for column in SCORE_COLUMNS]).sort_by(key)
+
+
+def _flush(pending: Dict[str, List[Dict[str, Any]]], writers: Dict[str, Any],
+           dictionaries: Dict[str, Dict[str, Dict[str, int]]], schema, tmp_dir: str, format: str):
+    import pyarrow as pa
+
+    for month, rows in pending.items():
+        if rows:
+            # from_pylist ignore la clé month, absente du schéma des fichiers
+            table = pa.Table.from_pylist(rows, schema=schema)
+            if format == "arrow":
+                table = _extend_dictionaries(table, rows, dictionaries.setdefault(month, {}))
+            _writer(writers, month, schema, tmp_dir, format).write_table(table)
+    pending.clear()
+
+
+def _extend_dictionaries(table, rows: List[Dict[str, Any]], dictionaries: Dict[str, Dict[str, int]]):
+    """
+    Réencode les colonnes catégorielles d'un lot sur le dictionnaire cumulé de la partition.
+    Un fichier IPC n'accepte qu'un dictionnaire par colonne : chaque lot n'en écrit que
+    les nouvelles valeurs (delta), jamais un dictionnaire de remplacement.
+    """
+    import pyarrow as pa
+
+    for i, field in enumerate(table.schema):
+        if not pa.types.is_dictionary(field.type):
+            continue
+        dictionary = dictionaries.setdefault(field.name, {})
+        indices = [None if row[field.name] is None else dictionary.setdefault(row[field.name], len(dictionary))
+                   for row in rows]
+        column = pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int32()),
+                                                pa.array(list(dictionary), type=pa.string()))
+        table = table.set_column(i, field, column)
+    return table
+
+
+def _writer(writers: Dict[Optional[str], Any], month: Optional[str], schema, tmp_dir: str, format: str):
+    """Writer ouvert (un par partition) ; la colonne month est portée par le chemin"""
+    if month in writers:
+        return writers[month]
+
+    partition_dir = tmp_dir if month is None else os.path.join(tmp_dir, f"month={month}")
+    os.makedirs(partition_dir, exist_ok=True)
+    if format == "parquet":
+        import pyarrow.parquet as pq
+
+        compression = {name: DEFAULT_COMPRESSION for name in schema.names}
+        compression["content"] = CONTENT_COMPRESSION
+        writer = pq.ParquetWriter(
+            os.path.join(partition_dir, "part-0.parquet"), schema,
+            compression=compression,
+            compression_level={"content": CONTENT_COMPRESSION_LEVEL},
+            # Pas de dictionnaire pour les colonnes quasi uniques
+            use_dictionary=[name for name in schema.names if name not in ("id", "date", "content")]
+        )
+    else:
+        import pyarrow as pa
+
+        # L'IPC compresse tous les tampons avec le même codec
+        writer = pa.ipc.new_file(os.path.join(partition_dir, "part-0.arrow"), schema,
+                                 options=pa.ipc.IpcWriteOptions(compression="zstd",
+                                                                emit_dictionary_deltas=True))
+    writers[month] = writer
+    return writer
@@ -1,16 +1,14 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import json
-from datetime import datetime
-import numpy as np
 from streamlit_option_menu import option_menu
-import altair as alt
-from strategic_analyzer import StrategicAnalyzer
+from strategic_analyzer import StrategicAnalyzer, load_environment
+from provider_client import ProviderError
 from data_manager import DataManager
+import hashlib
 import os
+import time
+
+# pandas, plotly et numpy sont importés dans les méthodes qui tracent des graphiques :
+# un onglet qui ne les affiche pas ne paie pas leur import au démarrage à froid.
 
 # Configuration de la page
 st.set_page_config(
@@ -44,10 +42,67 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource(show_spinner=False)
+def get_data_manager() -> DataManager:
+    """DataManager unique du processus, partagé par toutes les sessions"""
+    load_environment()
+    return DataManager()
+
+@st.cache_resource(show_spinner=False)
+def get_analyzer() -> StrategicAnalyzer:
+    """Analyseur unique du processus : clients HTTP et pools de connexions réutilisés"""
+    return StrategicAnalyzer(data_manager=get_data_manager())
+
+# Les données dérivées sont indexées par la version du corpus : une écriture,
+# même depuis un autre processus, produit une nouvelle entrée de cache.
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_dashboard_data(_data_manager: DataManager, corpus_version) -> dict:
+    return _data_manager.get_dashboard_data()
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_comparison_options(_data_manager: DataManager, corpus_version) -> list:
+    """Libellés et IDs des analyses comparables (sans le contenu, coûteux à copier)"""
+    return [(f"{a['title']} ({a['date']})", a["id"]) for a in _data_manager.get_all_analyses()]
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_score_tensor(_data_manager: DataManager, corpus_version) -> dict:
+    """Tenseur articles × modèles × critères du corpus et article de chaque analyse"""
+    from consensus import build_score_tensor, article_key
+
+    analyses = _data_manager.get_all_analyses()
+    return {"tensor": build_score_tensor(analyses),
+            "article_of": {a["id"]: article_key(a) for a in analyses}}
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_text_similarity(_data_manager: DataManager, corpus_version, analysis_ids: tuple) -> dict:
+    """Cosinus TF-IDF entre les analyses sélectionnées et accord textuel par paire de modèles"""
+    import numpy as np
+    from consensus import article_key, model_key
+    from text_similarity import model_agreement
+
+    result = _data_manager.text_similarity_matrix(list(analysis_ids))
+    if not result["ids"] or np.isnan(result["matrix"]).all():
+        return {"labels": [], "matrix": None, "agreement": []}
+    analyses = {a["id"]: a for a in _data_manager.get_all_analyses()}
+    selected = [analyses[analysis_id] for analysis_id in result["ids"]]
+    models = [model_key(a) for a in selected]
+    return {
+        "labels": [f"{model} · {a['title'][:40]} ({a['id'][-4:]})" for model, a in zip(models, selected)],
+        "matrix": result["matrix"],
+        "agreement": model_agreement(result["matrix"], models, [article_key(a) for a in selected])
+    }
+
+def invalidate_analysis_caches():
+    """À appeler après une sauvegarde ou une suppression d'analyse"""
+    load_dashboard_data.clear()
+    load_comparison_options.clear()
+    load_score_tensor.clear()
+    load_text_similarity.clear()
+
 class StrategicDashboard:
     def __init__(self):
-        self.data_manager = DataManager()
-        self.analyzer = StrategicAnalyzer()
+        self.data_manager = get_data_manager()
+        self.analyzer = get_analyzer()
         
     def main(self):
         # Header principal
@@ -86,42 +141,45 @@ class StrategicDashboard:
     def show_dashboard(self):
         st.markdown("## 📊 Tableau de Bord Exécutif")
         
+        # Agrégats maintenus à chaque sauvegarde : coût constant quelle que soit la taille du corpus
+        dashboard_data = load_dashboard_data(self.data_manager, self.data_manager.corpus_version())
+        
         # Métriques clés
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.markdown("""
+            st.markdown(f"""
             <div class="metric-card">
-                <h3>Analyses Récentes</h3>
-                <h2>24</h2>
-                <p>+12% vs mois dernier</p>
+                <h3>Analyses Sauvegardées</h3>
+                <h2>{dashboard_data['total_analyses']}</h2>
+                <p>Total du corpus</p>
             </div>
             """, unsafe_allow_html=True)
         
         with col2:
-            st.markdown("""
+            st.markdown(f"""
             <div class="metric-card">
                 <h3>Score Moyen</h3>
-                <h2>7.2/10</h2>
-                <p>+0.8 vs mois dernier</p>
+                <h2>{dashboard_data['average_score']}/10</h2>
+                <p>Analyses avec scoring</p>
             </div>
             """, unsafe_allow_html=True)
         
         with col3:
-            st.markdown("""
+            st.markdown(f"""
             <div class="metric-card">
                 <h3>Priorités Critiques</h3>
-                <h2>8</h2>
-                <p>3 nouvelles cette semaine</p>
+                <h2>{dashboard_data['critical_priorities']}</h2>
+                <p>Niveau CRITIQUE</p>
             </div>
             """, unsafe_allow_html=True)
         
         with col4:
-            st.markdown("""
+            st.markdown(f"""
             <div class="metric-card">
                 <h3>ROI Estimé</h3>
-                <h2>€2.4M</h2>
-                <p>+15% vs projection</p>
+                <h2>€{dashboard_data['estimated_roi'] / 1_000_000:.1f}M</h2>
+                <p>€100k par point de score</p>
             </div>
             """, unsafe_allow_html=True)
         
@@ -130,15 +188,15 @@ class StrategicDashboard:
         
         with col1:
             st.markdown("### 📈 Évolution des Scores Stratégiques")
-            self.plot_score_evolution()
+            self.plot_score_evolution(dashboard_data["recent_scores"])
         
         with col2:
             st.markdown("### 🎯 Répartition par Priorité")
-            self.plot_priority_distribution()
+            self.plot_priority_distribution(dashboard_data["priority_distribution"])
         
         # Tableau des analyses récentes
         st.markdown("### 📋 Analyses Récentes")
-        self.show_recent_analyses()
+        self.show_recent_analyses(dashboard_data["recent_analyses"])
         
         # Signaux d'alerte
         st.markdown("### ⚠️ Signaux d'Alerte")
@@ -184,6 +242,7 @@ class StrategicDashboard:
                 "Modèle d'Analyse",
                 ["Claude-3-Sonnet", "GPT-4", "Gemini-Pro", "Custom Model"]
             )
+            self.show_provider_status(ai_model)
             
             # Critères de scoring
             st.markdown("**Critères de Scoring**")
@@ -193,18 +252,65 @@ class StrategicDashboard:
             risk_weight = st.slider("Risque Concurrentiel", 0.1, 1.0, 0.15, 0.1)
             reliability_weight = st.slider("Fiabilité Source", 0.1, 1.0, 0.1, 0.1)
             
+            streaming = st.checkbox("Affichage progressif", value=True)
+            reuse_duplicates = st.checkbox("Réutiliser l'analyse d'un article quasi identique", value=False,
+                                           help="Reprises d'une même dépêche (agences, agrégateurs) déjà "
+                                                "analysées par ce modèle avec les mêmes paramètres et "
+                                                "pondérations : aucun appel au fournisseur")
+            
             # Bouton d'analyse
             if st.button("🚀 Lancer l'Analyse", type="primary"):
                 if content:
-                    with st.spinner("Analyse en cours..."):
-                        analysis_result = self.analyzer.analyze_content(
-                            content, focus_area, urgency_level, company_size,
-                            ai_model, [impact_weight, urgency_weight, complexity_weight, 
-                                     risk_weight, reliability_weight]
-                        )
-                        self.display_analysis_result(analysis_result)
+                    weights = [impact_weight, urgency_weight, complexity_weight,
+                               risk_weight, reliability_weight]
+                    original = (self.analyzer.find_reusable_analysis(content, focus_area, urgency_level,
+                                                                     company_size, ai_model, weights)
+                                if reuse_duplicates else None)
+                    if original is not None:
+                        st.session_state["analysis_result"] = original["content"]
+                        st.session_state["analysis_metadata"] = dict(original["metadata"], reused_from=original["id"])
+                        st.info(f"♻️ Article quasi identique déjà analysé par {ai_model} le {original['date'][:10]} "
+                                f"(similarité {original['similarity']:.0%}) : analyse réutilisée.")
+                    else:
+                        self.run_analysis(content, focus_area, urgency_level, company_size, ai_model,
+                                          weights, streaming)
                 else:
                     st.error("Veuillez entrer du contenu à analyser.")
+            
+            # Le résultat est conservé entre les reruns pour que la sauvegarde fonctionne
+            if st.session_state.get("analysis_result"):
+                self.display_analysis_result(st.session_state["analysis_result"],
+                                             st.session_state.get("analysis_metadata"))
+    
+    def run_analysis(self, content, focus_area, urgency_level, company_size, ai_model, weights, streaming):
+        """Analyse via le fournisseur ; les métadonnées lient l'article à ses éventuelles reprises"""
+        args = (content, focus_area, urgency_level, company_size, ai_model, weights)
+        try:
+            if streaming:
+                analysis_result = self.display_analysis_stream(
+                    self.analyzer.analyze_content_stream(*args, raise_errors=True)
+                )
+            else:
+                with st.spinner("Analyse en cours..."):
+                    analysis_result = self.analyzer.analyze_content(*args, raise_errors=True)
+        except ProviderError as e:
+            # Un échec n'est ni affiché comme une analyse ni proposé à la sauvegarde
+            st.session_state.pop("analysis_result", None)
+            st.error(f"❌ Analyse impossible ({e})")
+            return
+        st.session_state["analysis_result"] = analysis_result
+        metadata = {
+            # Regroupe les analyses d'un même contenu par différents modèles
+            "article_id": hashlib.sha256(content.encode("utf-8")).hexdigest()[:12],
+            "ai_model": ai_model,
+            "focus_area": focus_area,
+            "urgency_level": urgency_level,
+            "company_size": company_size,
+            "weights": list(weights)
+        }
+        # Une reprise de la même dépêche compte comme le même article pour la comparaison
+        metadata.update(self.data_manager.near_duplicate_metadata(content))
+        st.session_state["analysis_metadata"] = metadata
     
     def show_comparison(self):
         st.markdown("## 📈 Comparaison Multi-IA")
@@ -214,10 +320,10 @@ class StrategicDashboard:
         
         with col1:
             st.markdown("### 📋 Sélection des Analyses")
-            analyses = self.data_manager.get_all_analyses()
+            options = load_comparison_options(self.data_manager, self.data_manager.corpus_version())
             
-            if analyses:
-                analysis_options = [f"{a['title']} ({a['date']})" for a in analyses]
+            if options:
+                analysis_options = [label for label, _ in options]
                 selected_analyses = st.multiselect(
                     "Sélectionnez les analyses à comparer",
                     analysis_options,
@@ -226,7 +332,8 @@ class StrategicDashboard:
                 
                 if st.button("🔄 Comparer", type="primary"):
                     if len(selected_analyses) >= 2:
-                        self.show_comparison_results(selected_analyses)
+                        ids_by_label = dict(options)
+                        self.show_comparison_results([ids_by_label[label] for label in selected_analyses])
                     else:
                         st.warning("Sélectionnez au moins 2 analyses pour la comparaison.")
             else:
@@ -262,6 +369,10 @@ class StrategicDashboard:
             openai_key = st.text_input("OpenAI API Key", type="password")
             anthropic_key = st.text_input("Anthropic API Key", type="password")
             
+            st.markdown("**Santé des Fournisseurs**")
+            for model in self.analyzer.provider_health():
+                self.show_provider_status(model)
+            
             st.markdown("**Export**")
             export_format = st.selectbox(
                 "Format d'Export",
@@ -281,40 +392,100 @@ class StrategicDashboard:
             }
             self.data_manager.save_config(config)
             st.success("Configuration sauvegardée !")
+        
+        self.show_diagnostics()
+    
+    def show_diagnostics(self):
+        """Durées, tokens et hits de cache par étape du pipeline (instrumentation optionnelle)"""
+        import pandas as pd
+        
+        st.markdown("### 🩺 Diagnostics")
+        tracer = self.analyzer.tracer
+        tracer.enabled = st.toggle("Instrumenter les analyses", value=tracer.enabled,
+                                   help="Mesure la construction du prompt, les appels fournisseurs, "
+                                        "l'extraction des métriques et la sauvegarde")
+        
+        summary = tracer.stage_summary()
+        if not summary:
+            st.info("Aucune mesure pour le moment : activez l'instrumentation puis lancez une analyse.")
+            return
+        
+        st.dataframe(pd.DataFrame(summary), use_container_width=True)
+        with st.expander("Dernières étapes mesurées"):
+            st.dataframe(pd.DataFrame(list(reversed(tracer.recent_spans(50)))), use_container_width=True)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.download_button("📥 Métriques Prometheus", tracer.to_prometheus(),
+                               file_name="analysis_metrics.prom", mime="text/plain")
+        with col2:
+            st.download_button("📥 Spans (JSON Lines)", tracer.to_jsonl(),
+                               file_name="analysis_spans.jsonl", mime="application/x-ndjson")
+        with col3:
+            if st.button("🗑️ Réinitialiser les mesures"):
+                tracer.reset()
+                st.rerun()
     
-    def plot_score_evolution(self):
-        # Données simulées pour l'exemple
-        dates = pd.date_range(start='2024-01-01', end='2024-12-01', freq='M')
-        scores = np.random.normal(7.2, 1.5, len(dates))
+    def show_provider_status(self, ai_model):
+        """Affiche l'état du disjoncteur du fournisseur (rien pour les modèles simulés)"""
+        health = self.analyzer.provider_health().get(ai_model)
+        if not health:
+            return
+        if health["state"] == "open":
+            st.error(f"🔴 {ai_model} indisponible : nouvel essai dans {health['retry_in']:.0f}s "
+                     f"({health['last_error']})")
+        elif health["state"] == "half_open":
+            st.warning(f"🟠 {ai_model} en cours de rétablissement")
+        else:
+            failures = health["total_failures"]
+            st.caption(f"🟢 {ai_model} opérationnel - {health['total_calls']} appels, {failures} échecs")
+    
+    def plot_score_evolution(self, recent_scores):
+        import pandas as pd
+        import plotly.express as px
+        
+        if not recent_scores:
+            st.info("Aucune analyse notée pour le moment.")
+            return
         
         df = pd.DataFrame({
-            'Date': dates,
-            'Score': scores
+            'Analyse': range(1, len(recent_scores) + 1),
+            'Score': recent_scores
         })
         
-        fig = px.line(df, x='Date', y='Score', 
-                     title="Évolution des Scores Stratégiques",
-                     labels={'Score': 'Score Moyen', 'Date': 'Période'})
-        fig.update_layout(height=400)
+        fig = px.line(df, x='Analyse', y='Score', markers=True,
+                     title="Scores des Dernières Analyses",
+                     labels={'Score': 'Score Global', 'Analyse': 'Analyse'})
+        fig.update_layout(height=400, yaxis_range=[0, 10])
         st.plotly_chart(fig, use_container_width=True)
     
-    def plot_priority_distribution(self):
-        priorities = ['Critique', 'Élevé', 'Modéré', 'Faible']
-        counts = [8, 12, 15, 5]
+    def plot_priority_distribution(self, priority_distribution):
+        import plotly.express as px
         
-        fig = px.pie(values=counts, names=priorities, 
+        labels = {'CRITIQUE': 'Critique', 'ÉLEVÉ': 'Élevé', 'MODÉRÉ': 'Modéré', 'FAIBLE': 'Faible'}
+        if not any(priority_distribution.values()):
+            st.info("Aucune analyse sauvegardée pour le moment.")
+            return
+        
+        fig = px.pie(values=list(priority_distribution.values()),
+                    names=[labels.get(level, level) for level in priority_distribution],
                     title="Répartition par Niveau de Priorité")
         fig.update_layout(height=400)
         st.plotly_chart(fig, use_container_width=True)
     
-    def show_recent_analyses(self):
-        # Données simulées
+    def show_recent_analyses(self, recent_analyses):
+        import pandas as pd
+        
+        if not recent_analyses:
+            st.info("Aucune analyse sauvegardée pour le moment.")
+            return
+        
         data = {
-            'Titre': ['Analyse Amazon IA', 'Rapport Tech Trends', 'Étude Marché SaaS'],
-            'Date': ['2024-01-15', '2024-01-14', '2024-01-13'],
-            'Score': [8.5, 7.2, 6.8],
-            'Priorité': ['Critique', 'Élevé', 'Modéré'],
-            'Modèle': ['Claude-3', 'GPT-4', 'Gemini']
+            'Titre': [a['title'] for a in reversed(recent_analyses)],
+            'Date': [a['date'][:10] for a in reversed(recent_analyses)],
+            'Score': [a['metrics']['global_score'] for a in reversed(recent_analyses)],
+            'Priorité': [a['metrics']['priority_level'] for a in reversed(recent_analyses)],
+            'Modèle': [a['metrics']['ai_model'] for a in reversed(recent_analyses)]
         }
         
         df = pd.DataFrame(data)
@@ -330,32 +501,66 @@ class StrategicDashboard:
         for alert in alerts:
             st.warning(alert)
     
-    def display_analysis_result(self, result):
+    def display_analysis_stream(self, stream, refresh_interval: float = 0.1) -> str:
+        """Affiche les fragments d'analyse au fil de l'eau et retourne le texte complet"""
+        placeholder = st.empty()
+        placeholder.markdown("## 📊 Résultat de l'Analyse\n\n⏳ Analyse en cours...")
+        
+        chunks = []
+        last_refresh = 0.0
+        try:
+            for delta in stream:
+                chunks.append(delta)
+                # Limite le nombre de rendus pour ne pas saturer le navigateur
+                if time.monotonic() - last_refresh >= refresh_interval:
+                    placeholder.markdown("## 📊 Résultat de l'Analyse\n\n" + "".join(chunks) + " ▌")
+                    last_refresh = time.monotonic()
+        finally:
+            # Le rendu final est fait par display_analysis_result (ou remplacé par l'erreur)
+            placeholder.empty()
+        return "".join(chunks)
+    
+    def display_analysis_result(self, result, metadata=None):
         st.markdown("## 📊 Résultat de l'Analyse")
         
         # Affichage du résultat formaté
         st.markdown(result)
         
+        metrics = self.analyzer.extract_metrics_from_analysis(result)
+        st.markdown(f"**Score global :** {metrics['global_score']}/10 - "
+                    f"**Priorité :** {metrics['priority_level']}")
+        
+        # Une analyse réutilisée est déjà enregistrée
+        if metadata and metadata.get("reused_from"):
+            return
+        
         # Sauvegarde
         if st.button("💾 Sauvegarder l'Analyse"):
-            self.data_manager.save_analysis(result)
+            self.data_manager.save_analysis(result, metadata)
+            invalidate_analysis_caches()
             st.success("Analyse sauvegardée !")
     
-    def show_comparison_results(self, selected_analyses):
+    def show_comparison_results(self, selected_ids):
+        import numpy as np
+        import plotly.graph_objects as go
+        from consensus import compute_consensus, CRITERIA_LABELS
+        
         st.markdown("## 📊 Résultats de la Comparaison")
         
-        # Graphique de comparaison des scores
-        fig = go.Figure()
+        data = load_score_tensor(self.data_manager, self.data_manager.corpus_version())
+        articles = {data["article_of"][analysis_id] for analysis_id in selected_ids
+                    if analysis_id in data["article_of"]}
+        consensus = compute_consensus(data["tensor"], article_subset=list(articles))
         
-        # Données simulées
-        models = ['Claude-3', 'GPT-4', 'Gemini']
-        criteria = ['Impact', 'Urgence', 'Complexité', 'Risque', 'Fiabilité']
+        # Graphique de comparaison des scores : moyenne de chaque modèle sur les articles sélectionnés
+        fig = go.Figure()
         
-        for i, model in enumerate(models):
-            scores = np.random.uniform(5, 9, len(criteria))
+        for model, scores in zip(consensus["models"], consensus["model_criterion_mean"]):
+            if np.isnan(scores).all():
+                continue
             fig.add_trace(go.Scatterpolar(
-                r=scores,
-                theta=criteria,
+                r=np.nan_to_num(scores).round(1),
+                theta=CRITERIA_LABELS,
                 fill='toself',
                 name=model
             ))
@@ -371,29 +576,88 @@ class StrategicDashboard:
         )
         
         st.plotly_chart(fig, use_container_width=True)
+        
+        if consensus["comparable_articles"]:
+            st.metric("Consensus moyen entre modèles",
+                      f"{np.nanmean(consensus['article_consensus']):.0%}")
+        else:
+            st.info("Aucun article sélectionné n'a été analysé par plusieurs modèles : "
+                    "les scores ne peuvent pas être confrontés.")
+        
+        self.show_text_agreement(selected_ids)
+    
+    def show_text_agreement(self, selected_ids):
+        import pandas as pd
+        import plotly.graph_objects as go
+        
+        st.markdown("### 📝 Accord Textuel entre Modèles")
+        st.caption("Similarité cosinus TF-IDF des sections Synthèse exécutive et Recommandations stratégiques")
+        
+        data = load_text_similarity(self.data_manager, self.data_manager.corpus_version(), tuple(selected_ids))
+        if data["matrix"] is None:
+            st.info("Aucune analyse sélectionnée ne contient de synthèse ou de recommandations comparables.")
+            return
+        
+        if data["agreement"]:
+            agreement = pd.DataFrame(data["agreement"]).rename(columns={
+                "model_a": "Modèle A", "model_b": "Modèle B",
+                "similarity": "Similarité moyenne", "pairs": "Paires comparées"
+            }).round(2)
+            st.dataframe(agreement, use_container_width=True, hide_index=True)
+        else:
+            st.info("Aucun article sélectionné n'a été analysé par plusieurs modèles : "
+                    "la similarité est affichée entre analyses.")
+        
+        fig = go.Figure(go.Heatmap(
+            z=data["matrix"], x=data["labels"], y=data["labels"],
+            zmin=0, zmax=1, colorscale="Blues",
+            hovertemplate="%{y}<br>%{x}<br>Similarité : %{z:.0%}<extra></extra>"
+        ))
+        fig.update_layout(title="Similarité textuelle entre analyses",
+                          xaxis=dict(showticklabels=len(data["labels"]) <= 30),
+                          yaxis=dict(showticklabels=len(data["labels"]) <= 30, autorange="reversed"),
+                          height=max(400, min(900, 20 * len(data["labels"]))))
+        st.plotly_chart(fig, use_container_width=True)
     
     def generate_comparison_report(self):
-        st.markdown("## 📋 Rapport Comparatif")
+        import numpy as np
+        import pandas as pd
+        from consensus import compute_consensus, CRITERIA_LABELS, OUTLIER_THRESHOLD
         
-        # Génération du rapport
-        report = """
-        ### 📊 Synthèse Comparative
+        st.markdown("## 📋 Rapport Comparatif")
         
-        **Convergences Principales :**
-        - Impact Business : Consensus élevé (7.5-8.2/10)
-        - Urgence Temporelle : Divergence modérée (6.8-8.1/10)
+        data = load_score_tensor(self.data_manager, self.data_manager.corpus_version())
+        consensus = compute_consensus(data["tensor"])
+        if not consensus["comparable_articles"]:
+            st.info("Le rapport nécessite au moins un article analysé par plusieurs modèles.")
+            return
+        
+        # Critères classés du plus consensuel au plus divergent
+        spread = consensus["criterion_spread"]
+        order = [i for i in np.argsort(spread) if not np.isnan(spread[i])]
+        half = (len(order) + 1) // 2
+        lines = [
+            "### 📊 Synthèse Comparative",
+            f"{consensus['comparable_articles']} article(s) analysé(s) par plusieurs modèles "
+            f"sur {consensus['n_articles']}.",
+            "",
+            "**Convergences Principales :**",
+        ]
+        lines += [f"- {CRITERIA_LABELS[i]} : écart-type moyen {spread[i]:.1f} "
+                  f"(score moyen {consensus['criterion_mean'][i]:.1f}/10)" for i in order[:min(2, half)]]
+        lines += ["", "**Divergences Notables :**"]
+        lines += [f"- {CRITERIA_LABELS[i]} : écart-type moyen {spread[i]:.1f} "
+                  f"(score moyen {consensus['criterion_mean'][i]:.1f}/10)" for i in order[half:][::-1][:2]] or ["- Aucune"]
         
-        **Divergences Notables :**
-        - Complexité d'Exécution : Écart important entre modèles
-        - Risque Concurrentiel : Évaluations variables selon la méthodologie
+        outliers = [(model, rate) for model, rate in zip(consensus["models"], consensus["outlier_rate"]) if rate > 0]
+        lines += ["", f"**Modèles Aberrants (écart > {OUTLIER_THRESHOLD:g} points à la médiane des modèles) :**"]
+        lines += [f"- {model} : {rate:.0%} des scores" for model, rate in sorted(outliers, key=lambda x: -x[1])] or ["- Aucun"]
         
-        **Recommandations :**
-        1. Approfondir l'analyse de la complexité d'exécution
-        2. Valider les hypothèses sur les risques concurrentiels
-        3. Consolider les métriques de fiabilité des sources
-        """
+        st.markdown("\n".join(lines))
         
-        st.markdown(report)
+        st.markdown("**Accord entre Modèles** (1 = scores identiques)")
+        st.dataframe(pd.DataFrame(consensus["agreement"], index=consensus["models"],
+                                  columns=consensus["models"]).round(2), use_container_width=True)
 
 if __name__ == "__main__":
     dashboard = StrategicDashboard()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Benchmark de montée en charge de DataManager (10k, 100k, 1M analyses).
+
+Pour chaque moteur de stockage et chaque taille, un corpus synthétique est généré dans
+un répertoire temporaire puis les opérations publiques sont chronométrées : save_analysis,
+get_analysis_by_id, search_analyses, get_dashboard_data, get_analyses_by_date_range,
+delete_analysis et export_analyses. Le premier appel (à froid : chargement du corpus,
+construction des index) est mesuré séparément des appels suivants (à chaud).
+
+Chaque configuration tourne dans un sous-processus : le pic de mémoire résidente (RSS)
+relevé est le sien, et une configuration trop lente est interrompue (--timeout) au lieu
+de bloquer les autres. Les résultats sont écrits en JSON Lines (--output), une ligne par
+opération, et peuvent être comparés à une exécution précédente (--compare).
+
+Usage : python benchmarks/bench_data_manager.py [--sizes 10000,100000,1000000]
+            [--backends json,jsonl,sqlite] [--repeat N] [--timeout S]
+            [--output resultats.jsonl] [--compare precedent.jsonl] [--json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+OPERATIONS = ["get_analysis_by_id", "search_analyses", "get_dashboard_data",
+              "get_analyses_by_date_range", "save_analysis", "delete_analysis", "export_analyses"]
+
+COMPANIES = ["Amazon", "Tesla", "Shein", "Airbus", "Mistral", "Nvidia", "Orange", "Doctolib",
+             "Stellantis", "Carrefour", "Ubisoft", "Sanofi", "Alstom", "Criteo", "Decathlon"]
+TOPICS = ["IA générative", "usine européenne", "cloud souverain", "levée de fonds", "rachat",
+          "réglementation", "batteries", "semi-conducteurs", "cybersécurité", "logistique"]
+MODELS = ["Claude-3-Sonnet", "GPT-4", "Gemini-Pro", "Custom Model"]
+LEVELS = [(8, "CRITIQUE"), (6, "ÉLEVÉ"), (4, "MODÉRÉ"), (0, "FAIBLE")]
+
+TEMPLATE = """# 📈 ANALYSE STRATÉGIQUE - {company} : {topic}
+**🗓️ Date d'Analyse :** {date} | **🔍 Analyste IA :** {model}
+
+## 🎯 SYNTHÈSE EXÉCUTIVE
+{company} accélère sur {topic}. Impact direct sur {other} et sur les acteurs du secteur.
+
+## 📊 SCORING STRATÉGIQUE
+| Critère | Score | Justification |
+|---------|-------|---------------|
+| **Impact Business** | {impact}/10 | Potentiel financier |
+| **Urgence Temporelle** | {urgency}/10 | Fenêtre d'action |
+| **Complexité Exécution** | {complexity}/10 | Faisabilité |
+| **Risque Concurrentiel** | {risk}/10 | Menace vs. {other} |
+| **Fiabilité Source** | {reliability}/10 | Source récente |
+
+**🎯 SCORE GLOBAL DE PRIORITÉ :** {global_score}/10 - **Niveau : {level}**
+
+## 🚀 RECOMMANDATIONS STRATÉGIQUES
+### Option 1 : Veille renforcée sur {company} - **[PRIORITÉ : HAUTE]**
+- **Action** : Suivre {topic} et préparer une réponse face à {other}
+"""
+
+
+def synthetic_record(rng: random.Random, start: datetime, index: int) -> dict:
+    """Analyse synthétique au format CRAFT, avec ses métriques déjà matérialisées"""
+    from metrics_parser import PARSER_VERSION
+
+    scores = {name: round(rng.uniform(1, 10), 1)
+              for name in ("impact", "urgency", "complexity", "risk", "reliability")}
+    global_score = round(sum(scores.values()) / len(scores), 1)
+    level = next(label for threshold, label in LEVELS if global_score >= threshold)
+    model = rng.choice(MODELS)
+    date = start + timedelta(minutes=index)
+    company, other = rng.sample(COMPANIES, 2)
+    content = TEMPLATE.format(company=company, other=other, topic=rng.choice(TOPICS), model=model,
+                              date=date.strftime("%Y-%m-%d %H:%M"), global_score=global_score,
+                              level=level, **scores)
+    metrics = {f"{name}_score": value for name, value in scores.items()}
+    metrics.update(global_score=global_score, priority_level=level, ai_model=model,
+                   focus_area="Technologie", parser_version=PARSER_VERSION)
+    return {"id": uuid.UUID(int=rng.getrandbits(128)).hex[:8], "content": content,
+            "date": date.isoformat(), "metadata": {"ai_model": model}, "metrics": metrics}
+
+
+def peak_rss_mb() -> float:
+    """Pic de mémoire résidente du processus (ru_maxrss : Ko sous Linux, octets sous macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def run_worker(backend: str, size: int, repeat: int, seed: int) -> None:
+    """Mesure une configuration et écrit une ligne JSON par opération sur la sortie standard"""
+    from data_manager import DataManager
+
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    with tempfile.TemporaryDirectory() as data_dir:
+        manager = DataManager(data_dir=data_dir, storage_backend=backend)
+        ids = []
+
+        def records():
+            for index in range(size):
+                record = synthetic_record(rng, start, index)
+                if index % max(1, size // 1000) == 0:
+                    ids.append(record["id"])
+                yield record
+
+        seed_s, _ = timed(manager.store.import_records, records(), True)
+        manager.corpus_cache.invalidate()
+        emit(backend, size, "seed", [seed_s], None, {"ids_sampled": len(ids)})
+
+        middle = (start + timedelta(minutes=size // 2)).isoformat()
+        end = (start + timedelta(minutes=size // 2 + max(1, size // 100))).isoformat()
+        queries = ["amazon", "cloud souverain", "semi*", "nvidia batteries"]
+        saved_content = synthetic_record(rng, start, size)["content"]
+
+        calls = {
+            "get_analysis_by_id": lambda i: manager.get_analysis_by_id(ids[i % len(ids)]),
+            "search_analyses": lambda i: manager.search_analyses(queries[i % len(queries)], 20),
+            "get_dashboard_data": lambda i: manager.get_dashboard_data(),
+            "get_analyses_by_date_range": lambda i: manager.get_analyses_by_date_range(middle, end),
+            "save_analysis": lambda i: manager.save_analysis(saved_content, {"ai_model": "GPT-4"}),
+            "delete_analysis": lambda i: manager.delete_analysis(ids.pop()),
+            "export_analyses": lambda i: manager.export_analyses("csv"),
+        }
+        for operation in OPERATIONS:
+            rss_before = peak_rss_mb()
+            cold, result = timed(calls[operation], 0)
+            warm = [timed(calls[operation], i)[0] for i in range(1, repeat)]
+            extra = {"rss_growth_mb": round(peak_rss_mb() - rss_before, 1)}
+            if isinstance(result, (list, str, bytes)):
+                extra["result_size"] = len(result)
+            emit(backend, size, operation, [cold], warm, extra)
+
+
+def emit(backend, size, operation, cold, warm, extra) -> None:
+    row = {"backend": backend, "size": size, "operation": operation,
+           "cold_ms": round(cold[0] * 1000, 3), "peak_rss_mb": peak_rss_mb()}
+    if warm:
+        row.update(warm_p50_ms=round(statistics.median(warm) * 1000, 3),
+                   warm_max_ms=round(max(warm) * 1000, 3), repeats=len(warm))
+    row.update(extra)
+    print(json.dumps(row, ensure_ascii=False), flush=True)
+
+
+def run_configuration(backend: str, size: int, args) -> list:
+    """Lance un sous-processus mesurant (backend, size) ; une interruption est consignée comme telle"""
+    command = [sys.executable, os.path.abspath(__file__), "--worker", backend, str(size),
+               "--repeat", str(args.repeat), "--seed", str(args.seed)]
+    try:
+        completed = subprocess.run(command, cwd=APP_DIR, capture_output=True, text=True,
+                                   timeout=args.timeout)
+        stdout, status = completed.stdout, "ok" if completed.returncode == 0 else "error"
+        detail = completed.stderr[-500:] if completed.returncode else None
+    except subprocess.TimeoutExpired as e:
+        stdout = e.stdout.decode("utf-8") if isinstance(e.stdout, bytes) else (e.stdout or "")
+        status, detail = "timeout", f"interrompu après {args.timeout}s"
+
+    rows = [json.loads(line) for line in stdout.splitlines() if line.startswith("{")]
+    done = {row["operation"] for row in rows}
+    for operation in ["seed"] + OPERATIONS:
+        if operation not in done and status != "ok":
+            rows.append({"backend": backend, "size": size, "operation": operation,
+                         "status": status, "detail": detail})
+            # Seule la première opération manquante porte le détail de l'échec
+            status, detail = "skipped", None
+    return rows
+
+
+def load_baseline(path: str) -> dict:
+    baseline = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            if row.get("cold_ms") is not None:
+                baseline[(row["backend"], row["size"], row["operation"])] = row
+    return baseline
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--backends", default="json,jsonl,sqlite")
+    parser.add_argument("--repeat", type=int, default=5, help="Appels par opération (le premier est à froid)")
+    parser.add_argument("--timeout", type=float, default=1800, help="Durée maximale d'une configuration (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Fichier JSON Lines où ajouter les résultats")
+    parser.add_argument("--compare", help="Résultats JSON Lines d'une exécution précédente")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON lisible par machine")
+    parser.add_argument("--worker", nargs=2, metavar=("BACKEND", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker[0], int(args.worker[1]), max(1, args.repeat), args.seed)
+        return 0
+
+    run = {"run_id": uuid.uuid4().hex[:12], "timestamp": datetime.now().isoformat(timespec="seconds"),
+           "python": platform.python_version(), "machine": platform.machine()}
+    results = []
+    for backend in args.backends.split(","):
+        for size in (int(size) for size in args.sizes.split(",")):
+            results.extend(dict(row, **run) for row in run_configuration(backend, size, args))
+
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            for row in results:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    baseline = load_baseline(args.compare) if args.compare else {}
+    for row in results:
+        previous = baseline.get((row["backend"], row["size"], row["operation"]))
+        if previous and row.get("cold_ms") is not None:
+            # > 1 : plus lent que la référence
+            row["cold_ratio"] = round(row["cold_ms"] / previous["cold_ms"], 2) if previous["cold_ms"] else None
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print(f"{'Moteur':7} {'Taille':>8} {'Opération':27} {'Froid':>11} {'Chaud p50':>11} "
+              f"{'RSS max':>9}{'  vs réf.' if baseline else ''}")
+        for row in results:
+            if row.get("cold_ms") is None:
+                print(f"{row['backend']:7} {row['size']:>8} {row['operation']:27} {row['status']}"
+                      f"{' - ' + row['detail'] if row.get('detail') else ''}")
+                continue
+            warm = f"{row['warm_p50_ms']:>9.2f}ms" if "warm_p50_ms" in row else f"{'-':>11}"
+            ratio = f"  x{row['cold_ratio']}" if row.get("cold_ratio") else ""
+            print(f"{row['backend']:7} {row['size']:>8} {row['operation']:27} {row['cold_ms']:>9.2f}ms "
+                  f"{warm} {row['peak_rss_mb']:>7.1f}Mo{ratio}")
+
+    return 0 if all(row.get("status", "ok") == "ok" for row in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
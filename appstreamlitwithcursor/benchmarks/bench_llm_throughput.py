@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark de bout en bout du chemin d'analyse à travers la pile HTTP.
+
+Démarre le serveur local llm_stub_server (API Anthropic et OpenAI imitées, sans clé ni
+réseau) puis envoie des lots d'analyses à StrategicAnalyzer, via les vrais SDK, avec
+plusieurs niveaux de concurrence. Pour chaque niveau : latences p50/p95/p99 par analyse,
+débit (analyses par seconde) et taux d'erreur. En mode --stream, le délai avant le
+premier fragment (TTFT) est aussi mesuré.
+
+Le cache de réponses est désactivé et les budgets de débit sont levés : seul le coût
+du client (SDK, pool de connexions, nouvelles tentatives, disjoncteur) et du serveur
+simulé est mesuré.
+
+Usage : python benchmarks/bench_llm_throughput.py [--requests N] [--concurrency 1,4,16]
+            [--model GPT-4] [--latency lognormal:0.2,0.5] [--tokens-per-second 0]
+            [--error-rate 0.0] [--stream] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from llm_stub_server import StubLLMServer
+
+ARTICLE = ("Amazon investit massivement dans les modèles de langage pour concurrencer ChatGPT "
+           "et prévoit de lancer de nouveaux services d'IA dans les prochains mois.")
+
+# Budgets de débit assez larges pour ne jamais limiter la mesure
+UNLIMITED_RATE_LIMITS = {
+    "Claude-3-Sonnet": {"requests_per_minute": 10 ** 9, "tokens_per_minute": None},
+    "GPT-4": {"requests_per_minute": 10 ** 9, "tokens_per_minute": None},
+}
+
+
+def percentile(values, q: float) -> float:
+    """Percentile par rang le plus proche (values non vide)"""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def make_analyzer(max_retries: int):
+    from provider_client import RetryPolicy
+    from strategic_analyzer import StrategicAnalyzer
+
+    analyzer = StrategicAnalyzer(rate_limits=UNLIMITED_RATE_LIMITS,
+                                 retry_policy=RetryPolicy(max_retries=max_retries, base_delay=0.05))
+    analyzer.response_cache.enabled = False
+    return analyzer
+
+
+def run_level(analyzer, model: str, requests: int, concurrency: int, stream: bool):
+    """Envoie `requests` analyses avec `concurrency` appels simultanés ; retourne les mesures"""
+    def one(index: int):
+        args = (f"{ARTICLE} (#{index})", "Technologie", "Élevé", "Grande Entreprise", model,
+                [0.3, 0.25, 0.2, 0.15, 0.1])
+        start = time.perf_counter()
+        first = None
+        try:
+            if stream:
+                for _ in analyzer.analyze_content_stream(*args, use_cache=False, raise_errors=True):
+                    if first is None:
+                        first = time.perf_counter() - start
+            else:
+                analyzer.analyze_content(*args, use_cache=False, raise_errors=True)
+            error = None
+        except Exception as e:
+            error = type(e).__name__
+        return time.perf_counter() - start, first, error
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(one, range(requests)))
+    wall = time.perf_counter() - wall_start
+
+    latencies = [latency for latency, _, error in outcomes if error is None]
+    ttfts = [first for _, first, error in outcomes if error is None and first is not None]
+    errors = [error for _, _, error in outcomes if error is not None]
+    row = {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": len(errors),
+        "error_types": sorted(set(errors)),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+    }
+    for q in (50, 95, 99):
+        row[f"p{q}_ms"] = round(percentile(latencies, q) * 1000, 1) if latencies else None
+    if stream:
+        row["ttft_p50_ms"] = round(percentile(ttfts, 50) * 1000, 1) if ttfts else None
+        row["ttft_p95_ms"] = round(percentile(ttfts, 95) * 1000, 1) if ttfts else None
+    return row
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Analyses par niveau de concurrence")
+    parser.add_argument("--concurrency", default="1,4,16,32")
+    parser.add_argument("--model", default="GPT-4", choices=["GPT-4", "Claude-3-Sonnet"])
+    parser.add_argument("--latency", default="lognormal:0.05,0.5",
+                        help="Latence initiale du serveur simulé (voir llm_stub_server.latency_sampler)")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-retries", type=int, default=2)
+    parser.add_argument("--stream", action="store_true", help="Mesure le chemin progressif et le TTFT")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="Sortie JSON lisible par machine")
+    args = parser.parse_args()
+
+    with StubLLMServer(latency=args.latency, tokens_per_second=args.tokens_per_second,
+                       error_rate=args.error_rate, seed=args.seed, record_requests=False) as stub:
+        # Les SDK lisent l'URL de base dans l'environnement ; les clés factices activent les clients
+        os.environ.update(ANTHROPIC_API_KEY="stub", OPENAI_API_KEY="stub",
+                          ANTHROPIC_BASE_URL=stub.url, OPENAI_BASE_URL=f"{stub.url}/v1")
+        results = []
+        for concurrency in (int(level) for level in args.concurrency.split(",")):
+            # Un nouveau disjoncteur par niveau : les erreurs d'un niveau ne pénalisent pas le suivant
+            analyzer = make_analyzer(args.max_retries)
+            results.append(run_level(analyzer, args.model, args.requests, concurrency, args.stream))
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print(f"Modèle {args.model} - latence {args.latency} - erreurs injectées {args.error_rate:.0%}"
+              f"{' - flux' if args.stream else ''}")
+        header = f"{'Concurrence':>11} {'Débit':>10} {'p50':>9} {'p95':>9} {'p99':>9} {'Erreurs':>8}"
+        print(header + (f" {'TTFT p50':>9}" if args.stream else ""))
+        for row in results:
+            line = (f"{row['concurrency']:>11} {row['throughput_rps']:>6.1f}/s "
+                    f"{row['p50_ms']:>7}ms {row['p95_ms']:>7}ms {row['p99_ms']:>7}ms {row['errors']:>8}")
+            print(line + (f" {row['ttft_p50_ms']:>7}ms" if args.stream else ""))
+
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
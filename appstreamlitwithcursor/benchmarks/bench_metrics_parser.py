@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark du parseur de métriques CRAFT.
+
+Compare parse_metrics à l'ancienne extraction (une recherche DOTALL par critère)
+sur une analyse typique, une analyse très longue et des entrées adverses.
+Le rapport de temps entre une entrée et sa version deux fois plus grande doit
+rester proche de 2 (croissance linéaire) pour le nouveau parseur.
+
+Usage : python benchmarks/bench_metrics_parser.py [--repeat N] [--json]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics_parser import parse_metrics
+
+SAMPLE_ANALYSIS = """# 📈 ANALYSE STRATÉGIQUE - Amazon accélère sur l'IA générative
+**🗓️ Date d'Analyse :** 2024-01-15 10:42 | **🔍 Analyste IA :** GPT-4
+
+## 🎯 SYNTHÈSE EXÉCUTIVE
+Amazon investit massivement dans les modèles de langage pour concurrencer ChatGPT.
+
+## 📊 SCORING STRATÉGIQUE
+| Critère | Score | Justification |
+|---------|-------|---------------|
+| **Impact Business** | 8.5/10 | Potentiel financier significatif |
+| **Urgence Temporelle** | 7/10 | Fenêtre d'action de 6 mois |
+| **Complexité Exécution** | 5.5/10 | Faisabilité organisationnelle moyenne |
+| **Risque Concurrentiel** | 8/10 | Menace directe sur le cloud |
+| **Fiabilité Source** | 9/10 | Source primaire récente |
+
+**🎯 SCORE GLOBAL DE PRIORITÉ :** 7.6/10 - **Niveau : ÉLEVÉ**
+
+## 🚀 RECOMMANDATIONS STRATÉGIQUES
+### Option 1 : Partenariat - **[PRIORITÉ : HAUTE]**
+- **Action** : Négocier un accès anticipé aux modèles
+"""
+
+
+def legacy_extract(analysis: str) -> dict:
+    """Ancienne implémentation (avant metrics_parser), conservée comme référence"""
+    metrics = {}
+    match = re.search(r'SCORE GLOBAL DE PRIORITÉ :\s*([\d.]+)/10', analysis)
+    if match:
+        metrics["global_score"] = float(match.group(1))
+    match = re.search(r'Niveau :\s*([A-ZÉ]+)', analysis)
+    if match:
+        metrics["priority_level"] = match.group(1)
+    score_patterns = {
+        "impact_score": r'Impact Business.*?(\d+(?:\.\d+)?)/10',
+        "urgency_score": r'Urgence Temporelle.*?(\d+(?:\.\d+)?)/10',
+        "complexity_score": r'Complexité Exécution.*?(\d+(?:\.\d+)?)/10',
+        "risk_score": r'Risque Concurrentiel.*?(\d+(?:\.\d+)?)/10',
+        "reliability_score": r'Fiabilité Source.*?(\d+(?:\.\d+)?)/10'
+    }
+    for key, pattern in score_patterns.items():
+        match = re.search(pattern, analysis, re.DOTALL)
+        if match:
+            metrics[key] = float(match.group(1))
+    return metrics
+
+
+def build_inputs(scale: int) -> dict:
+    """Jeux d'entrées ; scale contrôle la taille des cas longs et adverses"""
+    return {
+        "typique": SAMPLE_ANALYSIS,
+        "long": SAMPLE_ANALYSIS + "\n".join(
+            f"- Signal {i} : évolution du marché sans score" for i in range(scale)
+        ),
+        # Libellé répété sans aucun « /10 » : l'ancien « .*? » DOTALL rescane la fin à chaque occurrence
+        "adverse_libelles": "Impact Business " * scale,
+        # Longue suite de chiffres sans « /10 » : piège classique de retour arrière sur \d+
+        "adverse_chiffres": "Impact Business " + "9" * (scale * 10),
+    }
+
+
+def time_call(func, text: str, repeat: int) -> float:
+    """Meilleur temps d'exécution (secondes) sur `repeat` essais"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=int, default=500)
+    parser.add_argument("--json", action="store_true", help="Sortie JSON lisible par machine")
+    args = parser.parse_args()
+
+    # Préchauffage : compilation des expressions régulières hors mesure
+    parse_metrics(SAMPLE_ANALYSIS)
+    legacy_extract(SAMPLE_ANALYSIS)
+
+    results = []
+    small, large = build_inputs(args.scale), build_inputs(args.scale * 2)
+    for name in small:
+        row = {"input": name, "size": len(small[name])}
+        for label, func in [("parse_metrics", parse_metrics), ("legacy", legacy_extract)]:
+            # L'ancienne version se dégrade fortement sur les entrées adverses : un seul essai
+            repeat = args.repeat if label == "parse_metrics" else 1
+            t_small = time_call(func, small[name], repeat)
+            t_large = time_call(func, large[name], repeat)
+            row[f"{label}_ms"] = round(t_small * 1000, 3)
+            row[f"{label}_growth"] = round(t_large / t_small, 2) if t_small else None
+        results.append(row)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print(f"{'Entrée':18} {'Taille':>9} {'parse_metrics':>14} {'x2':>6} {'ancien':>12} {'x2':>6}")
+        for row in results:
+            print(f"{row['input']:18} {row['size']:>9} {row['parse_metrics_ms']:>12.3f}ms "
+                  f"{row['parse_metrics_growth']:>6} {row['legacy_ms']:>10.3f}ms {row['legacy_growth']:>6}")
+        print("\nx2 : rapport de temps quand l'entrée double (≈2 = linéaire, ≈4 = quadratique)")
+
+    # Garde-fou : la croissance du nouveau parseur doit rester linéaire
+    worst_growth = max(row["parse_metrics_growth"] or 0 for row in results if row["input"] != "typique")
+    return 0 if worst_growth < 3 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
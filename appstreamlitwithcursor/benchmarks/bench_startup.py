@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark du démarrage à froid (python -X importtime).
+
+Chaque module est importé dans un interpréteur neuf ; on relève le temps
+d'import cumulé et la liste des modules chargés. Le script échoue si un budget
+de temps est dépassé ou si une bibliothèque lourde censée être chargée à la
+demande (SDK des fournisseurs, bibliothèques de graphiques) est importée au démarrage.
+
+Usage : python benchmarks/bench_startup.py [--repeat N] [--scale X] [--json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budgets en millisecondes (meilleur de N essais, import cumulé du module)
+BUDGETS_MS = {
+    "strategic_analyzer": 150,
+    "data_manager": 150,
+    "app": 1000,
+}
+
+# Paquets qui ne doivent pas être importés par le module au démarrage
+LAZY_PACKAGES = {
+    "strategic_analyzer": ["openai", "anthropic", "dotenv", "pandas", "numpy"],
+    "data_manager": ["openai", "anthropic", "pandas", "numpy"],
+    # streamlit importe lui-même numpy, pandas, plotly et plotly.graph_objects (chargé à la demande) :
+    # seuls plotly.express, plotly.subplots, altair et les SDK relèvent de l'application
+    "app": ["openai", "anthropic", "plotly.express", "plotly.subplots", "altair"],
+}
+
+
+def measure(module: str):
+    """Importe `module` dans un sous-processus ; retourne (temps cumulé en ms, modules importés)"""
+    env = dict(os.environ)
+    # Pas d'appel réseau ni de lecture de clés pendant la mesure
+    env.pop("ANTHROPIC_API_KEY", None)
+    env.pop("OPENAI_API_KEY", None)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Import de {module} impossible :\n{completed.stderr[-2000:]}")
+
+    cumulative_us = None
+    modules = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # « import time: self [us] | cumulative | nom du module »
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        modules.add(name)
+        if name == module:
+            cumulative_us = int(cumulative.strip())
+    return (cumulative_us or 0) / 1000, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiplicateur des budgets (machines lentes, CI)")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON lisible par machine")
+    args = parser.parse_args()
+
+    results = []
+    for module, budget in BUDGETS_MS.items():
+        timings, modules = [], set()
+        for _ in range(args.repeat):
+            elapsed, modules = measure(module)
+            timings.append(elapsed)
+        eager = sorted(package for package in LAZY_PACKAGES[module]
+                       if any(name == package or name.startswith(package + ".") for name in modules))
+        best = min(timings)
+        results.append({
+            "module": module,
+            "import_ms": round(best, 1),
+            "budget_ms": round(budget * args.scale, 1),
+            "eager_packages": eager,
+            "ok": best <= budget * args.scale and not eager,
+        })
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print(f"{'Module':20} {'Import':>10} {'Budget':>10}  Paquets chargés trop tôt")
+        for row in results:
+            status = "✅" if row["ok"] else "❌"
+            print(f"{row['module']:20} {row['import_ms']:>8.1f}ms {row['budget_ms']:>8.1f}ms  "
+                  f"{', '.join(row['eager_packages']) or '-'} {status}")
+
+    return 0 if all(row["ok"] for row in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
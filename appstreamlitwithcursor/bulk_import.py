@@ -0,0 +1,231 @@
+import csv
+import itertools
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+from metrics_parser import CRITERIA, PARSER_VERSION, default_metrics
+
+# Nombre de lignes lues et validées à la fois (mémoire bornée)
+CHUNK_ROWS = 100000
+
+# Colonnes de score du CSV → clés des métriques stockées (les clés elles-mêmes sont aussi acceptées)
+SCORE_COLUMNS = {
+    "strategic_score": "global_score",
+    "market_opportunity": "impact_score",
+    "competitive_impact": "risk_score",
+    "global_score": "global_score",
+    **{key: key for key in CRITERIA.values()},
+}
+REQUIRED_COLUMNS = ["article_id", "ai_model"]
+# Colonnes descriptives recopiées dans les métadonnées
+METADATA_COLUMNS = ["article_id", "ai_model", "title", "source", "sentiment", "entities",
+                    "trends", "recommendation", "focus_area"]
+
+# Mêmes seuils que StrategicAnalyzer._determine_priority_level
+PRIORITY_THRESHOLDS = [(8.0, "CRITIQUE"), (6.5, "ÉLEVÉ"), (5.0, "MODÉRÉ")]
+
+CRITERIA_LABELS = {key: label for label, key in CRITERIA.items()}
+
+
+def read_analyses_csv(path: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[Tuple[List[Dict[str, Any]], pd.DataFrame]]:
+    """
+    Lit un CSV d'analyses multi-modèles (une ligne par article et par modèle) par blocs de
+    chunk_rows lignes. Pour chaque bloc, produit (enregistrements valides, lignes rejetées) ;
+    les lignes rejetées portent leur numéro de ligne dans le fichier et le motif du rejet.
+    Le découpage est fait par csv.reader : une ligne au nombre de champs incorrect est rejetée
+    (jamais ignorée) et les numéros restent exacts, même après un champ sur plusieurs lignes.
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = [column.strip() for column in next(reader, [])]
+
+        score_columns = [column for column in header if column in SCORE_COLUMNS]
+        missing = [column for column in REQUIRED_COLUMNS if column not in header]
+        if not any(SCORE_COLUMNS[column] == "global_score" for column in score_columns):
+            missing.append("strategic_score")
+        if missing:
+            raise ValueError(f"Colonnes manquantes dans le CSV: {', '.join(missing)}")
+
+        imported_at = datetime.now().isoformat()
+        for lines, rows, malformed in _iter_chunks(reader, len(header), chunk_rows):
+            chunk = pd.DataFrame(rows, columns=header, index=lines, dtype=str)
+            records, rejected = _validate_chunk(chunk, score_columns, imported_at)
+            if malformed:
+                rejected = pd.concat([_malformed_rejects(malformed, header), rejected], ignore_index=True)
+                rejected = rejected.sort_values("line", kind="stable", ignore_index=True)
+            yield records, rejected
+
+
+def _iter_chunks(reader, field_count: int, chunk_rows: int) -> Iterator[Tuple[List[int], List[List[str]], List[Tuple[int, List[str]]]]]:
+    """
+    Blocs (numéros de ligne, lignes bien formées, lignes au nombre de champs invalide avec leur
+    numéro) lus depuis csv.reader ; le numéro est celui de la première ligne physique de
+    l'enregistrement, les lignes vides sont sautées.
+    """
+    lines, rows, malformed = [], [], []
+    last_line = reader.line_num
+    for row in reader:
+        line, last_line = last_line + 1, reader.line_num
+        if not row:
+            continue
+        if len(row) == field_count:
+            lines.append(line)
+            rows.append(row)
+        else:
+            malformed.append((line, row))
+        if len(rows) + len(malformed) >= chunk_rows:
+            yield lines, rows, malformed
+            lines, rows, malformed = [], [], []
+    if rows or malformed:
+        yield lines, rows, malformed
+
+
+def _malformed_rejects(malformed: List[Tuple[int, List[str]]], header: List[str]) -> pd.DataFrame:
+    """Rejets des lignes au nombre de champs invalide (clés relues à leur position si présentes)"""
+    positions = {column: header.index(column) for column in REQUIRED_COLUMNS}
+    return pd.DataFrame({
+        "line": [line for line, _ in malformed],
+        "reason": "nombre de champs invalide",
+        **{column: [row[position].strip() if position < len(row) else "" for _, row in malformed]
+           for column, position in positions.items()},
+    })
+
+
+def _validate_chunk(chunk: pd.DataFrame, score_columns: List[str],
+                    imported_at: str) -> Tuple[List[Dict[str, Any]], pd.DataFrame]:
+    """
+    Contrôle et conversion vectorisés d'un bloc (indexé par numéro de ligne dans le fichier) ;
+    retourne (enregistrements, rejets)
+    """
+    # Seules les clés sont nettoyées ; to_numeric et to_datetime ignorent les espaces
+    keys = {column: chunk[column].str.strip() for column in REQUIRED_COLUMNS}
+    scores = {column: pd.to_numeric(chunk[column], errors="coerce") for column in score_columns}
+    global_column = next(column for column in score_columns if SCORE_COLUMNS[column] == "global_score")
+
+    non_numeric = np.zeros(len(chunk), dtype=bool)
+    out_of_range = np.zeros(len(chunk), dtype=bool)
+    for column, values in scores.items():
+        non_numeric |= values.isna().to_numpy() & (chunk[column].str.strip() != "").to_numpy()
+        out_of_range |= ((values < 0) | (values > 10)).to_numpy()
+
+    raw_dates = chunk["date"] if "date" in chunk else pd.Series("", index=chunk.index)
+    # Dates avec fuseau (éventuellement mélangées à des dates sans) ramenées en UTC puis rendues
+    # naïves comme les dates enregistrées ; une date sans fuseau est conservée telle quelle
+    dates = pd.to_datetime(raw_dates, format="ISO8601", errors="coerce", utc=True).dt.tz_localize(None)
+
+    # Premier motif de rejet de chaque ligne (ordre des conditions)
+    conditions = [
+        (keys["article_id"] == "").to_numpy(),
+        (keys["ai_model"] == "").to_numpy(),
+        scores[global_column].isna().to_numpy() & (chunk[global_column].str.strip() == "").to_numpy(),
+        non_numeric,
+        out_of_range,
+        (dates.isna() & (raw_dates.str.strip() != "")).to_numpy(),
+        pd.DataFrame(keys).duplicated(keep="last").to_numpy(),
+    ]
+    reasons = [
+        "article_id manquant",
+        "ai_model manquant",
+        "score global manquant",
+        "score non numérique",
+        "score hors de l'intervalle [0, 10]",
+        "date invalide",
+        "doublon (article_id, ai_model) dans le fichier",
+    ]
+    reason = np.select(conditions, reasons, default="")
+    rejected_mask = reason != ""
+
+    rejected = pd.DataFrame({
+        "line": chunk.index.to_numpy()[rejected_mask],
+        "reason": reason[rejected_mask],
+        "article_id": keys["article_id"].to_numpy()[rejected_mask],
+        "ai_model": keys["ai_model"].to_numpy()[rejected_mask],
+    })
+
+    valid = ~rejected_mask
+    if not valid.any():
+        return [], rejected
+    text = {column: chunk[column].to_numpy()[valid] for column in METADATA_COLUMNS if column in chunk}
+    text.update((column, values.to_numpy()[valid]) for column, values in keys.items())
+    scores = {SCORE_COLUMNS[column]: values.to_numpy()[valid].round(2) for column, values in scores.items()}
+    iso_dates = np.datetime_as_string(dates.to_numpy()[valid], unit="s").astype(object)
+    iso_dates[dates.isna().to_numpy()[valid]] = imported_at
+    return _to_records(text, scores, iso_dates), rejected
+
+
+def _to_records(text: Dict[str, np.ndarray], scores: Dict[str, np.ndarray],
+                dates: np.ndarray) -> List[Dict[str, Any]]:
+    """Construit les enregistrements du stockage (contenu CRAFT, métadonnées, métriques)"""
+    article_ids = text["article_id"]
+    models = text["ai_model"]
+    global_score = np.nan_to_num(scores["global_score"])
+    priority = np.select([global_score >= threshold for threshold, _ in PRIORITY_THRESHOLDS],
+                         [level for _, level in PRIORITY_THRESHOLDS], default="FAIBLE")
+
+    # ID stable par (article, modèle) : réimporter un fichier remplace les mêmes enregistrements
+    hashes = pd.util.hash_pandas_object(pd.DataFrame({"a": article_ids, "m": models}), index=False)
+    ids = np.char.mod("%016x", hashes.to_numpy())
+
+    titles = text["title"] if "title" in text else article_ids
+    details = [(column, label, text[column]) for column, label in
+               (("entities", "Entités"), ("trends", "Tendances"), ("recommendation", "Recommandation"))
+               if column in text]
+    metadata_columns = [column for column in METADATA_COLUMNS if column in text]
+    score_keys = [key for key in CRITERIA_LABELS if key in scores]
+    base_metrics = default_metrics()
+    base_metrics["focus_area"] = None
+    base_metrics["parser_version"] = PARSER_VERSION
+
+    records = []
+    columns = zip(ids.tolist(), dates.tolist(), titles, priority.tolist(), global_score.tolist(),
+                  _rows([text[column] for column in metadata_columns]),
+                  _rows([np.nan_to_num(scores[key]).tolist() for key in score_keys]),
+                  _rows([values for _, _, values in details]))
+    for analysis_id, date, title, level, score, meta_values, criteria, detail_values in columns:
+        metadata = dict(zip(metadata_columns, meta_values))
+        metrics = dict(base_metrics)
+        metrics.update(zip(score_keys, criteria))
+        metrics["global_score"] = score
+        metrics["priority_level"] = level
+        metrics["ai_model"] = metadata["ai_model"]
+        metrics["focus_area"] = metadata.get("focus_area") or None
+
+        # Contenu au format CRAFT : parse_metrics en retrouve exactement les métriques
+        lines = [f"# 📈 ANALYSE STRATÉGIQUE - {title or metadata['article_id']}", "",
+                 f"**Analyste IA :** {metadata['ai_model']}"]
+        lines += [f"| **{CRITERIA_LABELS[key]}** | {value:g}/10 | |"
+                  for key, value in zip(score_keys, criteria) if value > 0]
+        lines += ["", f"**🎯 SCORE GLOBAL DE PRIORITÉ :** {score:g}/10 - **Niveau : {level}**"]
+        notes = [f"**{label} :** {value}" for (_, label, _), value in zip(details, detail_values) if value]
+        if notes:
+            lines += ["", *notes]
+
+        records.append({"id": analysis_id, "content": "\n".join(lines), "date": date,
+                        "metadata": metadata, "metrics": metrics})
+    return records
+
+
+def _rows(columns: List[Any]):
+    """Tuples ligne à ligne de plusieurs colonnes (tuples vides s'il n'y a aucune colonne)"""
+    return zip(*columns) if columns else itertools.repeat(())
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from data_manager import DataManager
+
+    parser = argparse.ArgumentParser(description="Import massif d'analyses depuis un CSV")
+    parser.add_argument("csv_path")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--backend", default=None, help="json, jsonl ou sqlite (défaut : STORAGE_BACKEND)")
+    parser.add_argument("--rejects", default=None, help="CSV des lignes rejetées")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = DataManager(args.data_dir, args.backend).import_csv(args.csv_path, rejects_path=args.rejects)
+    print(f"{report['imported']} analyse(s) importée(s), {report['rejected']} ligne(s) rejetée(s) "
+          f"en {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,125 @@
+import warnings
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from metrics_parser import CRITERIA
+
+# Axe des critères du tenseur (ordre du tableau de scoring CRAFT)
+CRITERIA_KEYS = list(CRITERIA.values())
+CRITERIA_LABELS = list(CRITERIA.keys())
+
+# Écart (en points sur 10) à la médiane des modèles au-delà duquel un score est aberrant
+OUTLIER_THRESHOLD = 2.0
+
+
+def article_key(analysis: Dict[str, Any]) -> str:
+    """Identifiant de l'article analysé : article_id des métadonnées, sinon le titre de l'analyse"""
+    metadata = analysis.get("metadata") or {}
+    return str(metadata.get("article_id") or analysis.get("title") or analysis["id"])
+
+
+def model_key(analysis: Dict[str, Any]) -> str:
+    metrics = analysis.get("metrics") or {}
+    metadata = analysis.get("metadata") or {}
+    return str(metrics.get("ai_model") or metadata.get("ai_model") or "Inconnu")
+
+
+def build_score_tensor(analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Tenseur articles × modèles × critères (NaN quand un modèle n'a pas analysé un article
+    ou qu'un critère est absent) construit à partir des métriques stockées.
+    Si un même modèle a analysé plusieurs fois un article, la dernière analyse l'emporte.
+    """
+    if not analyses:
+        return {"articles": [], "models": [], "criteria": CRITERIA_KEYS,
+                "scores": np.full((0, 0, len(CRITERIA_KEYS)), np.nan, dtype=np.float32)}
+
+    articles, article_index = np.unique([article_key(a) for a in analyses], return_inverse=True)
+    models, model_index = np.unique([model_key(a) for a in analyses], return_inverse=True)
+    values = np.array(
+        [[(a.get("metrics") or {}).get(key) or np.nan for key in CRITERIA_KEYS] for a in analyses],
+        dtype=np.float32
+    )
+    # Un score de 0 signifie « non trouvé » pour le parseur de métriques
+    values[values <= 0] = np.nan
+
+    scores = np.full((len(articles), len(models), len(CRITERIA_KEYS)), np.nan, dtype=np.float32)
+    # Affectation vectorisée ; pour des indices répétés, la dernière valeur est conservée
+    scores[article_index, model_index] = values
+    return {"articles": articles.tolist(), "models": models.tolist(),
+            "criteria": CRITERIA_KEYS, "scores": scores}
+
+
+def compute_consensus(tensor: Dict[str, Any], article_subset: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Statistiques de consensus et de divergence entre modèles, en un passage vectorisé :
+    - moyenne et dispersion (écart-type entre modèles) par article et par critère ;
+    - consensus par article (1 = modèles identiques, 0 = dispersion maximale) ;
+    - accord par paire de modèles (1 - écart absolu moyen / 10 sur les cellules communes) ;
+    - modèles aberrants : part des scores à plus de OUTLIER_THRESHOLD points de la médiane des modèles.
+    """
+    scores = tensor["scores"]
+    models = tensor["models"]
+    if article_subset is not None:
+        scores = scores[np.isin(np.array(tensor["articles"], dtype=object), list(article_subset))]
+
+    n_articles, n_models, n_criteria = scores.shape
+    present = ~np.isnan(scores)
+    counts = present.sum(axis=1)                                         # (A, C)
+    multi = counts >= 2                                                  # cellules comparables
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        totals = np.where(present, scores, 0).sum(axis=1)
+        mean = np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)                  # (A, C)
+        squares = np.where(present, (scores - mean[:, None, :]) ** 2, 0).sum(axis=1)
+        spread = np.where(multi, np.sqrt(squares / np.maximum(counts, 1)), np.nan)           # (A, C)
+
+        # Écart-type maximal de scores sur [0, 10] : 5
+        article_consensus = 1 - _nanmean(spread, axis=1) / 5                                 # (A,)
+
+        # Accord par paire : différences (A, M, M, C) sur les cellules renseignées des deux côtés
+        diff = np.abs(scores[:, :, None, :] - scores[:, None, :, :])
+        cells = n_articles * n_criteria
+        pair_mad = _nanmean(diff.transpose(1, 2, 0, 3).reshape(n_models, n_models, cells), axis=2)
+        agreement = 1 - pair_mad / 10                                                       # (M, M)
+
+        # Médiane de tous les modèles pour chaque cellule ; avec deux modèles seulement,
+        # rien ne permet de désigner l'aberrant : il en faut au moins trois
+        median = _nanmedian(scores, axis=1)                                                  # (A, C)
+        deviation = np.abs(scores - median[:, None, :])
+        comparable = present & (counts >= 3)[:, None, :]
+        outliers = comparable & (deviation > OUTLIER_THRESHOLD)
+        outlier_rate = outliers.sum(axis=(0, 2)) / np.maximum(comparable.sum(axis=(0, 2)), 1)  # (M,)
+        model_deviation = _nanmean(np.where(comparable, deviation, np.nan).transpose(1, 0, 2)
+                                   .reshape(n_models, cells), axis=1)                        # (M,)
+
+    return {
+        "models": models,
+        "criteria": tensor["criteria"],
+        "n_articles": n_articles,
+        "criterion_mean": _nanmean(mean, axis=0),                        # (C,)
+        "criterion_spread": _nanmean(spread, axis=0),                    # (C,)
+        "model_criterion_mean": _nanmean(scores, axis=0),                # (M, C)
+        "article_consensus": article_consensus,                          # (A,)
+        "agreement": agreement,                                          # (M, M)
+        "outlier_rate": outlier_rate,                                    # (M,)
+        "model_deviation": model_deviation,                              # (M,)
+        "comparable_articles": int(multi.any(axis=1).sum()),
+    }
+
+
+def _nanmean(values: np.ndarray, axis) -> np.ndarray:
+    """np.nanmean sans avertissement pour les tranches entièrement vides (résultat NaN)"""
+    present = ~np.isnan(values)
+    counts = present.sum(axis=axis)
+    totals = np.where(present, values, 0).sum(axis=axis)
+    return np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+
+
+def _nanmedian(values: np.ndarray, axis: int) -> np.ndarray:
+    if values.shape[axis] == 0:
+        return np.full(np.delete(values.shape, axis), np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmedian(values, axis=axis)
@@ -0,0 +1,167 @@
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+# Jeton de validation : (mtime_ns, taille) de chaque fichier du stockage
+ChangeToken = Optional[Tuple[Tuple[int, int], ...]]
+
+Formatter = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+class CorpusSnapshot:
+    """
+    Vue en mémoire du corpus : enregistrements bruts, versions formatées pour
+    l'affichage, index par ID et index trié par date. Les écritures du processus
+    la modifient sur place : un ajout complète les index (insertion par dichotomie
+    dans l'index des dates), une suppression les marque à reconstruire à la
+    prochaine lecture. `version` change à chaque modification.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], formatted: List[Dict[str, Any]]):
+        self.records = records
+        self.formatted = formatted
+        self.version = 0
+        self._lock = threading.RLock()
+        self._positions: Optional[Dict[str, int]] = None
+        self._date_order: Optional[List[int]] = None
+        self._date_keys: Optional[List[str]] = None
+
+    @classmethod
+    def build(cls, records: List[Dict[str, Any]], formatter: Formatter) -> "CorpusSnapshot":
+        return cls(records, [formatter(record) for record in records])
+
+    @property
+    def positions(self) -> Dict[str, int]:
+        with self._lock:
+            if self._positions is None:
+                self._positions = {record["id"]: i for i, record in enumerate(self.records)}
+            return self._positions
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            position = self.positions.get(analysis_id)
+            return None if position is None else self.records[position]
+
+    def get_formatted(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            position = self.positions.get(analysis_id)
+            return None if position is None else self.formatted[position]
+
+    def in_date_range(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Analyses formatées dont la date est dans [start_date, end_date], triées par date"""
+        # Les dates ISO normalisées se comparent correctement comme chaînes
+        start = datetime.fromisoformat(start_date).isoformat()
+        end = datetime.fromisoformat(end_date).isoformat()
+        with self._lock:
+            self._ensure_date_index()
+            low = bisect_left(self._date_keys, start)
+            high = bisect_right(self._date_keys, end)
+            return [self.formatted[i] for i in self._date_order[low:high]]
+
+    def append(self, record: Dict[str, Any], formatted: Dict[str, Any]) -> None:
+        """Ajoute (ou remplace) un enregistrement sans reconstruire les index"""
+        with self._lock:
+            self.remove(record["id"])
+            position = len(self.records)
+            self.records.append(record)
+            self.formatted.append(formatted)
+            if self._positions is not None:
+                self._positions[record["id"]] = position
+            if self._date_keys is not None:
+                # Les nouvelles analyses sont datées de maintenant : insertion en fin dans le cas courant
+                slot = bisect_right(self._date_keys, record["date"])
+                self._date_keys.insert(slot, record["date"])
+                self._date_order.insert(slot, position)
+            self.version += 1
+
+    def remove(self, analysis_id: str) -> None:
+        """Retire un enregistrement ; les index décalés seront reconstruits à la prochaine lecture"""
+        with self._lock:
+            position = self.positions.get(analysis_id)
+            if position is None:
+                return
+            del self.records[position]
+            del self.formatted[position]
+            self._positions = None
+            self._date_order = self._date_keys = None
+            self.version += 1
+
+    def _ensure_date_index(self):
+        if self._date_order is None:
+            self._date_order = sorted(range(len(self.records)), key=lambda i: self.records[i]["date"])
+            self._date_keys = [self.records[i]["date"] for i in self._date_order]
+
+
+class CorpusCache:
+    """
+    Cache en mémoire du corpus d'un stockage, partagé par toutes les sessions du
+    processus. Il est revalidé par un simple stat (mtime + taille) des fichiers :
+    tant que rien n'a changé sur disque, aucune lecture n'a lieu. Les écritures faites
+    par ce processus modifient l'instantané sur place sans relire le fichier.
+    """
+
+    def __init__(self, paths: List[str]):
+        self.paths = paths
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CorpusSnapshot] = None
+        self._token: ChangeToken = None
+        self.loads = 0
+
+    def change_token(self) -> ChangeToken:
+        token = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                token.append((0, -1))
+                continue
+            token.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(token)
+
+    def snapshot(self, loader: Callable[[], List[Dict[str, Any]]], formatter: Formatter) -> CorpusSnapshot:
+        """Retourne l'instantané courant, rechargé si les fichiers ont changé"""
+        token = self.change_token()
+        with self._lock:
+            if self._snapshot is not None and token == self._token:
+                return self._snapshot
+        records = loader()
+        snapshot = CorpusSnapshot.build(records, formatter)
+        with self._lock:
+            self._snapshot, self._token = snapshot, token
+            self.loads += 1
+        return snapshot
+
+    def record_append(self, token_before: ChangeToken, record: Dict[str, Any], formatted: Dict[str, Any]):
+        """Reporte un ajout dans l'instantané (si personne d'autre n'a écrit entre-temps)"""
+        self._apply(token_before, lambda snapshot: snapshot.append(record, formatted))
+
+    def record_delete(self, token_before: ChangeToken, analysis_id: str):
+        """Reporte une suppression dans l'instantané"""
+        self._apply(token_before, lambda snapshot: snapshot.remove(analysis_id))
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot, self._token = None, None
+
+    def _apply(self, token_before: ChangeToken, update: Callable[[CorpusSnapshot], None]):
+        with self._lock:
+            if self._snapshot is not None and token_before == self._token:
+                update(self._snapshot)
+                self._token = self.change_token()
+            else:
+                self._snapshot, self._token = None, None
+
+
+_caches: Dict[Tuple[str, ...], CorpusCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_corpus_cache(paths: List[str]) -> CorpusCache:
+    """Cache du processus associé aux fichiers d'un stockage (créé au premier appel)"""
+    key = tuple(os.path.abspath(path) for path in paths)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = CorpusCache(list(key))
+        return _caches[key]
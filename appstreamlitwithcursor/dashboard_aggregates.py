@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+from typing import List, Dict, Any, Optional, Callable
+
+PRIORITY_LEVELS = ["CRITIQUE", "ÉLEVÉ", "MODÉRÉ", "FAIBLE"]
+
+
+class DashboardAggregates:
+    """
+    Agrégats du tableau de bord tenus à jour à chaque sauvegarde et suppression :
+    nombre d'analyses, somme des scores, compteurs par priorité et anneaux des
+    derniers scores et des dernières analyses. Chaque mise à jour est en O(1).
+
+    L'état est persisté avec le jeton (mtime + taille) du stockage auquel il
+    correspond : au démarrage, s'il est à jour, aucun parcours du corpus n'est
+    nécessaire ; sinon (écriture externe, recalcul des métriques) il est reconstruit.
+    """
+
+    RECENT_SCORES = 10
+    RECENT_ANALYSES = 5
+    # Marge des anneaux pour absorber les suppressions sans reparcourir le corpus
+    RING_CAPACITY = 50
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = self._empty_state()
+
+    def snapshot(self, token, rebuild_source: Callable[[], List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Données du tableau de bord ; reconstruites seulement si le stockage a changé ailleurs"""
+        token = self._normalize(token)
+        with self._lock:
+            if self._state["source_token"] != token:
+                self._state = self._read_file()
+            if self._state["source_token"] != token or self._needs_rebuild():
+                self._rebuild(rebuild_source(), token)
+            return self._to_dashboard()
+
+    def record_add(self, token_before, token_after, analysis: Dict[str, Any]) -> None:
+        """Ajoute une analyse formatée (id, titre, date, métriques) aux agrégats"""
+        self._apply(token_before, token_after, lambda: self._add(analysis))
+
+    def record_delete(self, token_before, token_after, analysis: Dict[str, Any]) -> None:
+        """Retire une analyse formatée des agrégats"""
+        self._apply(token_before, token_after, lambda: self._remove(analysis))
+
+    def _apply(self, token_before, token_after, update: Callable[[], None]):
+        token_before, token_after = self._normalize(token_before), self._normalize(token_after)
+        with self._lock:
+            if self._state["source_token"] != token_before:
+                self._state = self._read_file()
+            if self._state["source_token"] == token_before:
+                update()
+                self._state["source_token"] = token_after
+            else:
+                # Agrégats déjà périmés : reconstruction à la prochaine lecture
+                self._state["source_token"] = None
+            self._write_file()
+
+    def _add(self, analysis: Dict[str, Any]):
+        state = self._state
+        metrics = analysis["metrics"]
+        score = metrics.get("global_score", 0)
+        state["count"] += 1
+        if score > 0:
+            state["score_sum"] += score
+            state["score_count"] += 1
+            state["recent_scores"].append([analysis["id"], score])
+            del state["recent_scores"][:-self.RING_CAPACITY]
+        priority = metrics.get("priority_level", "MODÉRÉ")
+        if priority in state["priorities"]:
+            state["priorities"][priority] += 1
+        state["recent_analyses"].append(self._summary(analysis))
+        del state["recent_analyses"][:-self.RING_CAPACITY]
+
+    def _remove(self, analysis: Dict[str, Any]):
+        state = self._state
+        metrics = analysis["metrics"]
+        score = metrics.get("global_score", 0)
+        state["count"] -= 1
+        if score > 0:
+            state["score_sum"] -= score
+            state["score_count"] -= 1
+        priority = metrics.get("priority_level", "MODÉRÉ")
+        if priority in state["priorities"]:
+            state["priorities"][priority] -= 1
+        state["recent_scores"] = [entry for entry in state["recent_scores"] if entry[0] != analysis["id"]]
+        state["recent_analyses"] = [entry for entry in state["recent_analyses"] if entry["id"] != analysis["id"]]
+
+    def _needs_rebuild(self) -> bool:
+        """Anneaux vidés par des suppressions alors que le corpus contient encore des analyses"""
+        state = self._state
+        return (len(state["recent_scores"]) < min(self.RECENT_SCORES, state["score_count"]) or
+                len(state["recent_analyses"]) < min(self.RECENT_ANALYSES, state["count"]))
+
+    def _rebuild(self, analyses: List[Dict[str, Any]], token):
+        self._state = self._empty_state()
+        for analysis in analyses:
+            self._add(analysis)
+        self._state["source_token"] = token
+        self._write_file()
+
+    @classmethod
+    def empty_dashboard(cls) -> Dict[str, Any]:
+        """Données d'un tableau de bord vide (aucune analyse)"""
+        return cls._to_dashboard_from(cls._empty_state())
+
+    def _to_dashboard(self) -> Dict[str, Any]:
+        return self._to_dashboard_from(self._state)
+
+    @classmethod
+    def _to_dashboard_from(cls, state: Dict[str, Any]) -> Dict[str, Any]:
+        scores = [score for _, score in state["recent_scores"][-cls.RECENT_SCORES:]]
+        average = state["score_sum"] / state["score_count"] if state["score_count"] else 0
+        return {
+            "total_analyses": state["count"],
+            "average_score": round(average, 1),
+            "critical_priorities": state["priorities"]["CRITIQUE"],
+            "estimated_roi": round(state["score_sum"] * 100000, 2),  # €100k par point de score
+            "recent_scores": scores,
+            "priority_distribution": dict(state["priorities"]),
+            "recent_analyses": list(state["recent_analyses"][-cls.RECENT_ANALYSES:])
+        }
+
+    def _summary(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Résumé sans le contenu : l'état persisté reste de taille constante"""
+        return {
+            "id": analysis["id"],
+            "title": analysis.get("title"),
+            "date": analysis["date"],
+            "metrics": {key: analysis["metrics"].get(key)
+                        for key in ("global_score", "priority_level", "ai_model")}
+        }
+
+    def _read_file(self) -> Dict[str, Any]:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Erreur lors du chargement des agrégats: {e}")
+        return self._empty_state()
+
+    def _write_file(self):
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde des agrégats: {e}")
+
+    @staticmethod
+    def _normalize(token) -> Optional[List[List[int]]]:
+        # Forme JSON du jeton, comparable après relecture du fichier
+        return None if token is None else [list(part) for part in token]
+
+    @staticmethod
+    def _empty_state() -> Dict[str, Any]:
+        return {
+            "source_token": None,
+            "count": 0,
+            "score_sum": 0.0,
+            "score_count": 0,
+            "priorities": {level: 0 for level in PRIORITY_LEVELS},
+            "recent_scores": [],
+            "recent_analyses": []
+        }
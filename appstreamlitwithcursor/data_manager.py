@@ -1,16 +1,58 @@
+import csv
+import io
 import json
 import os
+import threading
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-import pandas as pd
+from typing import List, Dict, Any, Optional, Iterator, Union, Tuple
+from storage import create_store
+from metrics_parser import parse_metrics, PARSER_VERSION
+from search_index import SearchIndex
+from near_duplicates import NearDuplicateIndex, minhash_signature, encode_signature, decode_signature
+from corpus_cache import get_corpus_cache, CorpusSnapshot
+from dashboard_aggregates import DashboardAggregates
+from tracing import get_tracer
+from timeseries import TimeSeriesStore
 
 class DataManager:
-    def __init__(self):
-        self.data_dir = "data"
+    # Colonnes des exports tabulaires (CSV, Excel)
+    EXPORT_COLUMNS = ["ID", "Titre", "Date", "Contenu"]
+    EXPORT_CONTENT_CHARS = 500
+    # Nombre d'analyses par morceau produit par iter_export
+    EXPORT_CHUNK_ROWS = 500
+    # Nombre de lignes rejetées détaillées dans le rapport d'import CSV
+    IMPORT_REPORT_ROWS = 100
+    
+    def __init__(self, data_dir: str = "data", storage_backend: Optional[str] = None):
+        self.data_dir = data_dir
         self.analyses_file = os.path.join(self.data_dir, "analyses.json")
         self.config_file = os.path.join(self.data_dir, "config.json")
+        # Ancien fichier des 100 dernières métriques, importé une fois dans metrics_ts/
         self.metrics_file = os.path.join(self.data_dir, "metrics.json")
+        self.metrics_dir = os.path.join(self.data_dir, "metrics_ts")
+        self._metrics_store: Optional[TimeSeriesStore] = None
+        # Vecteurs TF-IDF des analyses (onglet Comparaison), construits au premier usage
+        self._text_similarity = None
+        self._text_similarity_snapshot: Optional[Tuple[CorpusSnapshot, int]] = None
+        self._text_similarity_lock = threading.Lock()
         self.ensure_data_directory()
+        
+        # "json" (historique), "jsonl" (journal en ajout seul) ou "sqlite" (requêtes indexées)
+        self.storage_backend = storage_backend or os.getenv("STORAGE_BACKEND", "json")
+        self.store = create_store(self.storage_backend, self.data_dir,
+                                  title_extractor=self._extract_title_from_analysis,
+                                  metrics_extractor=self._extract_metrics_from_analysis)
+        # Index plein texte BM25 pour les moteurs sans index natif (SQLite utilise FTS5)
+        self.search_index = None if self.store.indexed else SearchIndex(self.data_dir)
+        # Signatures MinHash des articles analysés (metadata["content_minhash"]), tous moteurs
+        self.near_duplicates = NearDuplicateIndex(self.data_dir)
+        # Corpus en mémoire partagé par les sessions du processus, revalidé par mtime + taille
+        self.corpus_cache = get_corpus_cache(self.store.data_files())
+        # Agrégats du tableau de bord mis à jour en O(1) à chaque écriture
+        self.dashboard_aggregates = DashboardAggregates(os.path.join(self.data_dir, "dashboard_aggregates.json"))
+        # Une même instance peut servir toutes les sessions Streamlit (st.cache_resource)
+        self._write_lock = threading.Lock()
+        self.tracer = get_tracer()
     
     def ensure_data_directory(self):
         """Crée le répertoire de données s'il n'existe pas"""
@@ -18,85 +60,163 @@ class DataManager:
             os.makedirs(self.data_dir)
     
     def save_analysis(self, analysis_content: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
-        """Sauvegarde une analyse dans le fichier JSON"""
-        try:
-            # Charger les analyses existantes
-            analyses = self.load_analyses()
-            
-            # Créer un nouvel enregistrement
-            new_analysis = {
-                "id": self._generate_id(),
-                "content": analysis_content,
-                "date": datetime.now().isoformat(),
-                "metadata": metadata or {}
-            }
+        """Sauvegarde une analyse via le moteur de stockage configuré"""
+        with self.tracer.span("save_analysis", backend=self.storage_backend,
+                              content_chars=len(analysis_content)) as span:
+            try:
+                # Créer un nouvel enregistrement (métriques extraites une seule fois, à l'écriture)
+                metadata = metadata or {}
+                new_analysis = {
+                    "id": self._generate_id(),
+                    "content": analysis_content,
+                    "date": datetime.now().isoformat(),
+                    "metadata": metadata,
+                    "metrics": self._build_metrics(analysis_content, metadata)
+                }
+                
+                # Ajouter l'analyse
+                formatted = self._format_analysis(new_analysis)
+                with self._write_lock:
+                    token = self.corpus_cache.change_token()
+                    self.store.append(new_analysis)
+                    self.corpus_cache.record_append(token, new_analysis, formatted)
+                    self.dashboard_aggregates.record_add(token, self.corpus_cache.change_token(), formatted)
+                    self._index_analysis(new_analysis)
+                
+                return True
             
-            # Ajouter l'analyse
-            analyses.append(new_analysis)
-            
-            # Sauvegarder
-            with open(self.analyses_file, 'w', encoding='utf-8') as f:
-                json.dump(analyses, f, ensure_ascii=False, indent=2)
-            
-            return True
-        
-        except Exception as e:
-            print(f"Erreur lors de la sauvegarde de l'analyse: {e}")
-            return False
+            except Exception as e:
+                span.mark_error(e)
+                print(f"Erreur lors de la sauvegarde de l'analyse: {e}")
+                return False
     
     def load_analyses(self) -> List[Dict[str, Any]]:
-        """Charge toutes les analyses depuis le fichier JSON"""
+        """Charge toutes les analyses (depuis le cache du processus si le stockage n'a pas changé)"""
         try:
-            if os.path.exists(self.analyses_file):
-                with open(self.analyses_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
+            return list(self._snapshot().records)
         except Exception as e:
             print(f"Erreur lors du chargement des analyses: {e}")
             return []
     
     def get_all_analyses(self) -> List[Dict[str, Any]]:
         """Récupère toutes les analyses avec formatage pour l'affichage"""
-        analyses = self.load_analyses()
-        formatted_analyses = []
-        
-        for analysis in analyses:
-            # Extraire le titre de l'analyse
-            title = self._extract_title_from_analysis(analysis["content"])
-            
-            formatted_analysis = {
-                "id": analysis["id"],
-                "title": title,
-                "date": analysis["date"],
-                "content": analysis["content"],
-                "metadata": analysis.get("metadata", {})
-            }
-            formatted_analyses.append(formatted_analysis)
-        
-        return formatted_analyses
+        try:
+            return list(self._snapshot().formatted)
+        except Exception as e:
+            print(f"Erreur lors du chargement des analyses: {e}")
+            return []
     
     def get_analysis_by_id(self, analysis_id: str) -> Optional[Dict[str, Any]]:
         """Récupère une analyse spécifique par son ID"""
-        analyses = self.load_analyses()
-        for analysis in analyses:
-            if analysis["id"] == analysis_id:
-                return analysis
-        return None
+        try:
+            if self.store.indexed:
+                # Lecture indexée d'une seule ligne, sans charger le corpus
+                return self.store.get(analysis_id)
+            return self._snapshot().get(analysis_id)
+        except Exception as e:
+            print(f"Erreur lors de la récupération de l'analyse: {e}")
+            return None
     
     def delete_analysis(self, analysis_id: str) -> bool:
-        """Supprime une analyse par son ID"""
+        """Supprime une analyse par son ID (False si elle n'existe pas)"""
         try:
-            analyses = self.load_analyses()
-            analyses = [a for a in analyses if a["id"] != analysis_id]
-            
-            with open(self.analyses_file, 'w', encoding='utf-8') as f:
-                json.dump(analyses, f, ensure_ascii=False, indent=2)
-            
+            with self._write_lock:
+                if self.store.indexed:
+                    # Lecture indexée de la seule ligne supprimée, sans charger le corpus
+                    record = self.store.get(analysis_id)
+                    deleted = None if record is None else self._format_analysis(record)
+                else:
+                    deleted = self._snapshot().get_formatted(analysis_id)
+                if deleted is None:
+                    # ID inconnu : ni écriture, ni mise à jour (donc ni reconstruction) des index dérivés
+                    return False
+                token = self.corpus_cache.change_token()
+                self.store.delete(analysis_id)
+                self.corpus_cache.record_delete(token, analysis_id)
+                self.dashboard_aggregates.record_delete(token, self.corpus_cache.change_token(), deleted)
+                if self.search_index is not None and self.search_index.exists():
+                    self.search_index.remove(analysis_id)
+                if self.near_duplicates.exists():
+                    self.near_duplicates.remove(analysis_id)
             return True
         except Exception as e:
             print(f"Erreur lors de la suppression de l'analyse: {e}")
             return False
     
+    def import_csv(self, csv_path: str, chunk_rows: Optional[int] = None,
+                   rejects_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Import massif d'un CSV d'analyses multi-modèles (article_id, ai_model, strategic_score...),
+        lu par blocs et écrit en une seule opération du moteur de stockage. Retourne un rapport :
+        nombre d'analyses importées, de lignes rejetées et un échantillon des rejets (motif, ligne) ;
+        la liste complète des rejets est écrite dans rejects_path s'il est fourni.
+        """
+        report = {"imported": 0, "rejected": 0, "rejected_rows": []}
+        try:
+            import pandas as pd
+            from bulk_import import read_analyses_csv, CHUNK_ROWS
+            
+            rejected = []
+            
+            def records():
+                for valid, rejects in read_analyses_csv(csv_path, chunk_rows or CHUNK_ROWS):
+                    rejected.append(rejects)
+                    yield from valid
+            
+            with self._write_lock:
+                report["imported"] = self.store.import_records(records(), bulk=True)
+                # Corpus et agrégats sont relus au prochain accès ; l'index est reconstruit en une fois
+                self.corpus_cache.invalidate()
+                if self.search_index is not None and self.search_index.exists():
+                    self.search_index.drop()
+                self.near_duplicates.drop()
+            
+            rejects = pd.concat(rejected, ignore_index=True) if rejected else pd.DataFrame()
+            report["rejected"] = len(rejects)
+            report["rejected_rows"] = rejects.head(self.IMPORT_REPORT_ROWS).to_dict("records")
+            if rejects_path:
+                rejects.to_csv(rejects_path, index=False)
+        except Exception as e:
+            print(f"Erreur lors de l'import CSV: {e}")
+            report["error"] = str(e)
+        return report
+    
+    def backfill_metrics(self, force: bool = False) -> int:
+        """
+        Calcule et stocke les métriques des analyses enregistrées sans métriques ou
+        avec une version antérieure du parseur (toutes si force=True).
+        Retourne le nombre d'analyses mises à jour.
+        """
+        try:
+            # Calcul hors verrou : les sauvegardes ne sont pas bloquées pendant le parsing
+            recomputed = {}
+            for analysis in self.load_analyses():
+                stored_version = analysis.get("metrics", {}).get("parser_version")
+                if force or stored_version != PARSER_VERSION:
+                    recomputed[analysis["id"]] = (analysis["content"],
+                                                  self._build_metrics(analysis["content"],
+                                                                      analysis.get("metadata", {})))
+            if not recomputed:
+                return 0
+            
+            with self._write_lock:
+                # Relecture sous le verrou : les analyses sauvegardées ou supprimées pendant
+                # le calcul sont conservées telles quelles (copies du cache partagé)
+                analyses = [dict(analysis) for analysis in self.load_analyses()]
+                updated = 0
+                for analysis in analyses:
+                    content, metrics = recomputed.get(analysis["id"], (None, None))
+                    if metrics is not None and content == analysis["content"]:
+                        analysis["metrics"] = metrics
+                        updated += 1
+                if updated:
+                    self.store.replace_all(analyses)
+                    self.corpus_cache.invalidate()
+            return updated
+        except Exception as e:
+            print(f"Erreur lors du recalcul des métriques: {e}")
+            return 0
+    
     def save_config(self, config: Dict[str, Any]) -> bool:
         """Sauvegarde la configuration"""
         try:
@@ -119,122 +239,195 @@ class DataManager:
             return self._get_default_config()
     
     def save_metrics(self, metrics: Dict[str, Any]) -> bool:
-        """Sauvegarde les métriques de performance"""
+        """
+        Sauvegarde les métriques de performance (valeurs numériques) dans les séries temporelles :
+        coût constant par valeur, historique agrégé par minute, heure et jour
+        """
         try:
-            # Charger les métriques existantes
-            all_metrics = self.load_metrics()
-            
-            # Ajouter timestamp
-            metrics["timestamp"] = datetime.now().isoformat()
-            
-            # Ajouter les nouvelles métriques
-            all_metrics.append(metrics)
-            
-            # Garder seulement les 100 dernières entrées
-            if len(all_metrics) > 100:
-                all_metrics = all_metrics[-100:]
-            
-            with open(self.metrics_file, 'w', encoding='utf-8') as f:
-                json.dump(all_metrics, f, ensure_ascii=False, indent=2)
-            
+            values = {name: value for name, value in metrics.items()
+                      if isinstance(value, (int, float)) and not isinstance(value, bool)}
+            self.metrics_store.append_many(values)
             return True
         except Exception as e:
             print(f"Erreur lors de la sauvegarde des métriques: {e}")
             return False
     
-    def load_metrics(self) -> List[Dict[str, Any]]:
-        """Charge les métriques de performance"""
+    def load_metrics(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Dernières entrées sauvegardées ({"timestamp", métrique: valeur...}), de la plus ancienne à la plus récente"""
         try:
-            if os.path.exists(self.metrics_file):
-                with open(self.metrics_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
+            # Les valeurs d'un même appel à save_metrics partagent leur horodatage
+            entries: Dict[float, Dict[str, Any]] = {}
+            for timestamp, name, value in self.metrics_store.latest(limit * max(1, len(self.metrics_store.series()))):
+                entries.setdefault(timestamp, {"timestamp": datetime.fromtimestamp(timestamp).isoformat()})[name] = value
+            return list(entries.values())[-limit:]
         except Exception as e:
             print(f"Erreur lors du chargement des métriques: {e}")
             return []
     
+    def query_metrics(self, name: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                      resolution: str = "auto") -> List[Dict[str, Any]]:
+        """
+        Série d'une métrique entre deux dates ISO : points {"timestamp", "count", "sum", "min", "max", "mean"}.
+        resolution : "raw", "minute", "hour", "day" ou "auto" (niveau le plus fin couvrant la plage).
+        """
+        try:
+            start = datetime.fromisoformat(start_date).timestamp() if start_date else None
+            end = datetime.fromisoformat(end_date).timestamp() if end_date else None
+            points = self.metrics_store.query(name, start, end, resolution)
+            for point in points:
+                point["timestamp"] = datetime.fromtimestamp(point["timestamp"]).isoformat()
+            return points
+        except Exception as e:
+            print(f"Erreur lors de la lecture des métriques: {e}")
+            return []
+    
+    @property
+    def metrics_store(self) -> TimeSeriesStore:
+        """Séries temporelles ouvertes au premier usage (anciennes métriques JSON importées une fois)"""
+        if self._metrics_store is None:
+            with self._write_lock:
+                if self._metrics_store is None:
+                    migrate = not os.path.exists(self.metrics_dir) and os.path.exists(self.metrics_file)
+                    store = TimeSeriesStore(self.metrics_dir)
+                    if migrate:
+                        self._migrate_metrics(store)
+                    self._metrics_store = store
+        return self._metrics_store
+    
+    def _migrate_metrics(self, store: TimeSeriesStore):
+        """Importe les entrées de l'ancien metrics.json (laissé en place)"""
+        with open(self.metrics_file, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        for entry in entries:
+            timestamp = entry.get("timestamp")
+            store.append_many({name: value for name, value in entry.items()
+                               if isinstance(value, (int, float)) and not isinstance(value, bool)},
+                              datetime.fromisoformat(timestamp).timestamp() if timestamp else None)
+    
     def get_dashboard_data(self) -> Dict[str, Any]:
-        """Récupère les données pour le dashboard"""
-        analyses = self.get_all_analyses()
-        metrics = self.load_metrics()
+        """Récupère les données pour le dashboard (agrégats incrémentaux, temps constant)"""
+        try:
+            return self.dashboard_aggregates.snapshot(self.corpus_cache.change_token(), self.get_all_analyses)
+        except Exception as e:
+            print(f"Erreur lors du calcul du tableau de bord: {e}")
+            return DashboardAggregates.empty_dashboard()
+    
+    def export_analyses(self, format: str = "json") -> Union[str, bytes]:
+        """
+        Exporte les analyses dans différents formats.
+        JSON et CSV retournent une chaîne ; Excel retourne le contenu du classeur (bytes).
+        Pour de gros corpus, préférer iter_export (JSON, JSONL, CSV) qui ne matérialise rien.
+        """
+        if format.lower() in ("json", "jsonl", "csv"):
+            return "".join(self.iter_export(format))
         
-        # Calculer les statistiques
-        total_analyses = len(analyses)
+        elif format.lower() == "excel":
+            return self.export_excel()
+        
+        else:
+            raise ValueError(f"Format d'export non supporté: {format}")
+    
+    def iter_export(self, format: str = "csv", chunk_rows: Optional[int] = None) -> Iterator[str]:
+        """
+        Produit l'export par morceaux de chunk_rows analyses : la mémoire utilisée
+        ne dépend pas de la taille du corpus (lecture du stockage au fil de l'eau).
+        """
+        format = format.lower()
+        chunk_rows = chunk_rows or self.EXPORT_CHUNK_ROWS
+        if format not in ("json", "jsonl", "csv"):
+            raise ValueError(f"Format d'export non supporté: {format}")
         
-        # Scores moyens
-        scores = []
-        priorities = {"CRITIQUE": 0, "ÉLEVÉ": 0, "MODÉRÉ": 0, "FAIBLE": 0}
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if format == "csv":
+            writer.writerow(self.EXPORT_COLUMNS)
+        elif format == "json":
+            buffer.write("[")
         
-        for analysis in analyses:
-            # Extraire les scores de l'analyse
-            extracted_metrics = self._extract_metrics_from_analysis(analysis["content"])
-            if extracted_metrics["global_score"] > 0:
-                scores.append(extracted_metrics["global_score"])
+        rows = 0
+        for record in self.store.iter_all():
+            analysis = self._format_analysis(record)
+            if format == "csv":
+                writer.writerow(self._export_row(analysis))
+            elif format == "jsonl":
+                buffer.write(json.dumps(analysis, ensure_ascii=False) + "\n")
+            else:
+                item = json.dumps(analysis, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+                buffer.write(("\n  " if rows == 0 else ",\n  ") + item)
+            rows += 1
             
-            # Compter les priorités
-            priority = extracted_metrics.get("priority_level", "MODÉRÉ")
-            if priority in priorities:
-                priorities[priority] += 1
+            if rows % chunk_rows == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
         
-        avg_score = sum(scores) / len(scores) if scores else 0
+        if format == "json":
+            buffer.write("\n]" if rows else "]")
+        if buffer.tell():
+            yield buffer.getvalue()
+    
+    def export_excel(self) -> bytes:
+        """
+        Classeur Excel construit en mémoire avec le mode write_only d'openpyxl
+        (lignes écrites au fil de l'eau), sans fichier partagé entre utilisateurs.
+        """
+        from openpyxl import Workbook
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
         
-        # Évolution des scores (dernières 10 analyses)
-        recent_scores = scores[-10:] if len(scores) >= 10 else scores
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Analyses")
+        sheet.append(self.EXPORT_COLUMNS)
+        for record in self.store.iter_all():
+            row = self._export_row(self._format_analysis(record))
+            # Les caractères de contrôle sont refusés par le format XLSX
+            sheet.append([ILLEGAL_CHARACTERS_RE.sub("", value) for value in row])
         
-        # ROI estimé (simulation basée sur les scores)
-        estimated_roi = sum(scores) * 100000 if scores else 0  # €100k par point de score
+        output = io.BytesIO()
+        workbook.save(output)
+        return output.getvalue()
+    
+    def export_analytics(self, output_dir: Optional[str] = None, format: str = "parquet") -> int:
+        """
+        Export analytique colonnaire (Parquet, ou Arrow IPC avec format="arrow") partitionné
+        par mois, lisible avec analytics_export.read_analytics. Retourne le nombre d'analyses.
+        """
+        from analytics_export import write_analytics
         
-        dashboard_data = {
-            "total_analyses": total_analyses,
-            "average_score": round(avg_score, 1),
-            "critical_priorities": priorities["CRITIQUE"],
-            "estimated_roi": estimated_roi,
-            "recent_scores": recent_scores,
-            "priority_distribution": priorities,
-            "recent_analyses": analyses[-5:] if len(analyses) >= 5 else analyses
+        output_dir = output_dir or os.path.join(self.data_dir, f"analytics_{format.lower()}")
+        analyses = (self._format_analysis(record) for record in self.store.iter_all())
+        return write_analytics(analyses, output_dir, format)
+    
+    def _export_row(self, analysis: Dict[str, Any]) -> List[str]:
+        """Ligne d'export tabulaire (contenu tronqué à EXPORT_CONTENT_CHARS caractères)"""
+        content = analysis["content"]
+        if len(content) > self.EXPORT_CONTENT_CHARS:
+            content = content[:self.EXPORT_CONTENT_CHARS] + "..."
+        return [analysis["id"], analysis["title"], analysis["date"], content]
+    
+    def _format_analysis(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Formate un enregistrement pour l'affichage (ajout du titre)"""
+        return {
+            "id": analysis["id"],
+            "title": self._extract_title_from_analysis(analysis["content"]),
+            "date": analysis["date"],
+            "content": analysis["content"],
+            "metadata": analysis.get("metadata", {}),
+            "metrics": self._get_metrics(analysis)
         }
-        
-        return dashboard_data
     
-    def export_analyses(self, format: str = "json") -> str:
-        """Exporte les analyses dans différents formats"""
-        analyses = self.get_all_analyses()
-        
-        if format.lower() == "json":
-            return json.dumps(analyses, ensure_ascii=False, indent=2)
-        
-        elif format.lower() == "csv":
-            # Convertir en DataFrame pour export CSV
-            df_data = []
-            for analysis in analyses:
-                df_data.append({
-                    "ID": analysis["id"],
-                    "Titre": analysis["title"],
-                    "Date": analysis["date"],
-                    "Contenu": analysis["content"][:500] + "..." if len(analysis["content"]) > 500 else analysis["content"]
-                })
-            
-            df = pd.DataFrame(df_data)
-            return df.to_csv(index=False)
-        
-        elif format.lower() == "excel":
-            # Créer un fichier Excel temporaire
-            df_data = []
-            for analysis in analyses:
-                df_data.append({
-                    "ID": analysis["id"],
-                    "Titre": analysis["title"],
-                    "Date": analysis["date"],
-                    "Contenu": analysis["content"][:500] + "..." if len(analysis["content"]) > 500 else analysis["content"]
-                })
-            
-            df = pd.DataFrame(df_data)
-            excel_file = os.path.join(self.data_dir, "analyses_export.xlsx")
-            df.to_excel(excel_file, index=False)
-            return excel_file
-        
-        else:
-            raise ValueError(f"Format d'export non supporté: {format}")
+    def _build_metrics(self, analysis_content: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Métriques structurées stockées avec l'analyse (scores, priorité, modèle, domaine)"""
+        metrics = self._extract_metrics_from_analysis(analysis_content)
+        metrics["ai_model"] = metadata.get("ai_model") or metrics["ai_model"]
+        metrics["focus_area"] = metadata.get("focus_area")
+        metrics["parser_version"] = PARSER_VERSION
+        return metrics
+    
+    def _get_metrics(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Métriques d'une analyse : celles stockées, sinon extraites du texte (anciens enregistrements)"""
+        if "metrics" in analysis:
+            return analysis["metrics"]
+        return self._build_metrics(analysis["content"], analysis.get("metadata", {}))
     
     def _generate_id(self) -> str:
         """Génère un ID unique pour une analyse"""
@@ -253,47 +446,7 @@ class DataManager:
     
     def _extract_metrics_from_analysis(self, analysis_content: str) -> Dict[str, Any]:
         """Extrait les métriques d'une analyse"""
-        import re
-        
-        metrics = {
-            "global_score": 0.0,
-            "priority_level": "MODÉRÉ",
-            "impact_score": 0.0,
-            "urgency_score": 0.0,
-            "complexity_score": 0.0,
-            "risk_score": 0.0,
-            "reliability_score": 0.0
-        }
-        
-        try:
-            # Extraction du score global
-            global_score_match = re.search(r'SCORE GLOBAL DE PRIORITÉ :\s*([\d.]+)/10', analysis_content)
-            if global_score_match:
-                metrics["global_score"] = float(global_score_match.group(1))
-            
-            # Extraction du niveau de priorité
-            priority_match = re.search(r'Niveau :\s*([A-ZÉ]+)', analysis_content)
-            if priority_match:
-                metrics["priority_level"] = priority_match.group(1)
-            
-            # Extraction des scores individuels
-            score_patterns = {
-                "impact_score": r'Impact Business.*?(\d+(?:\.\d+)?)/10',
-                "urgency_score": r'Urgence Temporelle.*?(\d+(?:\.\d+)?)/10',
-                "complexity_score": r'Complexité Exécution.*?(\d+(?:\.\d+)?)/10',
-                "risk_score": r'Risque Concurrentiel.*?(\d+(?:\.\d+)?)/10',
-                "reliability_score": r'Fiabilité Source.*?(\d+(?:\.\d+)?)/10'
-            }
-            
-            for key, pattern in score_patterns.items():
-                match = re.search(pattern, analysis_content, re.DOTALL)
-                if match:
-                    metrics[key] = float(match.group(1))
-        
-        except Exception as e:
-            print(f"Erreur lors de l'extraction des métriques: {e}")
-        
-        return metrics
+        return parse_metrics(analysis_content)
     
     def _get_default_config(self) -> Dict[str, Any]:
         """Retourne la configuration par défaut"""
@@ -312,43 +465,207 @@ class DataManager:
             }
         }
     
-    def search_analyses(self, query: str) -> List[Dict[str, Any]]:
-        """Recherche dans les analyses"""
-        analyses = self.get_all_analyses()
-        results = []
+    def search_analyses(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Recherche plein texte classée par pertinence (BM25), insensible aux accents.
+        Tous les termes doivent être présents ; « term* » recherche un préfixe.
+        """
+        if self.store.indexed:
+            return [self._format_analysis(a) for a in self.store.search(query, limit)]
+        
+        try:
+            self._ensure_search_index()
+            hits = self.search_index.search(query, limit)
+            snapshot = self._snapshot()
+        except Exception as e:
+            print(f"Erreur lors de la recherche: {e}")
+            return []
         
-        query_lower = query.lower()
+        results = [snapshot.get_formatted(analysis_id) for analysis_id, _ in hits]
+        return [analysis for analysis in results if analysis is not None]
+    
+    def rebuild_search_index(self) -> int:
+        """Reconstruit l'index plein texte depuis le stockage ; retourne le nombre d'analyses indexées"""
+        if self.search_index is None:
+            return 0
+        analyses = self.load_analyses()
+        self.search_index.rebuild([(analysis["id"], analysis["content"]) for analysis in analyses])
+        return len(analyses)
+    
+    def _ensure_search_index(self):
+        """Construit l'index au premier usage (données antérieures à l'index)"""
+        if not self.search_index.exists():
+            self.rebuild_search_index()
+    
+    def _index_analysis(self, analysis: Dict[str, Any]):
+        """Met à jour les index dérivés ; sans index existant, il sera construit au prochain usage"""
+        if self.search_index is not None and self.search_index.exists():
+            self.search_index.add(analysis["id"], analysis["content"])
+        signature = self._signature_of(analysis)
+        if signature is not None and self.near_duplicates.exists():
+            self.near_duplicates.add(analysis["id"], signature)
+    
+    def find_near_duplicates(self, signature: bytes, ai_model: Optional[str] = None,
+                             threshold: Optional[float] = None,
+                             parameters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Analyses d'articles quasi identiques à celui de signature MinHash signature
+        (near_duplicates.minhash_signature), de la plus proche à la plus lointaine,
+        restreintes à ai_model s'il est fourni et, si parameters l'est, aux analyses dont les
+        métadonnées portent les mêmes valeurs (focus_area, weights...). La similarité estimée
+        est dans "similarity".
+        """
+        try:
+            if not self.near_duplicates.exists():
+                self.rebuild_near_duplicates()
+            matches = self.near_duplicates.find(signature, threshold)
+            snapshot = self._snapshot()
+        except Exception as e:
+            print(f"Erreur lors de la recherche de doublons: {e}")
+            return []
         
-        for analysis in analyses:
-            if (query_lower in analysis["title"].lower() or 
-                query_lower in analysis["content"].lower()):
-                results.append(analysis)
+        duplicates = []
+        for analysis_id, similarity in matches:
+            analysis = snapshot.get_formatted(analysis_id)
+            if analysis is None:
+                continue
+            if ai_model and analysis["metadata"].get("ai_model") != ai_model:
+                continue
+            if parameters and any(not self._same_parameter(analysis["metadata"].get(name), value)
+                                  for name, value in parameters.items()):
+                continue
+            duplicates.append(dict(analysis, similarity=similarity))
+        return duplicates
+    
+    def find_reusable_analysis(self, content: str, ai_model: str, focus_area: str, urgency_level: str,
+                               company_size: str, weights: List[float]) -> Optional[Dict[str, Any]]:
+        """
+        Analyse déjà enregistrée d'un article quasi identique à content (la plus proche,
+        similarité dans "similarity"), faite avec le même modèle et les mêmes paramètres
+        d'analyse, à réutiliser au lieu d'un nouvel appel au fournisseur ; None s'il n'y en a pas.
+        """
+        signature = minhash_signature(content)
+        if signature is None:
+            return None
+        parameters = {"focus_area": focus_area, "urgency_level": urgency_level,
+                      "company_size": company_size, "weights": weights}
+        duplicates = self.find_near_duplicates(signature, ai_model=ai_model, parameters=parameters)
+        return duplicates[0] if duplicates else None
+    
+    @staticmethod
+    def _same_parameter(stored: Any, expected: Any) -> bool:
+        """Égalité d'un paramètre d'analyse enregistré ; les pondérations sont comparées en nombres"""
+        if isinstance(expected, (list, tuple)):
+            try:
+                return (stored is not None and len(stored) == len(expected) and
+                        all(float(a) == float(b) for a, b in zip(stored, expected)))
+            except (TypeError, ValueError):
+                return False
+        return stored == expected
+    
+    def near_duplicate_metadata(self, content: str) -> Dict[str, Any]:
+        """
+        Métadonnées à enregistrer avec l'analyse d'un nouvel article : sa signature MinHash
+        (content_minhash) et, s'il reprend un article déjà analysé, le lien vers l'analyse la
+        plus proche (duplicate_of) et l'article_id de celle-ci pour la comparaison multi-IA.
+        """
+        signature = minhash_signature(content)
+        if signature is None:
+            return {}
+        metadata = {"content_minhash": encode_signature(signature)}
+        duplicates = self.find_near_duplicates(signature)
+        if duplicates:
+            metadata["duplicate_of"] = duplicates[0]["id"]
+            if duplicates[0]["metadata"].get("article_id"):
+                metadata["article_id"] = duplicates[0]["metadata"]["article_id"]
+        return metadata
+    
+    def rebuild_near_duplicates(self) -> int:
+        """Reconstruit l'index des quasi-doublons depuis le stockage ; retourne le nombre d'analyses indexées"""
+        signatures = []
+        for analysis in self.load_analyses():
+            signature = self._signature_of(analysis)
+            if signature is not None:
+                signatures.append((analysis["id"], signature))
+        self.near_duplicates.rebuild(signatures)
+        return len(signatures)
+    
+    @staticmethod
+    def _signature_of(analysis: Dict[str, Any]) -> Optional[bytes]:
+        """Signature de l'article analysé, enregistrée par l'interface avec l'analyse"""
+        signature = (analysis.get("metadata") or {}).get("content_minhash")
+        try:
+            return decode_signature(signature) if signature else None
+        except (TypeError, ValueError):
+            return None
+    
+    def text_similarity_matrix(self, analysis_ids: List[str]) -> Dict[str, Any]:
+        """
+        Similarité textuelle (cosinus TF-IDF des sections de synthèse et de recommandations)
+        entre les analyses analysis_ids : {"ids": ids retenus, "matrix": matrice carrée}.
+        Seules les analyses arrivées depuis l'appel précédent sont vectorisées.
+        """
+        try:
+            ids, matrix = self._synced_text_similarity().similarity_matrix(analysis_ids)
+            return {"ids": ids, "matrix": matrix}
+        except Exception as e:
+            print(f"Erreur lors du calcul de similarité textuelle: {e}")
+            return {"ids": [], "matrix": None}
+    
+    def _synced_text_similarity(self):
+        """Index TF-IDF aligné sur l'instantané courant du corpus (ajouts et suppressions seulement)"""
+        from text_similarity import TextSimilarityIndex
         
-        return results
+        snapshot = self._snapshot()
+        with self._text_similarity_lock:
+            if self._text_similarity is None:
+                self._text_similarity = TextSimilarityIndex()
+            index = self._text_similarity
+            # L'instantané est modifié sur place par les écritures : sa version signale un changement
+            state = (snapshot, snapshot.version)
+            if state != self._text_similarity_snapshot:
+                records = list(snapshot.records)
+                current = {record["id"] for record in records}
+                for analysis_id in index.ids():
+                    if analysis_id not in current:
+                        index.remove(analysis_id)
+                index.add_many((record["id"], record["content"]) for record in records
+                               if record["id"] not in index)
+                self._text_similarity_snapshot = state
+        return index
     
     def get_analyses_by_priority(self, priority: str) -> List[Dict[str, Any]]:
         """Filtre les analyses par niveau de priorité"""
+        if self.store.indexed:
+            return [self._format_analysis(a) for a in self.store.find_by_priority(priority)]
+        
         analyses = self.get_all_analyses()
         filtered_analyses = []
         
         for analysis in analyses:
-            extracted_metrics = self._extract_metrics_from_analysis(analysis["content"])
-            if extracted_metrics["priority_level"] == priority:
+            if analysis["metrics"]["priority_level"] == priority:
                 filtered_analyses.append(analysis)
         
         return filtered_analyses
     
     def get_analyses_by_date_range(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
         """Filtre les analyses par plage de dates"""
-        analyses = self.get_all_analyses()
-        filtered_analyses = []
+        if self.store.indexed:
+            return [self._format_analysis(a) for a in self.store.find_by_date_range(start_date, end_date)]
         
-        start_dt = datetime.fromisoformat(start_date)
-        end_dt = datetime.fromisoformat(end_date)
-        
-        for analysis in analyses:
-            analysis_dt = datetime.fromisoformat(analysis["date"])
-            if start_dt <= analysis_dt <= end_dt:
-                filtered_analyses.append(analysis)
-        
-        return filtered_analyses 
\ No newline at end of file
+        # Recherche dichotomique dans l'index trié par date du corpus en cache
+        return self._snapshot().in_date_range(start_date, end_date)
+    
+    def corpus_version(self):
+        """Jeton qui change à chaque écriture du stockage (clé des caches de l'interface)"""
+        return self.corpus_cache.change_token()
+    
+    def _snapshot(self) -> CorpusSnapshot:
+        """Instantané du corpus en mémoire (relu seulement si les fichiers ont changé)"""
+        return self.corpus_cache.snapshot(self.store.load_all, self._format_analysis)
+
+
+if __name__ == "__main__":
+    # Recalcul unique des métriques des analyses déjà enregistrées
+    updated = DataManager().backfill_metrics()
+    print(f"Métriques calculées pour {updated} analyse(s)")
@@ -0,0 +1,46 @@
+import json
+import os
+import threading
+from typing import List, Dict, Any
+
+
+class OperationJournal:
+    """
+    Journal d'opérations en ajout seul (une ligne JSON par opération) pour les index
+    dérivés des analyses. Il complète un instantané : au chargement, on relit
+    l'instantané puis on rejoue le journal, que l'on vide à chaque nouvel instantané.
+    Les index pouvant être reconstruits depuis le stockage, pas de fsync ici.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, operation: Dict[str, Any]) -> None:
+        line = json.dumps(operation, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+    def read(self) -> List[Dict[str, Any]]:
+        """Retourne les opérations journalisées (une ligne tronquée en fin de fichier est ignorée)"""
+        operations = []
+        if not os.path.exists(self.path):
+            return operations
+        with self._lock:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        operations.append(json.loads(line))
+                    except ValueError:
+                        continue
+        return operations
+
+    def reset(self) -> None:
+        """Vide le journal (après l'écriture d'un instantané)"""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
@@ -0,0 +1,330 @@
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Dict, Any, Optional, Callable
+from urllib.parse import urlsplit
+
+# Taille minimale d'un préfixe mis en cache (1024 tokens chez les deux fournisseurs)
+MIN_CACHEABLE_TOKENS = 1024
+
+DEFAULT_REPLY = """# 📈 ANALYSE STRATÉGIQUE - Réponse du serveur de test
+**🗓️ Date d'Analyse :** 2024-01-01 00:00 | **🔍 Analyste IA :** Stub
+
+| **Impact Business** | 7/10 | Test |
+
+**🎯 SCORE GLOBAL DE PRIORITÉ :** 7.0/10 - **Niveau : ÉLEVÉ**
+"""
+
+
+# Corps d'erreur renvoyés par chaque API pour un code HTTP injecté
+ANTHROPIC_ERROR_TYPES = {429: "rate_limit_error", 500: "api_error", 529: "overloaded_error"}
+OPENAI_ERROR_TYPES = {429: "rate_limit_exceeded", 500: "server_error"}
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    # File d'attente large : les mesures ouvrent des dizaines de connexions simultanées
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def count_tokens(text: str) -> int:
+    """Approximation des tokens (≈ 4 caractères par token), comme StrategicAnalyzer._estimate_tokens"""
+    return max(1, len(text) // 4)
+
+
+def latency_sampler(spec: str, rng: random.Random) -> Callable[[], float]:
+    """
+    Tirage d'une latence en secondes à partir d'une description textuelle :
+    "0.2" ou "fixed:0.2", "uniform:0.1,0.5", "normal:moyenne,écart-type",
+    "lognormal:médiane,sigma" (queue longue, proche des latences réelles), "exp:moyenne".
+    """
+    kind, _, params = spec.partition(":") if ":" in spec else ("fixed", "", spec)
+    values = [float(v) for v in params.split(",") if v.strip()]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        mu = math.log(values[0])
+        return lambda: rng.lognormvariate(mu, values[1])
+    if kind == "exp":
+        return lambda: rng.expovariate(1 / values[0]) if values[0] > 0 else 0.0
+    raise ValueError(f"Distribution de latence inconnue: {spec}")
+
+
+class StubLLMServer:
+    """
+    Serveur HTTP local qui imite les API Anthropic (/v1/messages) et OpenAI
+    (/v1/chat/completions), en réponse complète ou en flux SSE, sans réseau ni clé.
+
+    Il enregistre chaque requête reçue et simule le cache de prompt des fournisseurs :
+    un préfixe déjà vu (bloc système marqué cache_control chez Anthropic, message système
+    chez OpenAI) est compté en tokens lus depuis le cache dans l'usage renvoyé.
+
+    Pour les mesures de performance, chaque réponse attend une latence initiale tirée de
+    `latency` (voir latency_sampler), puis produit ses tokens au rythme de `tokens_per_second`
+    (0 = instantané). Une fraction `error_rate` des requêtes échoue avec un code tiré de
+    `error_codes`, dans le format d'erreur de l'API imitée (Retry-After sur les 429).
+    Ces paramètres peuvent être modifiés entre deux mesures via configure().
+    """
+
+    def __init__(self, reply: str = DEFAULT_REPLY, host: str = "127.0.0.1", port: int = 0,
+                 latency: str = "0", tokens_per_second: float = 0.0, error_rate: float = 0.0,
+                 error_codes: Optional[List[int]] = None, seed: Optional[int] = None,
+                 record_requests: bool = True):
+        self.reply = reply
+        self.record_requests = record_requests
+        self._rng = random.Random(seed)
+        self.configure(latency=latency, tokens_per_second=tokens_per_second,
+                       error_rate=error_rate, error_codes=error_codes or [429, 500, 503])
+        self.requests: List[Dict[str, Any]] = []
+        self.served = 0
+        self.failed = 0
+        self._cached_prefixes = set()
+        self._lock = threading.Lock()
+        self._server = _StubHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def configure(self, latency: Optional[str] = None, tokens_per_second: Optional[float] = None,
+                  error_rate: Optional[float] = None, error_codes: Optional[List[int]] = None):
+        """Modifie le profil de latence, de débit ou d'erreurs (None = inchangé)"""
+        if latency is not None:
+            self.latency = latency
+            self._sample_latency = latency_sampler(latency, self._rng)
+        if tokens_per_second is not None:
+            self.tokens_per_second = tokens_per_second
+        if error_rate is not None:
+            self.error_rate = error_rate
+        if error_codes is not None:
+            self.error_codes = list(error_codes)
+
+    def _draw(self):
+        """Latence initiale et éventuel code d'erreur de la prochaine réponse"""
+        with self._lock:
+            delay = self._sample_latency()
+            failing = self.error_rate > 0 and self._rng.random() < self.error_rate
+            status = self._rng.choice(self.error_codes) if failing else None
+            if failing:
+                self.failed += 1
+            else:
+                self.served += 1
+        return delay, status
+
+    def _generation_time(self, text: str) -> float:
+        return count_tokens(text) / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _cache_lookup(self, provider: str, prefix: str) -> Dict[str, int]:
+        """Tokens du préfixe lus depuis le cache (déjà vu) ou écrits dans le cache (premier passage)"""
+        tokens = count_tokens(prefix) if prefix else 0
+        if tokens < MIN_CACHEABLE_TOKENS:
+            return {"read": 0, "created": 0, "uncached": tokens}
+        digest = hashlib.sha256(f"{provider}\n{prefix}".encode("utf-8")).hexdigest()
+        with self._lock:
+            hit = digest in self._cached_prefixes
+            self._cached_prefixes.add(digest)
+        return {"read": tokens if hit else 0, "created": 0 if hit else tokens, "uncached": 0}
+
+    def _anthropic_usage(self, body: Dict[str, Any]) -> Dict[str, int]:
+        system = body.get("system") or []
+        if isinstance(system, str):
+            system = [{"type": "text", "text": system}]
+        # Le préfixe mis en cache s'arrête au dernier bloc marqué cache_control
+        marked = [i for i, block in enumerate(system) if block.get("cache_control")]
+        cut = marked[-1] + 1 if marked else 0
+        cache = self._cache_lookup("anthropic", "".join(block["text"] for block in system[:cut]))
+        rest = "".join(block["text"] for block in system[cut:])
+        rest += "".join(message["content"] if isinstance(message["content"], str) else
+                        "".join(part.get("text", "") for part in message["content"])
+                        for message in body.get("messages", []))
+        return {
+            "input_tokens": cache["uncached"] + count_tokens(rest),
+            "cache_creation_input_tokens": cache["created"],
+            "cache_read_input_tokens": cache["read"],
+            "output_tokens": count_tokens(self.reply),
+        }
+
+    def _openai_usage(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        messages = body.get("messages", [])
+        # Cache automatique du préfixe : ici, les messages système en tête de conversation
+        prefix = "".join(m["content"] for m in messages if m["role"] == "system")
+        cache = self._cache_lookup("openai", prefix)
+        prompt_tokens = sum(count_tokens(m["content"]) for m in messages)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": count_tokens(self.reply),
+            "total_tokens": prompt_tokens + count_tokens(self.reply),
+            "prompt_tokens_details": {"cached_tokens": cache["read"]},
+        }
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                path = urlsplit(self.path).path
+                if stub.record_requests:
+                    with stub._lock:
+                        stub.requests.append({"path": path, "headers": dict(self.headers), "body": body})
+
+                delay, error_status = stub._draw()
+                time.sleep(delay)
+                if error_status is not None:
+                    self._error(path, error_status)
+                elif path.endswith("/messages"):
+                    usage = stub._anthropic_usage(body)
+                    if body.get("stream"):
+                        self._stream(self._anthropic_events(body, usage))
+                    else:
+                        time.sleep(stub._generation_time(stub.reply))
+                        self._json(self._anthropic_message(body, usage))
+                elif path.endswith("/chat/completions"):
+                    usage = stub._openai_usage(body)
+                    if body.get("stream"):
+                        self._stream(self._openai_chunks(body, usage))
+                    else:
+                        time.sleep(stub._generation_time(stub.reply))
+                        self._json(self._openai_completion(body, usage))
+                else:
+                    self._json({"error": {"message": f"Route inconnue: {self.path}"}}, status=404)
+
+            def _error(self, path: str, status: int):
+                message = f"Erreur injectée par le serveur de test ({status})"
+                if path.endswith("/messages"):
+                    payload = {"type": "error", "error": {
+                        "type": ANTHROPIC_ERROR_TYPES.get(status, "api_error"), "message": message}}
+                else:
+                    payload = {"error": {"message": message, "param": None, "code": None,
+                                         "type": OPENAI_ERROR_TYPES.get(status, "server_error")}}
+                headers = {"Retry-After": "1"} if status == 429 else {}
+                self._json(payload, status=status, headers=headers)
+
+            def _json(self, payload: Dict[str, Any], status: int = 200,
+                      headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, events):
+                # Flux SSE en transfert chunked : la connexion reste réutilisable
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for event in events:
+                    data = event.encode("utf-8")
+                    self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _anthropic_message(self, body, usage):
+                return {
+                    "id": f"msg_{uuid.uuid4().hex[:24]}", "type": "message", "role": "assistant",
+                    "model": body.get("model"), "content": [{"type": "text", "text": stub.reply}],
+                    "stop_reason": "end_turn", "stop_sequence": None, "usage": usage,
+                }
+
+            def _anthropic_events(self, body, usage):
+                message = self._anthropic_message(body, dict(usage, output_tokens=1))
+                message["content"], message["stop_reason"] = [], None
+
+                def event(name, payload):
+                    return f"event: {name}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+                yield event("message_start", {"type": "message_start", "message": message})
+                yield event("content_block_start", {"type": "content_block_start", "index": 0,
+                                                    "content_block": {"type": "text", "text": ""}})
+                for line in stub.reply.splitlines(keepends=True):
+                    time.sleep(stub._generation_time(line))
+                    yield event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                        "delta": {"type": "text_delta", "text": line}})
+                yield event("content_block_stop", {"type": "content_block_stop", "index": 0})
+                yield event("message_delta", {"type": "message_delta",
+                                              "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                              "usage": {"output_tokens": usage["output_tokens"]}})
+                yield event("message_stop", {"type": "message_stop"})
+
+            def _openai_completion(self, body, usage):
+                return {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:24]}", "object": "chat.completion",
+                    "created": int(time.time()), "model": body.get("model"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": stub.reply}}],
+                    "usage": usage,
+                }
+
+            def _openai_chunks(self, body, usage):
+                base = {"id": f"chatcmpl-{uuid.uuid4().hex[:24]}", "object": "chat.completion.chunk",
+                        "created": int(time.time()), "model": body.get("model")}
+                for line in stub.reply.splitlines(keepends=True):
+                    time.sleep(stub._generation_time(line))
+                    choice = {"index": 0, "delta": {"content": line}, "finish_reason": None}
+                    yield f"data: {json.dumps(dict(base, choices=[choice]), ensure_ascii=False)}\n\n"
+                final = {"index": 0, "delta": {}, "finish_reason": "stop"}
+                yield f"data: {json.dumps(dict(base, choices=[final]))}\n\n"
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    yield f"data: {json.dumps(dict(base, choices=[], usage=usage))}\n\n"
+                yield "data: [DONE]\n\n"
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serveur local imitant les API Anthropic et OpenAI")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="0",
+                        help='Latence initiale : "0.2", "uniform:0.1,0.5", "lognormal:0.3,0.5", "exp:0.2"')
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Débit de génération (0 = instantané)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction des requêtes en erreur")
+    parser.add_argument("--error-codes", default="429,500,503", help="Codes HTTP injectés")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = StubLLMServer(port=args.port, latency=args.latency, tokens_per_second=args.tokens_per_second,
+                           error_rate=args.error_rate, seed=args.seed, record_requests=False,
+                           error_codes=[int(code) for code in args.error_codes.split(",")])
+    print(f"Serveur de test sur {server.url} (ANTHROPIC_BASE_URL={server.url}, OPENAI_BASE_URL={server.url}/v1)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
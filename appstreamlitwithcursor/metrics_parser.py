@@ -0,0 +1,92 @@
+import re
+from typing import Dict, Any
+
+# Version du parseur : les métriques stockées avec une version antérieure sont recalculées
+PARSER_VERSION = 2
+
+# Libellés des critères du tableau de scoring CRAFT -> clé de métrique
+CRITERIA = {
+    "Impact Business": "impact_score",
+    "Urgence Temporelle": "urgency_score",
+    "Complexité Exécution": "complexity_score",
+    "Risque Concurrentiel": "risk_score",
+    "Fiabilité Source": "reliability_score"
+}
+
+# Motifs compilés une fois. Aucun ne traverse les lignes ni ne contient de « .*? » :
+# chaque ligne est examinée en temps linéaire, donc le document entier aussi.
+_LABEL_PATTERN = re.compile("|".join(re.escape(label) for label in CRITERIA))
+# Le lookbehind empêche de redémarrer au milieu d'une suite de chiffres (pas de retour quadratique)
+_SCORE_PATTERN = re.compile(r"(?<![\d.])(\d+(?:\.\d+)?)\s*/\s*10(?!\d)")
+_GLOBAL_PATTERN = re.compile(r"SCORE GLOBAL DE PRIORITÉ\s*:[\s*\[]*(\d+(?:\.\d+)?)\s*/\s*10")
+_PRIORITY_PATTERN = re.compile(r"Niveau :\s*\**\s*\[?([A-ZÉ]+)")
+_MODEL_PATTERN = re.compile(r"Analyste IA :\**\s*([^|*\n]+)")
+
+
+def default_metrics() -> Dict[str, Any]:
+    """Métriques par défaut quand l'analyse ne contient pas de scoring exploitable"""
+    return {
+        "global_score": 0.0,
+        "priority_level": "MODÉRÉ",
+        "impact_score": 0.0,
+        "urgency_score": 0.0,
+        "complexity_score": 0.0,
+        "risk_score": 0.0,
+        "reliability_score": 0.0,
+        "ai_model": None
+    }
+
+
+def parse_metrics(analysis: str) -> Dict[str, Any]:
+    """
+    Extrait les métriques d'une analyse CRAFT en un seul passage ligne par ligne :
+    en-tête (modèle), tableau de scoring, score global et niveau de priorité.
+    Un score de critère doit se trouver sur la même ligne que son libellé.
+    """
+    metrics = default_metrics()
+    missing = dict(CRITERIA)
+    global_found = priority_found = model_found = False
+
+    for line in analysis.splitlines():
+        # Filtres par sous-chaîne (en C) avant tout appel d'expression régulière
+        if not model_found and "Analyste IA" in line:
+            match = _MODEL_PATTERN.search(line)
+            if match:
+                metrics["ai_model"] = match.group(1).strip()
+                model_found = True
+
+        if not global_found and "SCORE GLOBAL" in line:
+            match = _GLOBAL_PATTERN.search(line)
+            if match:
+                metrics["global_score"] = float(match.group(1))
+                global_found = True
+
+        if not priority_found and "Niveau" in line:
+            match = _PRIORITY_PATTERN.search(line)
+            if match:
+                metrics["priority_level"] = match.group(1)
+                priority_found = True
+
+        if missing and "/10" in line.replace(" ", ""):
+            _parse_score_line(line, missing, metrics)
+
+    return metrics
+
+
+def _parse_score_line(line: str, missing: Dict[str, str], metrics: Dict[str, Any]):
+    """Associe chaque libellé de critère au premier score « x/10 » qui le suit sur la ligne"""
+    labels = [(m.end(), m.group(0)) for m in _LABEL_PATTERN.finditer(line)]
+    if not labels:
+        return
+    scores = [(m.start(), m.group(1)) for m in _SCORE_PATTERN.finditer(line)]
+
+    # Fusion de deux listes triées par position : linéaire
+    score_index = 0
+    for label_end, label in labels:
+        while score_index < len(scores) and scores[score_index][0] < label_end:
+            score_index += 1
+        if score_index == len(scores):
+            return
+        key = missing.pop(label, None)
+        if key:
+            metrics[key] = float(scores[score_index][1])
@@ -0,0 +1,218 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+from typing import List, Dict, Tuple, Optional
+
+from journal import OperationJournal
+from search_index import tokenize
+
+# Taille (en mots) des fragments superposés comparés entre deux articles
+SHINGLE_SIZE = 2
+# Nombre de fonctions de hachage MinHash (valeurs de 32 bits) par signature
+NUM_PERMUTATIONS = 64
+
+_seeds = None
+
+
+def _get_seeds():
+    """Graines des NUM_PERMUTATIONS fonctions de hachage, identiques d'un processus à l'autre"""
+    global _seeds
+    if _seeds is None:
+        import numpy as np
+        _seeds = np.random.RandomState(20240601).randint(0, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64)
+    return _seeds
+
+
+def _mix64(values):
+    """Mélange splitmix64 (multiplications modulo 2^64) : chaque graine donne une permutation indépendante"""
+    import numpy as np
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def minhash_signature(text: str) -> Optional[bytes]:
+    """
+    Signature MinHash d'un texte (NUM_PERMUTATIONS entiers de 32 bits) calculée sur ses
+    fragments de SHINGLE_SIZE mots, accents et mots vides retirés. La proportion de valeurs
+    égales entre deux signatures estime la similarité de Jaccard des deux textes.
+    Retourne None pour un texte sans terme indexable.
+    """
+    import numpy as np
+    tokens = tokenize(text)
+    if not tokens:
+        return None
+    size = min(SHINGLE_SIZE, len(tokens))
+    shingles = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    hashes = np.array([int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+                       for shingle in shingles], dtype=np.uint64)
+    values = _mix64(hashes[:, None] ^ _get_seeds())
+    return (values.min(axis=0) >> np.uint64(32)).astype("<u4").tobytes()
+
+
+def encode_signature(signature: bytes) -> str:
+    """Forme texte d'une signature, stockée dans les métadonnées de l'analyse"""
+    return base64.b64encode(signature).decode("ascii")
+
+
+def decode_signature(encoded: str) -> bytes:
+    signature = base64.b64decode(encoded)
+    if len(signature) != NUM_PERMUTATIONS * 4:
+        raise ValueError("Signature MinHash de taille inattendue")
+    return signature
+
+
+def estimate_similarity(a: bytes, b: bytes) -> float:
+    """Similarité de Jaccard estimée : proportion de valeurs MinHash égales"""
+    import numpy as np
+    return float(np.count_nonzero(np.frombuffer(a, dtype="<u4") == np.frombuffer(b, dtype="<u4"))) / NUM_PERMUTATIONS
+
+
+class NearDuplicateIndex:
+    """
+    Index LSH des signatures MinHash des articles déjà analysés.
+
+    La signature est découpée en BANDS bandes de ROWS valeurs, chacune clé d'un dictionnaire :
+    deux articles de similarité s partagent au moins une bande avec une probabilité
+    1 - (1 - s^ROWS)^BANDS (plus de 99 % dès s = 0,7). Une recherche ne compare donc que
+    quelques candidats au lieu de tout le corpus, puis ne garde que ceux dont la similarité
+    estimée atteint le seuil. Comme pour l'index de recherche, la persistance combine un
+    instantané JSON et un journal d'opérations ; l'index se reconstruit depuis le stockage.
+    """
+
+    BANDS = 16
+    ROWS = NUM_PERMUTATIONS // BANDS
+    THRESHOLD = 0.7
+    # Nombre d'opérations journalisées avant réécriture de l'instantané
+    SNAPSHOT_EVERY = 5000
+
+    def __init__(self, data_dir: str):
+        self.snapshot_path = os.path.join(data_dir, "near_duplicates.json")
+        self.journal = OperationJournal(os.path.join(data_dir, "near_duplicates.journal.jsonl"))
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._reset_memory()
+
+    def exists(self) -> bool:
+        """True si un index a déjà été construit sur disque"""
+        return os.path.exists(self.snapshot_path) or self.journal.exists()
+
+    def add(self, doc_id: str, signature: bytes) -> None:
+        """Indexe (ou réindexe) la signature d'un document"""
+        with self._lock:
+            self.journal.append({"op": "add", "id": doc_id, "signature": encode_signature(signature)})
+            if self._loaded:
+                self._apply_add(doc_id, signature)
+                self._after_write()
+
+    def remove(self, doc_id: str) -> None:
+        """Retire un document de l'index (sans effet, ni écriture, s'il n'y figure pas)"""
+        with self._lock:
+            if self._loaded and doc_id not in self._signatures:
+                return
+            self.journal.append({"op": "remove", "id": doc_id})
+            if self._loaded:
+                self._apply_remove(doc_id)
+                self._after_write()
+
+    def rebuild(self, signatures: List[Tuple[str, bytes]]) -> None:
+        """Reconstruit entièrement l'index à partir de paires (id, signature)"""
+        with self._lock:
+            self._reset_memory()
+            for doc_id, signature in signatures:
+                self._apply_add(doc_id, signature)
+            self._loaded = True
+            self.save()
+
+    def drop(self) -> None:
+        """Supprime l'index (après un import massif) : il est reconstruit en une fois au prochain usage"""
+        with self._lock:
+            if os.path.exists(self.snapshot_path):
+                os.remove(self.snapshot_path)
+            self.journal.reset()
+            self._reset_memory()
+            self._loaded = False
+
+    def find(self, signature: bytes, threshold: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Paires (id, similarité estimée) des documents au-dessus du seuil, de la plus proche à la plus lointaine"""
+        threshold = self.THRESHOLD if threshold is None else threshold
+        with self._lock:
+            self._ensure_loaded()
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates.update(self._bands[band].get(key, ()))
+            matches = []
+            for doc_id in candidates:
+                similarity = estimate_similarity(signature, self._signatures[doc_id])
+                if similarity >= threshold:
+                    matches.append((doc_id, similarity))
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+    def save(self) -> None:
+        """Écrit un instantané et vide le journal"""
+        with self._lock:
+            if not self._loaded:
+                return
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({doc_id: encode_signature(signature) for doc_id, signature in self._signatures.items()},
+                          f, separators=(",", ":"))
+            os.replace(tmp_path, self.snapshot_path)
+            self.journal.reset()
+            self._journal_ops = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._signatures)
+
+    def _band_keys(self, signature: bytes) -> List[bytes]:
+        width = self.ROWS * 4
+        return [signature[band * width:(band + 1) * width] for band in range(self.BANDS)]
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                for doc_id, signature in json.load(f).items():
+                    self._apply_add(doc_id, decode_signature(signature))
+
+        operations = self.journal.read()
+        for operation in operations:
+            if operation["op"] == "add":
+                self._apply_add(operation["id"], decode_signature(operation["signature"]))
+            elif operation["op"] == "remove":
+                self._apply_remove(operation["id"])
+        self._journal_ops = len(operations)
+        self._loaded = True
+
+    def _apply_add(self, doc_id: str, signature: bytes):
+        self._apply_remove(doc_id)
+        self._signatures[doc_id] = signature
+        for band, key in enumerate(self._band_keys(signature)):
+            self._bands[band].setdefault(key, set()).add(doc_id)
+
+    def _apply_remove(self, doc_id: str):
+        signature = self._signatures.pop(doc_id, None)
+        if signature is None:
+            return
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._bands[band][key]
+            bucket.discard(doc_id)
+            if not bucket:
+                del self._bands[band][key]
+
+    def _after_write(self):
+        self._journal_ops += 1
+        if self._journal_ops >= self.SNAPSHOT_EVERY:
+            self.save()
+
+    def _reset_memory(self):
+        self._signatures: Dict[str, bytes] = {}
+        self._bands: List[Dict[bytes, set]] = [{} for _ in range(self.BANDS)]
+        self._journal_ops = 0
@@ -0,0 +1,271 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# httpx (dépendance des SDK openai/anthropic) n'est importé qu'à la création du pool partagé
+
+# Délais HTTP par défaut (secondes) : la lecture couvre une génération complète non progressive
+DEFAULT_TIMEOUTS = {"connect": 5.0, "read": 120.0, "write": 10.0, "pool": 5.0}
+
+# Taille du pool de connexions partagé par les clients de tous les fournisseurs
+DEFAULT_POOL_LIMITS = {"max_connections": 50, "max_keepalive_connections": 20, "keepalive_expiry": 30.0}
+
+# Codes HTTP transitoires : saturation, conflit, délai dépassé et erreurs serveur
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+# Exceptions réseau des SDK et de httpx, reconnues par leur nom pour ne pas importer les SDK
+_RETRYABLE_EXCEPTION_NAMES = {"APIConnectionError", "APITimeoutError", "TransportError", "TimeoutException"}
+
+_shared_http_client = None
+_shared_http_client_lock = threading.Lock()
+
+
+def shared_http_client():
+    """
+    Client httpx unique du processus : les clients OpenAI et Anthropic y réutilisent
+    leurs connexions keep-alive (un pool par origine) au lieu d'ouvrir chacun le sien.
+    """
+    global _shared_http_client
+    if _shared_http_client is None:
+        with _shared_http_client_lock:
+            if _shared_http_client is None:
+                import httpx
+                _shared_http_client = httpx.Client(
+                    timeout=httpx.Timeout(**DEFAULT_TIMEOUTS),
+                    limits=httpx.Limits(**DEFAULT_POOL_LIMITS),
+                )
+    return _shared_http_client
+
+
+class ProviderError(Exception):
+    """Échec d'un appel fournisseur après épuisement des tentatives"""
+
+    def __init__(self, provider: str, message: str, status_code: Optional[int] = None,
+                 retryable: bool = False):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.status_code = status_code
+        self.retryable = retryable
+
+
+class ProviderUnavailableError(ProviderError):
+    """Circuit ouvert : le fournisseur est considéré dégradé, l'appel n'est pas tenté"""
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(provider, f"fournisseur indisponible, nouvel essai dans {retry_in:.0f}s",
+                         retryable=True)
+        self.retry_in = retry_in
+
+
+def status_code_of(exc: Exception) -> Optional[int]:
+    """Code HTTP porté par une exception des SDK (status_code) ou de httpx (response.status_code)"""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Erreur transitoire : 408/409/429, 5xx, ou erreur réseau / délai dépassé"""
+    status = status_code_of(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+    return any(cls.__name__ in _RETRYABLE_EXCEPTION_NAMES for cls in type(exc).__mro__)
+
+
+def retry_after_of(exc: Exception) -> Optional[float]:
+    """Délai demandé par le serveur (en-tête Retry-After en secondes), s'il y en a un"""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    try:
+        return max(0.0, float(headers.get("retry-after"))) if headers else None
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Attente exponentielle avec gigue complète entre les tentatives :
+    la n-ième attente est tirée uniformément dans [0, min(max_delay, base_delay * 2^n)].
+    """
+
+    def __init__(self, max_retries: int = 2, base_delay: float = 0.5, max_delay: float = 8.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Attente avant la tentative attempt + 1 (attempt commence à 0)"""
+        if retry_after is not None:
+            # Le serveur sait mieux que nous, dans la limite de l'attente maximale
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur par fournisseur. Après failure_threshold échecs transitoires consécutifs,
+    le circuit s'ouvre et les appels échouent immédiatement pendant recovery_timeout secondes ;
+    un seul appel d'essai passe ensuite (semi-ouvert) et referme le circuit s'il réussit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.total_calls = 0
+        self.total_failures = 0
+        self.last_error: Optional[str] = None
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        """Secondes avant qu'un appel d'essai soit autorisé (0 si le circuit n'est pas ouvert)"""
+        with self._lock:
+            return self._retry_in()
+
+    def _retry_in(self) -> float:
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+
+    def is_open(self) -> bool:
+        """Vrai si un appel échouerait immédiatement (n'altère pas l'état)"""
+        with self._lock:
+            return ((self.state == self.OPEN and self._retry_in() > 0) or
+                    (self.state == self.HALF_OPEN and self._probe_in_flight))
+
+    def before_call(self) -> None:
+        """Autorise l'appel ou lève ProviderUnavailableError ; réserve l'appel d'essai en semi-ouvert"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if self._retry_in() > 0:
+                    raise ProviderUnavailableError("circuit", self._retry_in())
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    raise ProviderUnavailableError("circuit", self.recovery_timeout)
+                self._probe_in_flight = True
+            self.total_calls += 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, error: Exception, transient: bool = True) -> None:
+        """Seuls les échecs transitoires (fournisseur dégradé) comptent pour l'ouverture"""
+        with self._lock:
+            self.total_failures += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            self._probe_in_flight = False
+            if not transient:
+                if self.state == self.HALF_OPEN:
+                    # L'essai a atteint le fournisseur : il répond, le circuit se referme
+                    self.state = self.CLOSED
+                    self.consecutive_failures = 0
+                return
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "total_calls": self.total_calls,
+                "total_failures": self.total_failures,
+                "last_error": self.last_error,
+                "retry_in": round(self._retry_in(), 1),
+            }
+
+
+class ProviderClient:
+    """
+    Enveloppe les appels bruts d'un fournisseur : disjoncteur, puis nouvelles tentatives
+    sur erreurs transitoires. Les erreurs définitives (400, 401...) remontent sans nouvel essai.
+    """
+
+    def __init__(self, name: str, retry_policy: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None, sleep: Callable[[float], None] = time.sleep):
+        self.name = name
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self._sleep = sleep
+
+    def check_available(self) -> None:
+        """Échoue immédiatement si le circuit est ouvert, sans consommer l'appel d'essai"""
+        if self.breaker.is_open():
+            raise ProviderUnavailableError(self.name, self.breaker.retry_in())
+
+    def call(self, request: Callable[..., Any], *args, **kwargs) -> Any:
+        """Exécute request(*args, **kwargs) avec disjoncteur et nouvelles tentatives"""
+        attempt = 0
+        while True:
+            self._before_call()
+            try:
+                result = request(*args, **kwargs)
+            except Exception as e:
+                self._handle_failure(e, attempt)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stream(self, stream_request: Callable[..., Iterator[str]], *args, **kwargs) -> Iterator[str]:
+        """
+        Variante progressive de call : une nouvelle tentative n'est possible que tant
+        qu'aucun fragment n'a été transmis (un flux entamé ne peut pas être rejoué).
+        """
+        attempt = 0
+        while True:
+            self._before_call()
+            started = False
+            try:
+                for delta in stream_request(*args, **kwargs):
+                    started = True
+                    yield delta
+            except GeneratorExit:
+                # Le consommateur a abandonné le flux : ce n'est pas un échec du fournisseur
+                self.breaker.record_success()
+                raise
+            except Exception as e:
+                if started:
+                    self.breaker.record_failure(e, is_retryable(e))
+                    raise self._wrap(e) from e
+                self._handle_failure(e, attempt)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return
+
+    def _before_call(self) -> None:
+        try:
+            self.breaker.before_call()
+        except ProviderUnavailableError as e:
+            raise ProviderUnavailableError(self.name, e.retry_in) from None
+
+    def _handle_failure(self, error: Exception, attempt: int) -> None:
+        """Enregistre l'échec puis attend avant la tentative suivante, ou lève ProviderError"""
+        transient = is_retryable(error)
+        self.breaker.record_failure(error, transient)
+        if not transient or attempt >= self.retry_policy.max_retries or self.breaker.is_open():
+            raise self._wrap(error) from error
+        self._sleep(self.retry_policy.delay(attempt, retry_after_of(error)))
+
+    def _wrap(self, error: Exception) -> ProviderError:
+        if isinstance(error, ProviderError):
+            return error
+        return ProviderError(self.name, str(error), status_code_of(error), is_retryable(error))
+
+    def health(self) -> Dict[str, Any]:
+        return self.breaker.snapshot()
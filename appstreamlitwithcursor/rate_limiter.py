@@ -0,0 +1,64 @@
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Limiteur de débit par seau à jetons pour un fournisseur d'API.
+    Applique simultanément un budget de requêtes par minute et, si fourni,
+    un budget de tokens par minute. Partagé entre threads.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: Optional[float] = None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_allowance = float(requests_per_minute)
+        self._token_allowance = float(tokens_per_minute or 0)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Bloque jusqu'à ce qu'une requête de `tokens` tokens tienne dans les budgets.
+        Retourne le temps d'attente en secondes.
+        """
+        if self.tokens_per_minute:
+            # Une requête plus grosse que le budget passe dès que le seau est plein
+            tokens = min(tokens, self.tokens_per_minute)
+        else:
+            tokens = 0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                missing_requests = 1 - self._request_allowance
+                missing_tokens = tokens - self._token_allowance
+
+                if missing_requests <= 0 and missing_tokens <= 0:
+                    self._request_allowance -= 1
+                    self._token_allowance -= tokens
+                    return waited
+
+                wait = missing_requests * 60.0 / self.requests_per_minute
+                if tokens:
+                    wait = max(wait, missing_tokens * 60.0 / self.tokens_per_minute)
+
+            time.sleep(wait)
+            waited += wait
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+
+        self._request_allowance = min(
+            float(self.requests_per_minute),
+            self._request_allowance + elapsed * self.requests_per_minute / 60.0
+        )
+        if self.tokens_per_minute:
+            self._token_allowance = min(
+                float(self.tokens_per_minute),
+                self._token_allowance + elapsed * self.tokens_per_minute / 60.0
+            )
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+# La « Date d'Analyse » des paramètres du prompt change chaque minute : sa valeur est retirée
+# de la clé. Seule la ligne du bloc des paramètres est visée, jamais une date de l'article.
+_ANALYSIS_DATE_PATTERN = re.compile(
+    r"^-[ \t]*Date[ \t]+d'Analyse[ \t]*:[ \t]*\d{4}-\d{2}-\d{2}[ \t]+\d{2}:\d{2}(?::\d{2})?[ \t]*$", re.MULTILINE
+)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def _strip_analysis_date(prompt: str) -> str:
+    """Retire la valeur de la dernière ligne « Date d'Analyse » (le bloc des paramètres suit le contenu)"""
+    match = None
+    for match in _ANALYSIS_DATE_PATTERN.finditer(prompt):
+        pass
+    if match is None:
+        return prompt
+    return prompt[:match.start()] + "- Date d'Analyse :" + prompt[match.end():]
+
+
+class ResponseCache:
+    """
+    Cache persistant des réponses LLM, adressé par le contenu du prompt.
+    Chaque entrée est un fichier JSON dans cache_dir ; l'ordre LRU est conservé
+    via la date de modification des fichiers, ce qui survit aux redémarrages.
+    """
+
+    def __init__(self, cache_dir: str = os.path.join("data", "cache"), max_entries: int = 500,
+                 ttl_seconds: float = 7 * 24 * 3600, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, None]" = OrderedDict()
+        if self.enabled:
+            self._load_index()
+
+    def make_key(self, prompt: str, model: str, temperature: float) -> str:
+        """Calcule la clé d'une requête à partir du prompt normalisé, du modèle et de la température"""
+        normalized = _WHITESPACE_PATTERN.sub(" ", _strip_analysis_date(prompt)).strip()
+        payload = json.dumps([normalized, model, temperature], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Retourne la réponse en cache, ou None si absente ou expirée"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+
+            path = self._entry_path(key)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except Exception:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            if time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            # Mise à jour de l'ordre LRU (en mémoire et sur disque)
+            self._entries.move_to_end(key)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+            self.hits += 1
+            return entry["response"]
+
+    def set(self, key: str, response: str, model: str = "", temperature: float = 0.0) -> None:
+        """Enregistre une réponse et évince les entrées les moins récemment utilisées"""
+        if not self.enabled:
+            return
+
+        entry = {
+            "model": model,
+            "temperature": temperature,
+            "created_at": time.time(),
+            "response": response
+        }
+
+        with self._lock:
+            try:
+                path = self._entry_path(key)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                print(f"Erreur lors de l'écriture du cache: {e}")
+                return
+
+            self._entries[key] = None
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def clear(self) -> None:
+        """Vide le cache et remet les compteurs à zéro"""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques d'utilisation du cache"""
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+    def _load_index(self):
+        """Reconstruit l'ordre LRU depuis les fichiers présents sur disque"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            files = []
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    path = os.path.join(self.cache_dir, name)
+                    files.append((os.path.getmtime(path), name[:-len(".json")]))
+            for _, key in sorted(files):
+                self._entries[key] = None
+        except Exception as e:
+            print(f"Erreur lors du chargement du cache: {e}")
+
+    def _remove(self, key: str):
+        self._entries.pop(key, None)
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
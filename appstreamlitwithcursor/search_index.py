@@ -0,0 +1,316 @@
+import math
+import os
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import List, Dict, Tuple, Optional
+
+from journal import OperationJournal
+
+# Mots vides français (après suppression des accents) exclus de l'index
+FRENCH_STOPWORDS = {
+    "a", "au", "aux", "avec", "ce", "ces", "cet", "cette", "dans", "de", "des", "du", "elle",
+    "en", "est", "et", "il", "ils", "la", "le", "les", "leur", "leurs", "lui", "mais", "ne",
+    "ou", "par", "pas", "plus", "pour", "qu", "que", "qui", "sa", "se", "ses", "son", "sont",
+    "sur", "un", "une", "vs", "the", "of", "and", "to", "in"
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def fold_accents(text: str) -> str:
+    """Minuscules sans accents : « Réglementation » -> « reglementation »"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    """Découpe un texte français en termes indexables (accents retirés, mots vides exclus)"""
+    return [
+        token for token in _TOKEN_PATTERN.findall(fold_accents(text))
+        if len(token) > 1 and token not in FRENCH_STOPWORDS
+    ]
+
+
+class SearchIndex:
+    """
+    Index inversé des analyses avec classement BM25.
+
+    Les listes de postings sont des tableaux compacts (ID interne du document,
+    fréquence du terme) ; le score BM25 est calculé de façon vectorisée avec NumPy.
+    Une suppression marque le document comme mort ; les postings morts disparaissent
+    au prochain instantané. La persistance combine un instantané .npz et un journal
+    d'opérations : une mise à jour n'écrit qu'une ligne dans le journal, même quand
+    l'index n'est pas chargé en mémoire.
+    """
+
+    K1 = 1.2
+    B = 0.75
+    # Nombre d'opérations journalisées avant réécriture de l'instantané
+    SNAPSHOT_EVERY = 5000
+    # Nombre maximal de termes couverts par une requête par préfixe (« term* »)
+    MAX_PREFIX_EXPANSIONS = 200
+
+    def __init__(self, data_dir: str):
+        self.snapshot_path = os.path.join(data_dir, "search_index.npz")
+        self.journal = OperationJournal(os.path.join(data_dir, "search_index.journal.jsonl"))
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._reset_memory()
+
+    def exists(self) -> bool:
+        """True si un index a déjà été construit sur disque"""
+        return os.path.exists(self.snapshot_path) or self.journal.exists()
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Indexe (ou réindexe) un document"""
+        terms = dict(Counter(tokenize(text)))
+        with self._lock:
+            self.journal.append({"op": "add", "id": doc_id, "terms": terms})
+            if self._loaded:
+                self._apply_add(doc_id, terms)
+                self._after_write()
+
+    def remove(self, doc_id: str) -> None:
+        """Retire un document de l'index (sans effet, ni écriture, s'il n'y figure pas)"""
+        with self._lock:
+            if self._loaded and doc_id not in self._doc_index:
+                return
+            self.journal.append({"op": "remove", "id": doc_id})
+            if self._loaded:
+                self._apply_remove(doc_id)
+                self._after_write()
+
+    def rebuild(self, documents: List[Tuple[str, str]]) -> None:
+        """Reconstruit entièrement l'index à partir de paires (id, texte)"""
+        with self._lock:
+            self._reset_memory()
+            for doc_id, text in documents:
+                self._apply_add(doc_id, dict(Counter(tokenize(text))))
+            self._loaded = True
+            self.save()
+
+    def drop(self) -> None:
+        """Supprime l'index (après un import massif) : il est reconstruit en une fois au prochain usage"""
+        with self._lock:
+            if os.path.exists(self.snapshot_path):
+                os.remove(self.snapshot_path)
+            self.journal.reset()
+            self._reset_memory()
+            self._loaded = False
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Retourne les paires (id, score) des documents contenant tous les termes de la
+        requête, triées par score BM25 décroissant. Un terme suffixé par « * » est
+        une recherche par préfixe.
+        """
+        import numpy as np
+        groups = self._parse_query(query)
+        with self._lock:
+            self._ensure_loaded()
+            if not groups or self._live_count == 0:
+                return []
+
+            n_docs = len(self._doc_ids)
+            alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+            doc_len = np.frombuffer(self._doc_len, dtype=np.uint32).astype(np.float64)
+            avg_len = self._live_length / self._live_count
+            norm = self.K1 * (1 - self.B + self.B * doc_len / avg_len)
+
+            scores = np.zeros(n_docs, dtype=np.float64)
+            required = np.ones(n_docs, dtype=bool)
+            for terms in groups:
+                matched = np.zeros(n_docs, dtype=bool)
+                for term in terms:
+                    postings = self._postings_docs.get(term)
+                    if postings is None:
+                        # Terme absent du vocabulaire : aucun document ne le contient
+                        continue
+                    docs = np.frombuffer(postings, dtype=np.uint32)
+                    tfs = np.frombuffer(self._postings_tfs[term], dtype=np.uint32).astype(np.float64)
+                    live = alive[docs]
+                    docs, tfs = docs[live], tfs[live]
+                    df = len(docs)
+                    if df == 0:
+                        continue
+                    idf = math.log(1 + (self._live_count - df + 0.5) / (df + 0.5))
+                    scores[docs] += idf * tfs * (self.K1 + 1) / (tfs + norm[docs])
+                    matched[docs] = True
+                required &= matched
+                if not required.any():
+                    return []
+
+            candidates = np.nonzero(required & alive)[0]
+            if limit and len(candidates) > limit:
+                top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+                candidates = candidates[top]
+            order = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [(self._doc_ids[i], float(scores[i])) for i in order]
+
+    def save(self) -> None:
+        """Écrit un instantané compacté (sans postings morts) et vide le journal"""
+        import numpy as np
+        with self._lock:
+            if not self._loaded:
+                return
+            self._compact()
+            terms = list(self._vocabulary)
+            offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+            for i, term in enumerate(terms):
+                offsets[i + 1] = offsets[i] + len(self._postings_docs[term])
+            post_docs = np.empty(offsets[-1], dtype=np.uint32)
+            post_tfs = np.empty(offsets[-1], dtype=np.uint32)
+            for i, term in enumerate(terms):
+                post_docs[offsets[i]:offsets[i + 1]] = np.frombuffer(self._postings_docs[term], dtype=np.uint32)
+                post_tfs[offsets[i]:offsets[i + 1]] = np.frombuffer(self._postings_tfs[term], dtype=np.uint32)
+
+            tmp_path = f"{self.snapshot_path}.tmp.npz"
+            np.savez(
+                tmp_path,
+                doc_ids=np.array(self._doc_ids, dtype=str),
+                doc_len=np.frombuffer(self._doc_len, dtype=np.uint32),
+                terms=np.array(terms, dtype=str),
+                offsets=offsets,
+                post_docs=post_docs,
+                post_tfs=post_tfs
+            )
+            os.replace(tmp_path, self.snapshot_path)
+            self.journal.reset()
+            self._journal_ops = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return self._live_count
+
+    def _parse_query(self, query: str) -> List[List[str]]:
+        """Chaque terme de la requête devient un groupe de termes de l'index (préfixes développés)"""
+        groups = []
+        for raw in query.split():
+            is_prefix = raw.endswith("*")
+            tokens = tokenize(raw)
+            if not tokens:
+                continue
+            for position, token in enumerate(tokens):
+                if is_prefix and position == len(tokens) - 1:
+                    groups.append(self._expand_prefix(token))
+                else:
+                    groups.append([token])
+        return groups
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        with self._lock:
+            self._ensure_loaded()
+            start = bisect_left(self._vocabulary, prefix)
+            expansions = []
+            for term in self._vocabulary[start:start + self.MAX_PREFIX_EXPANSIONS]:
+                if not term.startswith(prefix):
+                    break
+                expansions.append(term)
+            return expansions
+
+    def _ensure_loaded(self):
+        import numpy as np
+        if self._loaded:
+            return
+        if os.path.exists(self.snapshot_path):
+            with np.load(self.snapshot_path) as snapshot:
+                self._doc_ids = [str(doc_id) for doc_id in snapshot["doc_ids"]]
+                self._doc_len = array("I", snapshot["doc_len"].astype(np.uint32).tobytes())
+                offsets = snapshot["offsets"]
+                post_docs = snapshot["post_docs"]
+                post_tfs = snapshot["post_tfs"]
+                for i, term in enumerate(snapshot["terms"]):
+                    term = str(term)
+                    start, end = offsets[i], offsets[i + 1]
+                    self._postings_docs[term] = array("I", post_docs[start:end].tobytes())
+                    self._postings_tfs[term] = array("I", post_tfs[start:end].tobytes())
+                    self._vocabulary.append(term)
+            self._vocabulary.sort()
+            self._doc_index = {doc_id: i for i, doc_id in enumerate(self._doc_ids)}
+            self._alive = bytearray(b"\x01" * len(self._doc_ids))
+            self._live_count = len(self._doc_ids)
+            self._live_length = sum(self._doc_len)
+
+        operations = self.journal.read()
+        for operation in operations:
+            if operation["op"] == "add":
+                self._apply_add(operation["id"], operation["terms"])
+            elif operation["op"] == "remove":
+                self._apply_remove(operation["id"])
+        self._journal_ops = len(operations)
+        self._loaded = True
+
+    def _apply_add(self, doc_id: str, terms: Dict[str, int]):
+        self._apply_remove(doc_id)
+        internal_id = len(self._doc_ids)
+        self._doc_ids.append(doc_id)
+        self._doc_index[doc_id] = internal_id
+        length = sum(terms.values())
+        self._doc_len.append(length)
+        self._alive.append(1)
+        self._live_count += 1
+        self._live_length += length
+
+        for term, tf in terms.items():
+            if term not in self._postings_docs:
+                self._postings_docs[term] = array("I")
+                self._postings_tfs[term] = array("I")
+                insort(self._vocabulary, term)
+            self._postings_docs[term].append(internal_id)
+            self._postings_tfs[term].append(tf)
+
+    def _apply_remove(self, doc_id: str):
+        internal_id = self._doc_index.pop(doc_id, None)
+        if internal_id is None:
+            return
+        self._alive[internal_id] = 0
+        self._live_count -= 1
+        self._live_length -= self._doc_len[internal_id]
+
+    def _after_write(self):
+        self._journal_ops += 1
+        if self._journal_ops >= self.SNAPSHOT_EVERY:
+            self.save()
+
+    def _compact(self):
+        """Renumérote les documents vivants et supprime les postings morts"""
+        import numpy as np
+        if self._live_count == len(self._doc_ids):
+            return
+        alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+        remap = np.cumsum(alive) - 1
+        old_len = np.frombuffer(self._doc_len, dtype=np.uint32)
+
+        self._doc_ids = [doc_id for doc_id, live in zip(self._doc_ids, alive) if live]
+        self._doc_index = {doc_id: i for i, doc_id in enumerate(self._doc_ids)}
+        self._doc_len = array("I", old_len[alive].tobytes())
+        self._alive = bytearray(b"\x01" * len(self._doc_ids))
+
+        for term in list(self._vocabulary):
+            docs = np.frombuffer(self._postings_docs[term], dtype=np.uint32)
+            keep = alive[docs]
+            if not keep.any():
+                del self._postings_docs[term]
+                del self._postings_tfs[term]
+                continue
+            tfs = np.frombuffer(self._postings_tfs[term], dtype=np.uint32)
+            self._postings_docs[term] = array("I", remap[docs[keep]].astype(np.uint32).tobytes())
+            self._postings_tfs[term] = array("I", tfs[keep].tobytes())
+        self._vocabulary = sorted(self._postings_docs)
+
+    def _reset_memory(self):
+        self._doc_ids: List[str] = []
+        self._doc_index: Dict[str, int] = {}
+        self._doc_len = array("I")
+        self._alive = bytearray()
+        self._postings_docs: Dict[str, array] = {}
+        self._postings_tfs: Dict[str, array] = {}
+        self._vocabulary: List[str] = []
+        self._live_count = 0
+        self._live_length = 0
+        self._journal_ops = 0
@@ -0,0 +1,591 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator
+
+
+class AnalysisStore:
+    """Interface commune des moteurs de stockage des analyses"""
+
+    # True si le moteur sait répondre aux requêtes par priorité, date et texte
+    # sans parcourir tout le corpus (voir SqliteStore)
+    indexed = False
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        """Retourne toutes les analyses, dans l'ordre d'enregistrement"""
+        raise NotImplementedError
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        """Parcourt les analyses une à une (les moteurs qui le peuvent lisent le disque au fil de l'eau)"""
+        return iter(self.load_all())
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Ajoute une analyse"""
+        raise NotImplementedError
+
+    def import_records(self, records: Iterable[Dict[str, Any]], bulk: bool = False) -> int:
+        """
+        Ajoute des analyses en une seule opération (un enregistrement de même ID est remplacé) ;
+        retourne le nombre d'analyses écrites. bulk=True signale un gros volume : le moteur
+        peut alors suspendre la maintenance de ses index pendant l'écriture.
+        """
+        count = 0
+        for record in records:
+            self.append(record)
+            count += 1
+        return count
+
+    def delete(self, analysis_id: str) -> bool:
+        """Supprime une analyse ; retourne False si elle n'existe pas"""
+        raise NotImplementedError
+
+    def replace_all(self, records: List[Dict[str, Any]]) -> None:
+        """Réécrit les analyses existantes (mêmes IDs, même ordre) en une seule opération"""
+        raise NotImplementedError
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """Récupère une analyse par son ID"""
+        for record in self.load_all():
+            if record["id"] == analysis_id:
+                return record
+        return None
+
+    def data_files(self) -> List[str]:
+        """Fichiers dont le mtime et la taille changent à chaque écriture (validation des caches)"""
+        return [self.path]
+
+
+class JsonStore(AnalysisStore):
+    """Stockage historique : une liste JSON réécrite entièrement à chaque modification"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return []
+
+    def append(self, record: Dict[str, Any]) -> None:
+        records = self.load_all()
+        records.append(record)
+        self._write(records)
+
+    def delete(self, analysis_id: str) -> bool:
+        records = self.load_all()
+        remaining = [r for r in records if r["id"] != analysis_id]
+        if len(remaining) == len(records):
+            return False
+        self._write(remaining)
+        return True
+
+    def import_records(self, records: Iterable[Dict[str, Any]], bulk: bool = False) -> int:
+        # Une seule lecture et une seule réécriture du fichier pour tout le lot
+        existing = {record["id"]: record for record in self.load_all()}
+        count = 0
+        for record in records:
+            existing[record["id"]] = record
+            count += 1
+        self._write(list(existing.values()))
+        return count
+
+    def replace_all(self, records: List[Dict[str, Any]]) -> None:
+        self._write(records)
+
+    def _write(self, records: List[Dict[str, Any]]):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+
+
+class JsonlStore(AnalysisStore):
+    """
+    Journal en ajout seul : une ligne JSON compacte par enregistrement.
+    Une sauvegarde ne coûte qu'une écriture en fin de fichier suivie d'un fsync,
+    quelle que soit la taille du corpus. Les suppressions ajoutent une ligne
+    « tombstone » ; le journal est compacté quand les lignes mortes dominent.
+    L'ensemble des IDs vivants et le nombre de lignes sont tenus à jour à chaque
+    écriture : une suppression ne relit le journal que s'il a changé ailleurs.
+    """
+
+    # Compaction quand il y a au moins autant de lignes mortes que vivantes
+    COMPACT_MIN_DEAD_LINES = 1000
+    # Lignes écrites par appel à write() pendant un import
+    IMPORT_BATCH_LINES = 10000
+
+    def __init__(self, path: str, legacy_json_path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._tail_checked = False
+        # IDs vivants et nombre de lignes du journal, valides pour le jeton (mtime, taille) _index_token
+        self._live_ids: Optional[set] = None
+        self._line_count = 0
+        self._index_token = None
+        if legacy_json_path and not os.path.exists(self.path) and os.path.exists(legacy_json_path):
+            self._migrate_from_json(legacy_json_path)
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        records, _ = self._scan()
+        return list(records.values())
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        # Premier passage : dernière ligne vivante de chaque ID (seuls les IDs restent en mémoire)
+        final_lines: Dict[str, Optional[int]] = {}
+        for line_number, record in self._iter_lines():
+            final_lines[record["id"]] = None if record.get("_deleted") else line_number
+        # Second passage : les enregistrements sont produits un par un
+        for line_number, record in self._iter_lines():
+            if final_lines.get(record["id"]) == line_number:
+                yield record
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self._append_lines([record])
+
+    def import_records(self, records: Iterable[Dict[str, Any]], bulk: bool = False) -> int:
+        """Écrit le lot par blocs de lignes et ne synchronise le disque qu'une fois, à la fin"""
+        batch_size = self.IMPORT_BATCH_LINES
+        count = 0
+        with self._lock:
+            if not self._tail_checked:
+                self._repair_tail()
+            index_fresh = self._index_is_fresh()
+            with open(self.path, 'a', encoding='utf-8') as f:
+                batch = []
+                batch_records = []
+                for record in records:
+                    batch.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+                    batch_records.append(record)
+                    if len(batch) >= batch_size:
+                        f.write("".join(batch))
+                        count += len(batch)
+                        self._index_written(batch_records, index_fresh)
+                        batch = []
+                        batch_records = []
+                f.write("".join(batch))
+                count += len(batch)
+                self._index_written(batch_records, index_fresh)
+                f.flush()
+                os.fsync(f.fileno())
+            self._index_token = self._file_token() if index_fresh else None
+        return count
+
+    def delete(self, analysis_id: str) -> bool:
+        with self._lock:
+            live_ids = self._live_index()
+            if analysis_id not in live_ids:
+                return False
+
+            self._append_lines([{"id": analysis_id, "_deleted": True}], locked=True)
+
+            # Ligne supprimée + tombstone comptent comme lignes mortes
+            live_count = len(self._live_index())
+            dead_lines = self._line_count - live_count
+            if dead_lines >= self.COMPACT_MIN_DEAD_LINES and dead_lines > live_count:
+                records, _ = self._scan()
+                self._rewrite(list(records.values()))
+            return True
+
+    def replace_all(self, records: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._rewrite(records)
+
+    def compact(self) -> None:
+        """Réécrit le journal avec uniquement les enregistrements vivants"""
+        with self._lock:
+            records, _ = self._scan()
+            self._rewrite(list(records.values()))
+
+    def _scan(self):
+        """Rejoue le journal ; retourne les enregistrements vivants et le nombre de lignes"""
+        records: Dict[str, Dict[str, Any]] = {}
+        line_count = 0
+        for line_count, record in self._iter_lines():
+            if record.get("_deleted"):
+                records.pop(record["id"], None)
+            else:
+                records[record["id"]] = record
+        return records, line_count
+
+    def _live_index(self) -> set:
+        """IDs vivants du journal (sous self._lock), relus seulement si le fichier a changé ailleurs"""
+        if not self._index_is_fresh():
+            live_ids = set()
+            line_count = 0
+            for line_count, record in self._iter_lines():
+                if record.get("_deleted"):
+                    live_ids.discard(record["id"])
+                else:
+                    live_ids.add(record["id"])
+            self._live_ids, self._line_count = live_ids, line_count
+            self._index_token = self._file_token()
+        return self._live_ids
+
+    def _index_is_fresh(self) -> bool:
+        return self._live_ids is not None and self._index_token == self._file_token()
+
+    def _index_written(self, records: List[Dict[str, Any]], index_fresh: bool):
+        """Reporte des lignes ajoutées dans l'index des IDs vivants, ou l'invalide s'il était périmé"""
+        if not index_fresh:
+            self._live_ids = None
+            return
+        for record in records:
+            if record.get("_deleted"):
+                self._live_ids.discard(record["id"])
+            else:
+                self._live_ids.add(record["id"])
+        self._line_count += len(records)
+
+    def _file_token(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _iter_lines(self) -> Iterator[tuple]:
+        """Produit (numéro de ligne non vide, enregistrement) pour chaque ligne lisible du journal"""
+        if not os.path.exists(self.path):
+            return
+        line_number = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                line_number += 1
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Ligne tronquée par un arrêt brutal pendant une écriture
+                    continue
+                yield line_number, record
+
+    def _append_lines(self, records: List[Dict[str, Any]], locked: bool = False):
+        payload = "".join(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for record in records
+        )
+        if not locked:
+            self._lock.acquire()
+        try:
+            if not self._tail_checked:
+                self._repair_tail()
+            index_fresh = self._index_is_fresh()
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            self._index_written(records, index_fresh)
+            self._index_token = self._file_token() if index_fresh else None
+        finally:
+            if not locked:
+                self._lock.release()
+
+    def _repair_tail(self):
+        """Tronque une dernière ligne incomplète pour ne pas y coller le prochain ajout"""
+        self._tail_checked = True
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+
+        with open(self.path, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+            # Recherche du dernier saut de ligne par blocs depuis la fin
+            position = f.tell()
+            while position > 0:
+                step = min(4096, position)
+                position -= step
+                f.seek(position)
+                block = f.read(step)
+                newline = block.rfind(b"\n")
+                if newline != -1:
+                    f.truncate(position + newline + 1)
+                    return
+            f.truncate(0)
+
+    def _rewrite(self, records: List[Dict[str, Any]]):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._fsync_directory()
+        self._live_ids = {record["id"] for record in records}
+        self._line_count = len(records)
+        self._index_token = self._file_token()
+
+    def _migrate_from_json(self, legacy_json_path: str):
+        """Importe une seule fois les analyses de l'ancien fichier analyses.json"""
+        with open(legacy_json_path, 'r', encoding='utf-8') as f:
+            self._rewrite(json.load(f))
+
+    def _fsync_directory(self):
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+class SqliteStore(AnalysisStore):
+    """
+    Stockage SQLite avec index sur l'id, la date, le modèle et la priorité,
+    et une table FTS5 pour la recherche plein texte (LIKE si FTS5 est indisponible).
+    Les champs dérivés (titre, priorité, score) sont calculés à l'écriture.
+    """
+
+    indexed = True
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS analyses (
+            id TEXT PRIMARY KEY,
+            date TEXT NOT NULL,
+            model TEXT,
+            priority TEXT,
+            global_score REAL,
+            title TEXT,
+            content TEXT NOT NULL,
+            metadata TEXT,
+            metrics TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_analyses_date ON analyses(date);
+        CREATE INDEX IF NOT EXISTS idx_analyses_model ON analyses(model);
+        CREATE INDEX IF NOT EXISTS idx_analyses_priority ON analyses(priority);
+    """
+
+    # Index secondaires (nom → colonne), suspendus pendant un import massif
+    _INDEXES = {
+        "idx_analyses_date": "date",
+        "idx_analyses_model": "model",
+        "idx_analyses_priority": "priority",
+    }
+
+    # Triggers de synchronisation de l'index FTS, suspendus pendant un import massif
+    _FTS_TRIGGERS = {
+        "analyses_fts_insert": """
+            CREATE TRIGGER IF NOT EXISTS analyses_fts_insert AFTER INSERT ON analyses BEGIN
+                INSERT INTO analyses_fts(rowid, title, content) VALUES (new.rowid, new.title, new.content);
+            END
+        """,
+        "analyses_fts_delete": """
+            CREATE TRIGGER IF NOT EXISTS analyses_fts_delete AFTER DELETE ON analyses BEGIN
+                INSERT INTO analyses_fts(analyses_fts, rowid, title, content)
+                VALUES ('delete', old.rowid, old.title, old.content);
+            END
+        """,
+        "analyses_fts_update": """
+            CREATE TRIGGER IF NOT EXISTS analyses_fts_update AFTER UPDATE OF title, content ON analyses BEGIN
+                INSERT INTO analyses_fts(analyses_fts, rowid, title, content)
+                VALUES ('delete', old.rowid, old.title, old.content);
+                INSERT INTO analyses_fts(rowid, title, content) VALUES (new.rowid, new.title, new.content);
+            END
+        """,
+    }
+
+    _FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS analyses_fts USING fts5(
+            title, content, content='analyses', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2'
+        );
+    """ + ";".join(_FTS_TRIGGERS.values()) + ";"
+
+    def __init__(self, path: str, title_extractor: Optional[Callable[[str], str]] = None,
+                 metrics_extractor: Optional[Callable[[str], Dict[str, Any]]] = None,
+                 legacy_json_path: Optional[str] = None):
+        self.path = path
+        self.title_extractor = title_extractor
+        self.metrics_extractor = metrics_extractor
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Nécessaire pour que INSERT OR REPLACE déclenche la mise à jour de l'index FTS
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        self._conn.executescript(self._SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(analyses)")}
+        if "metrics" not in columns:
+            self._conn.execute("ALTER TABLE analyses ADD COLUMN metrics TEXT")
+        try:
+            self._conn.executescript(self._FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+
+        if legacy_json_path and os.path.exists(legacy_json_path) and self._is_empty():
+            with open(legacy_json_path, 'r', encoding='utf-8') as f:
+                self.import_records(json.load(f))
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        return self._query("SELECT * FROM analyses ORDER BY rowid")
+
+    def iter_all(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        # Connexion de lecture dédiée (WAL) : pas de verrou tenu entre deux lots
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute("SELECT * FROM analyses ORDER BY rowid")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._to_record(row)
+        finally:
+            conn.close()
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self.import_records([record])
+
+    def import_records(self, records: Iterable[Dict[str, Any]], bulk: bool = False) -> int:
+        """
+        Insère des analyses en une seule transaction ; retourne le nombre inséré.
+        En mode bulk, les index secondaires et l'indexation FTS ligne à ligne sont suspendus
+        et reconstruits en une passe à la fin de la même transaction.
+        """
+        # Les lignes sont produites au fil de l'eau : un gros import ne tient pas en mémoire
+        rows = (self._to_row(record) for record in records)
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            if bulk:
+                for index in self._INDEXES:
+                    self._conn.execute(f"DROP INDEX IF EXISTS {index}")
+                if self.has_fts:
+                    # Tous les triggers sont suspendus : un remplacement (même id dans deux blocs
+                    # de l'import) ne doit pas désindexer une ligne qui n'a jamais été indexée
+                    for trigger in self._FTS_TRIGGERS:
+                        self._conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            cursor = self._conn.executemany(
+                "INSERT OR REPLACE INTO analyses (id, date, model, priority, global_score, "
+                "title, content, metadata, metrics) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            if bulk:
+                for index, column in self._INDEXES.items():
+                    self._conn.execute(f"CREATE INDEX IF NOT EXISTS {index} ON analyses({column})")
+                if self.has_fts:
+                    # Index FTS reconstruit en une passe depuis la table (lignes anciennes et importées)
+                    self._conn.execute("INSERT INTO analyses_fts(analyses_fts) VALUES ('rebuild')")
+                    for trigger_sql in self._FTS_TRIGGERS.values():
+                        self._conn.execute(trigger_sql)
+        return cursor.rowcount
+
+    def replace_all(self, records: List[Dict[str, Any]]) -> None:
+        # UPDATE plutôt que REPLACE pour conserver le rowid (ordre d'insertion)
+        rows = [self._to_row(record) for record in records]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE analyses SET date = ?, model = ?, priority = ?, global_score = ?, "
+                "title = ?, content = ?, metadata = ?, metrics = ? WHERE id = ?",
+                [row[1:] + row[:1] for row in rows]
+            )
+
+    def delete(self, analysis_id: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM analyses WHERE id = ?", (analysis_id,))
+        return cursor.rowcount > 0
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._query("SELECT * FROM analyses WHERE id = ?", (analysis_id,))
+        return rows[0] if rows else None
+
+    def data_files(self) -> List[str]:
+        # En mode WAL, les transactions modifient d'abord le fichier -wal
+        return [self.path, f"{self.path}-wal"]
+
+    def find_by_priority(self, priority: str) -> List[Dict[str, Any]]:
+        return self._query("SELECT * FROM analyses WHERE priority = ? ORDER BY rowid", (priority,))
+
+    def find_by_model(self, model: str) -> List[Dict[str, Any]]:
+        return self._query("SELECT * FROM analyses WHERE model = ? ORDER BY rowid", (model,))
+
+    def find_by_date_range(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        # Les dates ISO normalisées se comparent correctement comme chaînes
+        start = datetime.fromisoformat(start_date).isoformat()
+        end = datetime.fromisoformat(end_date).isoformat()
+        return self._query(
+            "SELECT * FROM analyses WHERE date >= ? AND date <= ? ORDER BY date", (start, end)
+        )
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Recherche plein texte classée par pertinence (BM25)"""
+        terms = re.findall(r"\w+", query)
+        limit_clause = f" LIMIT {int(limit)}" if limit else ""
+        if self.has_fts and terms:
+            # Chaque terme est une recherche par préfixe, tous les termes sont requis
+            match = " ".join(f'"{term}"*' for term in terms)
+            return self._query(
+                "SELECT analyses.* FROM analyses_fts JOIN analyses ON analyses.rowid = analyses_fts.rowid "
+                "WHERE analyses_fts MATCH ? ORDER BY bm25(analyses_fts)" + limit_clause, (match,)
+            )
+
+        pattern = f"%{query}%"
+        return self._query(
+            "SELECT * FROM analyses WHERE title LIKE ? OR content LIKE ? ORDER BY rowid" + limit_clause,
+            (pattern, pattern)
+        )
+
+    def _is_empty(self) -> bool:
+        return self._conn.execute("SELECT 1 FROM analyses LIMIT 1").fetchone() is None
+
+    def _to_row(self, record: Dict[str, Any]):
+        content = record["content"]
+        metadata = record.get("metadata") or {}
+        metrics = record.get("metrics")
+        if metrics is None:
+            metrics = self.metrics_extractor(content) if self.metrics_extractor else {}
+        title = self.title_extractor(content) if self.title_extractor else None
+        return (
+            record["id"],
+            record["date"],
+            metrics.get("ai_model") or metadata.get("ai_model"),
+            metrics.get("priority_level"),
+            metrics.get("global_score"),
+            title,
+            content,
+            json.dumps(metadata, ensure_ascii=False),
+            json.dumps(record["metrics"], ensure_ascii=False) if "metrics" in record else None
+        )
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def _to_record(self, row: sqlite3.Row) -> Dict[str, Any]:
+        record = {
+            "id": row["id"],
+            "content": row["content"],
+            "date": row["date"],
+            "metadata": json.loads(row["metadata"]) if row["metadata"] else {}
+        }
+        if row["metrics"]:
+            record["metrics"] = json.loads(row["metrics"])
+        return record
+
+
+def create_store(backend: str, data_dir: str,
+                 title_extractor: Optional[Callable[[str], str]] = None,
+                 metrics_extractor: Optional[Callable[[str], Dict[str, Any]]] = None) -> AnalysisStore:
+    """Instancie le moteur de stockage demandé ("json", "jsonl" ou "sqlite")"""
+    backend = backend.lower()
+    json_path = os.path.join(data_dir, "analyses.json")
+    if backend == "json":
+        return JsonStore(json_path)
+    elif backend == "jsonl":
+        return JsonlStore(os.path.join(data_dir, "analyses.jsonl"), legacy_json_path=json_path)
+    elif backend == "sqlite":
+        return SqliteStore(os.path.join(data_dir, "analyses.db"), title_extractor,
+                           metrics_extractor, legacy_json_path=json_path)
+    else:
+        raise ValueError(f"Moteur de stockage non supporté: {backend}")
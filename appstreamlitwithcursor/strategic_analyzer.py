@@ -1,58 +1,43 @@
 import json
-import re
+import time
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict, Any
-import openai
-import anthropic
+import threading
+from typing import List, Dict, Any, Optional, Iterator, Union
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-class StrategicAnalyzer:
-    def __init__(self):
-        self.openai_client = None
-        self.anthropic_client = None
-        self.setup_clients()
-    
-    def setup_clients(self):
-        """Configure les clients API pour les différents modèles IA"""
-        try:
-            if os.getenv("OPENAI_API_KEY"):
-                self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            if os.getenv("ANTHROPIC_API_KEY"):
-                self.anthropic_client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-        except Exception as e:
-            print(f"Erreur lors de la configuration des clients API: {e}")
-    
-    def analyze_content(self, content: str, focus_area: str, urgency_level: str, 
-                       company_size: str, ai_model: str, weights: List[float]) -> str:
-        """
-        Analyse le contenu selon le format CRAFT et retourne une analyse stratégique
-        """
-        try:
-            # Préparation du prompt selon le format CRAFT
-            prompt = self._create_craft_prompt(content, focus_area, urgency_level, 
-                                             company_size, ai_model, weights)
-            
-            # Analyse selon le modèle sélectionné
-            if ai_model == "Claude-3-Sonnet" and self.anthropic_client:
-                return self._analyze_with_claude(prompt)
-            elif ai_model == "GPT-4" and self.openai_client:
-                return self._analyze_with_gpt4(prompt)
-            else:
-                return self._analyze_with_simulation(prompt, content, focus_area, 
-                                                   urgency_level, company_size, weights)
-        
-        except Exception as e:
-            return f"Erreur lors de l'analyse: {str(e)}"
-    
-    def _create_craft_prompt(self, content: str, focus_area: str, urgency_level: str,
-                           company_size: str, ai_model: str, weights: List[float]) -> str:
-        """Crée le prompt selon le format CRAFT"""
-        
-        prompt = f"""
-# 🧠 **C – CHARACTER (Personnalité & Expertise)**
+from response_cache import ResponseCache
+from rate_limiter import RateLimiter
+from provider_client import ProviderClient, ProviderError, RetryPolicy, CircuitBreaker, shared_http_client
+from metrics_parser import parse_metrics
+from tracing import get_tracer
+
+# Les SDK openai/anthropic (~1,5 s d'import à eux deux) et python-dotenv ne sont
+# importés qu'au premier usage : le démarrage à froid ne paie que ce qu'il utilise.
+
+@functools.lru_cache(maxsize=None)
+def load_environment() -> None:
+    """Charge le fichier .env une seule fois par processus"""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# Poids par défaut des critères (mêmes valeurs que les sliders de l'interface)
+DEFAULT_WEIGHTS = [0.3, 0.25, 0.2, 0.15, 0.1]
+
+# Marqueur remplacé par le nom du modèle quand un prompt est partagé entre modèles
+MODEL_PLACEHOLDER = "{{MODELE_IA}}"
+
+# Budgets par défaut des fournisseurs (requêtes et tokens par minute)
+DEFAULT_RATE_LIMITS = {
+    "Claude-3-Sonnet": {"requests_per_minute": 50, "tokens_per_minute": 80000},
+    "GPT-4": {"requests_per_minute": 500, "tokens_per_minute": 300000}
+}
+
+# Instructions CRAFT communes à toutes les analyses (caractère, rôle, méthode, format de sortie).
+# Ce préfixe ne contient aucune donnée variable : envoyé en message système, il est mis en
+# cache par le fournisseur et seul le court message utilisateur est facturé plein tarif.
+CRAFT_SYSTEM_PROMPT = """# 🧠 **C – CHARACTER (Personnalité & Expertise)**
 Tu es un **Chief Strategic Intelligence Officer** avec 15+ ans d'expérience en intelligence économique. Tu maîtrises :
 - L'analyse prédictive et les signaux faibles
 - La modélisation des risques concurrentiels
@@ -91,11 +76,12 @@ Ton rôle est de **transformer l'information brute en intelligence stratégique
 3. **Détection de signaux** : Tendances émergentes, ruptures, innovations
 
 ## **Phase 2 : Scoring Stratégique (Échelle 0-10)**
-- **Impact Business** : Potentiel de revenus/coûts (Poids: {weights[0]})
-- **Urgence Temporelle** : Fenêtre d'opportunité (Poids: {weights[1]})
-- **Complexité d'Exécution** : Faisabilité organisationnelle (Poids: {weights[2]})
-- **Risque Concurrentiel** : Menace/opportunité vs. compétiteurs (Poids: {weights[3]})
-- **Fiabilité Source** : Crédibilité et fraîcheur des données (Poids: {weights[4]})
+Chaque critère est pondéré selon la pondération fournie avec le contenu :
+- **Impact Business** : Potentiel de revenus/coûts
+- **Urgence Temporelle** : Fenêtre d'opportunité
+- **Complexité d'Exécution** : Faisabilité organisationnelle
+- **Risque Concurrentiel** : Menace/opportunité vs. compétiteurs
+- **Fiabilité Source** : Crédibilité et fraîcheur des données
 
 ## **Phase 3 : Synthèse Décisionnelle**
 - **Matrice de Priorisation** : Urgence vs. Impact
@@ -106,22 +92,14 @@ Ton rôle est de **transformer l'information brute en intelligence stratégique
 
 # 📄 **F – FORMAT (Structure de Sortie Normalisée)**
 
-Analyse le contenu suivant selon le format CRAFT :
-
-**CONTENU À ANALYSER :**
-{content}
-
-**PARAMÈTRES D'ANALYSE :**
-- Domaine de Focus : {focus_area}
-- Niveau d'Urgence : {urgency_level}
-- Taille d'Entreprise : {company_size}
-- Modèle IA : {ai_model}
+Le message de l'utilisateur fournit le contenu à analyser, les paramètres d'analyse
+(domaine de focus, niveau d'urgence, taille d'entreprise, modèle IA, date) et la pondération des critères.
 
 **FORMAT DE SORTIE ATTENDU :**
 
 ```markdown
 # 📈 ANALYSE STRATÉGIQUE - [TITRE ARTICLE]
-**🗓️ Date d'Analyse :** {datetime.now().strftime('%Y-%m-%d %H:%M')} | **🔍 Analyste IA :** {ai_model}
+**🗓️ Date d'Analyse :** [Date d'analyse fournie] | **🔍 Analyste IA :** [Modèle IA fourni]
 
 ## 🎯 SYNTHÈSE EXÉCUTIVE
 [Résumé de 2-3 phrases pour C-level avec impact business immédiat]
@@ -183,43 +161,588 @@ Analyse le contenu suivant selon le format CRAFT :
 
 **IMPORTANT :** 
 - Utilise des scores réalistes et justifiés
-- Adapte l'analyse au contexte {company_size} et {focus_area}
+- Adapte l'analyse à la taille d'entreprise et au domaine de focus fournis
 - Fournis des recommandations actionnables
 - Inclus des métriques quantifiables
 - Identifie clairement les risques et opportunités
 """
-        return prompt
+
+# Bloc système Anthropic marqué comme point de cache du préfixe
+CLAUDE_SYSTEM_BLOCKS = [
+    {"type": "text", "text": CRAFT_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+]
+
+# Préfixes des messages d'erreur renvoyés par analyze_content
+ERROR_PREFIXES = {
+    "Claude-3-Sonnet": "Erreur Claude API",
+    "GPT-4": "Erreur GPT-4 API"
+}
+
+class StrategicAnalyzer:
+    TEMPERATURE = 0.3
+    MAX_TOKENS = 4000
+    
+    def __init__(self, rate_limits: Optional[Dict[str, Dict[str, float]]] = None,
+                 retry_policy: Optional[RetryPolicy] = None, data_manager=None):
+        load_environment()
+        # Stockage des analyses (DataManager) consulté pour réutiliser celles des articles quasi identiques
+        self.data_manager = data_manager
+        self._openai_client = None
+        self._anthropic_client = None
+        self._clients_lock = threading.Lock()
+        self.response_cache = ResponseCache(
+            enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() != "false"
+        )
+        self.rate_limiters = {
+            model: RateLimiter(**limits)
+            for model, limits in (rate_limits or DEFAULT_RATE_LIMITS).items()
+        }
+        # Disjoncteur et nouvelles tentatives par fournisseur (partagés entre threads)
+        self.providers = {
+            model: ProviderClient(model, retry_policy=retry_policy, breaker=CircuitBreaker())
+            for model in ERROR_PREFIXES
+        }
+        self._prompt_usage: Dict[str, Dict[str, int]] = {}
+        self._usage_lock = threading.Lock()
+        # Usage du dernier appel fournisseur de chaque thread, repris par les spans d'instrumentation
+        self._last_usage = threading.local()
+        self.tracer = get_tracer()
+    
+    def setup_clients(self):
+        """Réinitialise les clients API : ils seront recréés (avec les clés courantes) au premier usage"""
+        with self._clients_lock:
+            self._openai_client = None
+            self._anthropic_client = None
+    
+    @property
+    def openai_client(self):
+        """Client OpenAI créé au premier usage de GPT-4 (None sans clé API)"""
+        if self._openai_client is None and os.getenv("OPENAI_API_KEY"):
+            with self._clients_lock:
+                if self._openai_client is None:
+                    try:
+                        import openai
+                        # Les nouvelles tentatives sont gérées par ProviderClient, pas par le SDK
+                        self._openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"),
+                                                            http_client=shared_http_client(),
+                                                            max_retries=0)
+                    except Exception as e:
+                        print(f"Erreur lors de la configuration du client OpenAI: {e}")
+        return self._openai_client
+    
+    @openai_client.setter
+    def openai_client(self, client):
+        self._openai_client = client
+    
+    @property
+    def anthropic_client(self):
+        """Client Anthropic créé au premier usage de Claude (None sans clé API)"""
+        if self._anthropic_client is None and os.getenv("ANTHROPIC_API_KEY"):
+            with self._clients_lock:
+                if self._anthropic_client is None:
+                    try:
+                        import anthropic
+                        self._anthropic_client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"),
+                                                                     http_client=shared_http_client(),
+                                                                     max_retries=0)
+                    except Exception as e:
+                        print(f"Erreur lors de la configuration du client Anthropic: {e}")
+        return self._anthropic_client
+    
+    @anthropic_client.setter
+    def anthropic_client(self, client):
+        self._anthropic_client = client
+    
+    def analyze_content(self, content: str, focus_area: str, urgency_level: str, 
+                       company_size: str, ai_model: str, weights: List[float],
+                       use_cache: bool = True, raise_errors: bool = False,
+                       reuse_duplicates: bool = False) -> str:
+        """
+        Analyse le contenu selon le format CRAFT et retourne une analyse stratégique.
+        use_cache=False force un nouvel appel au fournisseur même si la réponse est en cache.
+        Par défaut une erreur est renvoyée sous forme de message ; avec raise_errors=True,
+        les échecs fournisseur lèvent ProviderError (à ne pas sauvegarder comme une analyse).
+        Avec reuse_duplicates=True, l'analyse enregistrée d'un article quasi identique par
+        le même modèle, avec les mêmes paramètres et pondérations, est renvoyée sans appel
+        au fournisseur (voir find_reusable_analysis).
+        """
+        try:
+            reused = (self.find_reusable_analysis(content, focus_area, urgency_level, company_size,
+                                                  ai_model, weights) if reuse_duplicates else None)
+            if reused is not None:
+                return reused["content"]
+            
+            # Préparation du prompt selon le format CRAFT
+            prompt = self._create_craft_prompt(content, focus_area, urgency_level, 
+                                             company_size, ai_model, weights)
+            
+            try:
+                return self._run_model(prompt, content, focus_area, urgency_level,
+                                       company_size, ai_model, weights, use_cache)
+            except Exception as e:
+                if raise_errors:
+                    raise
+                prefix = ERROR_PREFIXES.get(ai_model, "Erreur lors de l'analyse")
+                return f"{prefix}: {str(e)}"
+        
+        except Exception as e:
+            if raise_errors:
+                raise
+            return f"Erreur lors de l'analyse: {str(e)}"
+    
+    def analyze_content_stream(self, content: str, focus_area: str, urgency_level: str,
+                               company_size: str, ai_model: str, weights: List[float],
+                               use_cache: bool = True, raise_errors: bool = False,
+                               reuse_duplicates: bool = False) -> Iterator[str]:
+        """
+        Variante progressive de analyze_content : produit le texte par fragments
+        au fur et à mesure de la génération par le fournisseur.
+        La concaténation des fragments donne l'analyse complète.
+        """
+        try:
+            reused = (self.find_reusable_analysis(content, focus_area, urgency_level, company_size,
+                                                  ai_model, weights) if reuse_duplicates else None)
+            if reused is not None:
+                yield from reused["content"].splitlines(keepends=True)
+                return
+            
+            prompt = self._create_craft_prompt(content, focus_area, urgency_level,
+                                               company_size, ai_model, weights)
+            
+            if ai_model == "Claude-3-Sonnet" and self.anthropic_client:
+                stream = self._cached_stream(ai_model, prompt, self._stream_claude, use_cache)
+            elif ai_model == "GPT-4" and self.openai_client:
+                stream = self._cached_stream(ai_model, prompt, self._stream_gpt4, use_cache)
+            else:
+                analysis = self._analyze_with_simulation(prompt, content, focus_area,
+                                                         urgency_level, company_size, weights)
+                stream = iter(analysis.splitlines(keepends=True))
+            
+            for delta in stream:
+                yield delta
+        
+        except Exception as e:
+            if raise_errors:
+                raise
+            prefix = ERROR_PREFIXES.get(ai_model, "Erreur lors de l'analyse")
+            yield f"{prefix}: {str(e)}"
+    
+    def analyze_multi(self, content: str, models: List[str], focus_area: str = "Général",
+                      urgency_level: str = "Modéré", company_size: str = "PME",
+                      weights: Optional[List[float]] = None,
+                      max_workers: Optional[int] = None,
+                      use_cache: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyse le même contenu avec plusieurs modèles en parallèle.
+        Le prompt CRAFT est construit une seule fois (seul le nom du modèle varie) ;
+        la durée totale est celle de l'appel le plus lent et non la somme des appels.
+        Retourne, pour chaque modèle, l'analyse, la durée et l'éventuelle erreur.
+        """
+        weights = weights or DEFAULT_WEIGHTS
+        models = list(dict.fromkeys(models))
+        if not models:
+            return {}
+        
+        prompts = self._create_craft_prompts(content, focus_area, urgency_level,
+                                             company_size, models, weights)
+        
+        with ThreadPoolExecutor(max_workers=max_workers or len(models)) as executor:
+            futures = {
+                model: executor.submit(self._timed_run, prompts[model],
+                                       content, focus_area, urgency_level, company_size,
+                                       model, weights, use_cache)
+                for model in models
+            }
+            return {model: future.result() for model, future in futures.items()}
     
-    def _analyze_with_claude(self, prompt: str) -> str:
-        """Analyse avec Claude-3-Sonnet"""
+    async def analyze_multi_async(self, content: str, models: List[str], focus_area: str = "Général",
+                                  urgency_level: str = "Modéré", company_size: str = "PME",
+                                  weights: Optional[List[float]] = None,
+                                  use_cache: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Version asyncio de analyze_multi (les appels bloquants tournent dans l'executor)"""
+        weights = weights or DEFAULT_WEIGHTS
+        models = list(dict.fromkeys(models))
+        prompts = self._create_craft_prompts(content, focus_area, urgency_level,
+                                             company_size, models, weights)
+        
+        loop = asyncio.get_running_loop()
+        tasks = [
+            loop.run_in_executor(None, functools.partial(
+                self._timed_run, prompts[model],
+                content, focus_area, urgency_level, company_size, model, weights, use_cache))
+            for model in models
+        ]
+        results = await asyncio.gather(*tasks)
+        return dict(zip(models, results))
+    
+    def analyze_batch(self, items: List[Union[str, Dict[str, Any]]], concurrency: int = 4,
+                      use_cache: bool = True, reuse_duplicates: bool = False) -> List[Dict[str, Any]]:
+        """
+        Analyse un lot d'articles avec une concurrence bornée.
+        Retourne les résultats dans l'ordre des items ; une erreur sur un item est
+        reportée dans son champ "error" sans interrompre le lot.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        for result in self.iter_batch(items, concurrency, use_cache, reuse_duplicates):
+            results[result["index"]] = result
+        return results
+    
+    def iter_batch(self, items: List[Union[str, Dict[str, Any]]], concurrency: int = 4,
+                   use_cache: bool = True, reuse_duplicates: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Comme analyze_batch, mais produit chaque résultat dès qu'il est disponible.
+        Chaque item est soit le contenu seul, soit un dict d'arguments de analyze_content.
+        Les budgets de débit par fournisseur (rate_limiters) s'appliquent à chaque appel.
+        Avec reuse_duplicates=True, un article quasi identique à un article déjà analysé par
+        le même modèle et avec les mêmes paramètres reprend cette analyse (ID dans le champ
+        "reused_from").
+        """
+        executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+        futures = [executor.submit(self._batch_item, index, item, use_cache, reuse_duplicates)
+                   for index, item in enumerate(items)]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Si le consommateur s'arrête en cours de route, les items restants sont annulés
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+    
+    def _batch_item(self, index: int, item: Union[str, Dict[str, Any]],
+                    use_cache: bool = True, reuse_duplicates: bool = False) -> Dict[str, Any]:
+        """Analyse un item de lot ; les erreurs sont capturées dans le résultat"""
+        if isinstance(item, str):
+            item = {"content": item}
+        
+        ai_model = item.get("ai_model", "Simulation")
+        start = time.perf_counter()
         try:
-            response = self.anthropic_client.messages.create(
-                model="claude-3-sonnet-20240229",
-                max_tokens=4000,
-                temperature=0.3,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            return response.content[0].text
+            content = item["content"]
+            focus_area = item.get("focus_area", "Général")
+            urgency_level = item.get("urgency_level", "Modéré")
+            company_size = item.get("company_size", "PME")
+            weights = item.get("weights") or DEFAULT_WEIGHTS
+            
+            reused = (self.find_reusable_analysis(content, focus_area, urgency_level, company_size,
+                                                  ai_model, weights) if reuse_duplicates else None)
+            if reused is not None:
+                result = {
+                    "model": ai_model,
+                    "analysis": reused["content"],
+                    "duration": time.perf_counter() - start,
+                    "error": None,
+                    "reused_from": reused["id"]
+                }
+            else:
+                prompt = self._create_craft_prompt(content, focus_area, urgency_level,
+                                                   company_size, ai_model, weights)
+                result = self._timed_run(prompt, content, focus_area, urgency_level,
+                                         company_size, ai_model, weights, use_cache)
         except Exception as e:
-            return f"Erreur Claude API: {str(e)}"
+            result = {
+                "model": ai_model,
+                "analysis": "",
+                "duration": time.perf_counter() - start,
+                "error": f"{type(e).__name__}: {e}"
+            }
+        
+        result["index"] = index
+        return result
+    
+    def find_reusable_analysis(self, content: str, focus_area: str, urgency_level: str,
+                               company_size: str, ai_model: str,
+                               weights: List[float]) -> Optional[Dict[str, Any]]:
+        """
+        Analyse enregistrée d'un article quasi identique à content, faite avec le même modèle
+        et les mêmes paramètres (DataManager.find_reusable_analysis) ; None sans data_manager
+        ou sans correspondance.
+        """
+        if self.data_manager is None:
+            return None
+        return self.data_manager.find_reusable_analysis(content, ai_model, focus_area, urgency_level,
+                                                        company_size, weights)
     
-    def _analyze_with_gpt4(self, prompt: str) -> str:
-        """Analyse avec GPT-4"""
+    def _run_model(self, prompt: str, content: str, focus_area: str, urgency_level: str,
+                   company_size: str, ai_model: str, weights: List[float],
+                   use_cache: bool = True) -> str:
+        """
+        Envoie le prompt au modèle sélectionné (simulation si l'API n'est pas configurée).
+        Les erreurs des fournisseurs sont levées sous forme d'exceptions.
+        """
+        if ai_model == "Claude-3-Sonnet" and self.anthropic_client:
+            return self._analyze_with_claude(prompt, use_cache)
+        elif ai_model == "GPT-4" and self.openai_client:
+            return self._analyze_with_gpt4(prompt, use_cache)
+        else:
+            return self._analyze_with_simulation(prompt, content, focus_area, 
+                                               urgency_level, company_size, weights)
+    
+    def _timed_run(self, prompt: str, content: str, focus_area: str, urgency_level: str,
+                   company_size: str, ai_model: str, weights: List[float],
+                   use_cache: bool = True) -> Dict[str, Any]:
+        """Exécute un modèle et mesure sa durée, sans laisser remonter les exceptions"""
+        start = time.perf_counter()
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "Tu es un expert en analyse stratégique et intelligence économique."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=4000,
-                temperature=0.3
-            )
-            return response.choices[0].message.content
+            analysis = self._run_model(prompt, content, focus_area, urgency_level,
+                                       company_size, ai_model, weights, use_cache)
+            error = None
         except Exception as e:
-            return f"Erreur GPT-4 API: {str(e)}"
+            analysis = ""
+            error = str(e)
+        return {
+            "model": ai_model,
+            "analysis": analysis,
+            "duration": time.perf_counter() - start,
+            "error": error
+        }
+    
+    def _create_craft_prompt(self, content: str, focus_area: str, urgency_level: str,
+                           company_size: str, ai_model: str, weights: List[float]) -> str:
+        """
+        Partie variable du prompt CRAFT (contenu, paramètres, pondération, date), envoyée en
+        message utilisateur après les instructions statiques CRAFT_SYSTEM_PROMPT
+        """
+        with self.tracer.span("prompt_build", content_chars=len(content)) as span:
+            prompt = self._format_craft_prompt(content, focus_area, urgency_level,
+                                               company_size, ai_model, weights)
+            span.set(prompt_chars=len(prompt))
+        return prompt
+    
+    def _create_craft_prompts(self, content: str, focus_area: str, urgency_level: str,
+                              company_size: str, models: List[str], weights: List[float]) -> Dict[str, str]:
+        """
+        Prompts CRAFT de plusieurs modèles pour un même contenu. Les paramètres (et la date)
+        sont formatés une seule fois avec MODEL_PLACEHOLDER, remplacé par chaque nom de
+        modèle dans ce seul bloc, avant l'ajout du contenu : un article qui contiendrait
+        le marqueur n'est jamais modifié.
+        """
+        with self.tracer.span("prompt_build", content_chars=len(content)) as span:
+            parameters = self._format_craft_parameters(focus_area, urgency_level, company_size,
+                                                       MODEL_PLACEHOLDER, weights)
+            header = self._format_craft_content(content)
+            prompts = {model: header + parameters.replace(MODEL_PLACEHOLDER, model) for model in models}
+            span.set(prompt_chars=len(header) + len(parameters))
+        return prompts
+    
+    def _format_craft_prompt(self, content: str, focus_area: str, urgency_level: str,
+                             company_size: str, ai_model: str, weights: List[float]) -> str:
+        return (self._format_craft_content(content) +
+                self._format_craft_parameters(focus_area, urgency_level, company_size, ai_model, weights))
+    
+    def _format_craft_content(self, content: str) -> str:
+        return f"""**CONTENU À ANALYSER :**
+{content}
+
+"""
+    
+    def _format_craft_parameters(self, focus_area: str, urgency_level: str, company_size: str,
+                                 ai_model: str, weights: List[float]) -> str:
+        return f"""**PARAMÈTRES D'ANALYSE :**
+- Domaine de Focus : {focus_area}
+- Niveau d'Urgence : {urgency_level}
+- Taille d'Entreprise : {company_size}
+- Modèle IA : {ai_model}
+- Date d'Analyse : {datetime.now().strftime('%Y-%m-%d %H:%M')}
+
+**PONDÉRATION DES CRITÈRES :**
+- Impact Business : {weights[0]}
+- Urgence Temporelle : {weights[1]}
+- Complexité d'Exécution : {weights[2]}
+- Risque Concurrentiel : {weights[3]}
+- Fiabilité Source : {weights[4]}
+"""
+    
+    def _analyze_with_claude(self, prompt: str, use_cache: bool = True) -> str:
+        """Analyse avec Claude-3-Sonnet (lève une exception en cas d'erreur)"""
+        return self._cached_request("Claude-3-Sonnet", prompt, self._request_claude, use_cache)
+    
+    def _analyze_with_gpt4(self, prompt: str, use_cache: bool = True) -> str:
+        """Analyse avec GPT-4 (lève une exception en cas d'erreur)"""
+        return self._cached_request("GPT-4", prompt, self._request_gpt4, use_cache)
+    
+    def _cached_request(self, ai_model: str, prompt: str, request, use_cache: bool = True) -> str:
+        """Appelle le fournisseur seulement si la réponse n'est pas déjà en cache"""
+        with self.tracer.span("provider_call", model=ai_model, cache_hit=False) as span:
+            key = self._cache_key(ai_model, prompt)
+            if use_cache:
+                cached = self.response_cache.get(key)
+                if cached is not None:
+                    span.set(cache_hit=True)
+                    return cached
+            
+            # Un fournisseur dégradé échoue avant d'attendre son budget de débit
+            provider = self.providers.get(ai_model)
+            if provider:
+                provider.check_available()
+            
+            # Seuls les vrais appels consomment le budget de débit du fournisseur
+            limiter = self.rate_limiters.get(ai_model)
+            if limiter:
+                span.set(rate_limit_wait_s=round(limiter.acquire(self._estimate_tokens(prompt)), 3))
+            
+            # Les exceptions remontent : une erreur n'est jamais mise en cache
+            self._last_usage.counts = None
+            result = provider.call(request, prompt) if provider else request(prompt)
+            span.set(estimated_tokens=self._estimate_tokens(prompt), **(self._last_usage.counts or {}))
+            self.response_cache.set(key, result, ai_model, self.TEMPERATURE)
+            return result
+    
+    def _cached_stream(self, ai_model: str, prompt: str, stream_request,
+                       use_cache: bool = True) -> Iterator[str]:
+        """Équivalent progressif de _cached_request : le texte complet est mis en cache à la fin"""
+        key = self._cache_key(ai_model, prompt)
+        if use_cache:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                self.tracer.start_span("provider_stream", model=ai_model, cache_hit=True).finish()
+                yield cached
+                return
+        
+        # Span terminé à la main : un bloc with resterait ouvert pendant les yield
+        span = self.tracer.start_span("provider_stream", model=ai_model, cache_hit=False)
+        try:
+            provider = self.providers.get(ai_model)
+            if provider:
+                provider.check_available()
+            
+            limiter = self.rate_limiters.get(ai_model)
+            if limiter:
+                span.set(rate_limit_wait_s=round(limiter.acquire(self._estimate_tokens(prompt)), 3))
+            
+            chunks = []
+            self._last_usage.counts = None
+            for delta in (provider.stream(stream_request, prompt) if provider else stream_request(prompt)):
+                if not chunks:
+                    # Délai avant le premier fragment : réseau et file d'attente du fournisseur
+                    span.set(ttft_ms=round((time.perf_counter() - span.start) * 1000, 3))
+                chunks.append(delta)
+                yield delta
+        except BaseException as e:
+            # Un flux abandonné par le consommateur (GeneratorExit) n'est pas une erreur
+            span.finish(None if isinstance(e, GeneratorExit) else e)
+            raise
+        
+        span.set(estimated_tokens=self._estimate_tokens(prompt), chunks=len(chunks),
+                 **(self._last_usage.counts or {}))
+        span.finish()
+        # Seule une réponse arrivée jusqu'au bout est mise en cache
+        self.response_cache.set(key, "".join(chunks), ai_model, self.TEMPERATURE)
+    
+    def _cache_key(self, ai_model: str, prompt: str) -> str:
+        """Clé du cache de réponses : une modification des instructions système invalide les entrées"""
+        return self.response_cache.make_key(f"{CRAFT_SYSTEM_PROMPT}\n{prompt}", ai_model, self.TEMPERATURE)
+    
+    def _estimate_tokens(self, prompt: str) -> int:
+        """Estimation grossière des tokens consommés (≈ 4 caractères par token + sortie maximale)"""
+        return (len(CRAFT_SYSTEM_PROMPT) + len(prompt)) // 4 + self.MAX_TOKENS
+    
+    def provider_health(self) -> Dict[str, Dict[str, Any]]:
+        """État du disjoncteur de chaque fournisseur (closed / open / half_open) et derniers échecs"""
+        return {model: provider.health() for model, provider in self.providers.items()}
+    
+    def prompt_usage_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Tokens d'entrée consommés par fournisseur depuis le démarrage : facturés plein tarif,
+        lus depuis le cache de prompt, écrits dans le cache ; et part de l'entrée servie par le cache
+        """
+        with self._usage_lock:
+            stats = {model: dict(usage) for model, usage in self._prompt_usage.items()}
+        for usage in stats.values():
+            total = usage["input_tokens"] + usage["cache_read_input_tokens"] + usage["cache_creation_input_tokens"]
+            usage["cache_hit_rate"] = round(usage["cache_read_input_tokens"] / total, 3) if total else 0.0
+        return stats
+    
+    def _record_usage(self, ai_model: str, usage) -> None:
+        """Cumule l'usage renvoyé par Anthropic (input/cache_*) ou OpenAI (prompt_tokens + cached_tokens)"""
+        if usage is None:
+            return
+        
+        def field(source, name):
+            # Les champs inconnus du SDK (usage en flux, détails du cache) arrivent sous forme de dict
+            value = source.get(name) if isinstance(source, dict) else getattr(source, name, None)
+            return value or 0
+        
+        if field(usage, "prompt_tokens"):
+            cached = field(field(usage, "prompt_tokens_details") or {}, "cached_tokens")
+            counts = {"input_tokens": field(usage, "prompt_tokens") - cached,
+                      "cache_read_input_tokens": cached,
+                      "cache_creation_input_tokens": 0,
+                      "output_tokens": field(usage, "completion_tokens")}
+        else:
+            counts = {key: field(usage, key) for key in ("input_tokens", "cache_read_input_tokens",
+                                                          "cache_creation_input_tokens", "output_tokens")}
+        self._last_usage.counts = counts
+        with self._usage_lock:
+            totals = self._prompt_usage.setdefault(ai_model, dict.fromkeys(["requests", *counts], 0))
+            totals["requests"] += 1
+            for key, value in counts.items():
+                totals[key] += value
+    
+    def _request_claude(self, prompt: str) -> str:
+        """Appel brut à l'API Claude (lève une exception en cas d'erreur)"""
+        # Le préfixe système est mis en cache côté Anthropic (prompt caching)
+        response = self.anthropic_client.beta.prompt_caching.messages.create(
+            model="claude-3-sonnet-20240229",
+            max_tokens=self.MAX_TOKENS,
+            temperature=self.TEMPERATURE,
+            system=CLAUDE_SYSTEM_BLOCKS,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
+        self._record_usage("Claude-3-Sonnet", response.usage)
+        return response.content[0].text
+    
+    def _request_gpt4(self, prompt: str) -> str:
+        """Appel brut à l'API GPT-4 (lève une exception en cas d'erreur)"""
+        # OpenAI met en cache automatiquement les préfixes identiques : le message système vient en premier
+        response = self.openai_client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": CRAFT_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=self.MAX_TOKENS,
+            temperature=self.TEMPERATURE
+        )
+        self._record_usage("GPT-4", response.usage)
+        return response.choices[0].message.content
+    
+    def _stream_claude(self, prompt: str) -> Iterator[str]:
+        """Flux de fragments de texte depuis l'API Claude"""
+        with self.anthropic_client.beta.prompt_caching.messages.stream(
+            model="claude-3-sonnet-20240229",
+            max_tokens=self.MAX_TOKENS,
+            temperature=self.TEMPERATURE,
+            system=CLAUDE_SYSTEM_BLOCKS,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        ) as stream:
+            for text in stream.text_stream:
+                yield text
+            self._record_usage("Claude-3-Sonnet", stream.get_final_message().usage)
+    
+    def _stream_gpt4(self, prompt: str) -> Iterator[str]:
+        """Flux de fragments de texte depuis l'API GPT-4"""
+        stream = self.openai_client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": CRAFT_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=self.MAX_TOKENS,
+            temperature=self.TEMPERATURE,
+            stream=True,
+            # Le dernier fragment porte l'usage (dont les tokens lus depuis le cache)
+            extra_body={"stream_options": {"include_usage": True}}
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if getattr(chunk, "usage", None):
+                self._record_usage("GPT-4", chunk.usage)
     
     def _analyze_with_simulation(self, prompt: str, content: str, focus_area: str,
                                urgency_level: str, company_size: str, weights: List[float]) -> str:
@@ -356,42 +879,5 @@ Impact business estimé avec niveau d'urgence {urgency_level.lower()}.
     
     def extract_metrics_from_analysis(self, analysis: str) -> Dict[str, Any]:
         """Extrait les métriques clés d'une analyse pour le dashboard"""
-        metrics = {
-            "global_score": 0.0,
-            "priority_level": "MODÉRÉ",
-            "impact_score": 0.0,
-            "urgency_score": 0.0,
-            "complexity_score": 0.0,
-            "risk_score": 0.0,
-            "reliability_score": 0.0
-        }
-        
-        try:
-            # Extraction du score global
-            global_score_match = re.search(r'SCORE GLOBAL DE PRIORITÉ :\s*([\d.]+)/10', analysis)
-            if global_score_match:
-                metrics["global_score"] = float(global_score_match.group(1))
-            
-            # Extraction du niveau de priorité
-            priority_match = re.search(r'Niveau :\s*([A-ZÉ]+)', analysis)
-            if priority_match:
-                metrics["priority_level"] = priority_match.group(1)
-            
-            # Extraction des scores individuels
-            score_patterns = {
-                "impact_score": r'Impact Business.*?(\d+(?:\.\d+)?)/10',
-                "urgency_score": r'Urgence Temporelle.*?(\d+(?:\.\d+)?)/10',
-                "complexity_score": r'Complexité Exécution.*?(\d+(?:\.\d+)?)/10',
-                "risk_score": r'Risque Concurrentiel.*?(\d+(?:\.\d+)?)/10',
-                "reliability_score": r'Fiabilité Source.*?(\d+(?:\.\d+)?)/10'
-            }
-            
-            for key, pattern in score_patterns.items():
-                match = re.search(pattern, analysis, re.DOTALL)
-                if match:
-                    metrics[key] = float(match.group(1))
-        
-        except Exception as e:
-            print(f"Erreur lors de l'extraction des métriques: {e}")
-        
-        return metrics 
\ No newline at end of file
+        with self.tracer.span("metrics_extract", analysis_chars=len(analysis)):
+            return parse_metrics(analysis)
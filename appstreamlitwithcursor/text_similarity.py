@@ -0,0 +1,135 @@
+import threading
+from typing import List, Dict, Any, Iterable, Tuple
+
+import numpy as np
+
+from search_index import fold_accents, tokenize
+
+# Sections CRAFT comparées entre modèles (titres de niveau 2, accents retirés)
+COMPARED_SECTIONS = ("synthese", "recommandation")
+
+
+def extract_sections(content: str) -> str:
+    """
+    Texte des sections « SYNTHÈSE EXÉCUTIVE » et « RECOMMANDATIONS STRATÉGIQUES » d'une
+    analyse CRAFT, en un seul passage ligne par ligne (chaîne vide si elles sont absentes).
+    """
+    kept = []
+    inside = False
+    for line in content.splitlines():
+        if line.startswith("## "):
+            title = fold_accents(line)
+            inside = any(section in title for section in COMPARED_SECTIONS)
+            continue
+        if inside:
+            kept.append(line)
+    return "\n".join(kept)
+
+
+class TextSimilarityIndex:
+    """
+    Vecteurs TF-IDF creux des sections de synthèse et de recommandations, un par analyse.
+
+    Les fréquences de termes (mots et paires de mots, hachés dans N_FEATURES colonnes par
+    HashingVectorizer) sont calculées une seule fois par analyse et conservées ; seules les
+    fréquences documentaires sont mises à jour à chaque ajout ou suppression. Les poids IDF,
+    la normalisation L2 et la matrice des cosinus (X · Xᵀ) sont calculés en opérations
+    creuses sur les seules analyses demandées : aucun vocabulaire à réapprendre quand le
+    corpus grandit.
+    """
+
+    N_FEATURES = 2 ** 18
+
+    def __init__(self):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.vectorizer = HashingVectorizer(
+            n_features=self.N_FEATURES, tokenizer=tokenize, preprocessor=None, lowercase=False,
+            token_pattern=None, ngram_range=(1, 2), alternate_sign=False, norm=None
+        )
+        self._rows: Dict[str, Any] = {}
+        self._document_frequency = np.zeros(self.N_FEATURES, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._rows)
+
+    def add_many(self, documents: Iterable[Tuple[str, str]]) -> None:
+        """Vectorise (ou revectorise) des paires (id, contenu de l'analyse) en un seul appel"""
+        documents = list(documents)
+        if not documents:
+            return
+        counts = self.vectorizer.transform([extract_sections(content) for _, content in documents]).tocsr()
+        with self._lock:
+            for i, (doc_id, _) in enumerate(documents):
+                self._remove(doc_id)
+                row = counts[i]
+                self._rows[doc_id] = row
+                self._document_frequency[row.indices] += 1
+
+    def add(self, doc_id: str, content: str) -> None:
+        self.add_many([(doc_id, content)])
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def similarity_matrix(self, doc_ids: List[str]) -> Tuple[List[str], np.ndarray]:
+        """
+        Cosinus TF-IDF entre les analyses doc_ids déjà vectorisées : (ids retenus, matrice).
+        Une analyse sans section comparable a une similarité NaN avec toutes les autres.
+        """
+        from scipy import sparse
+        from sklearn.preprocessing import normalize
+
+        with self._lock:
+            doc_ids = [doc_id for doc_id in doc_ids if doc_id in self._rows]
+            if not doc_ids:
+                return [], np.zeros((0, 0))
+            counts = sparse.vstack([self._rows[doc_id] for doc_id in doc_ids], format="csr")
+            # IDF lissé de scikit-learn : ln((1 + n) / (1 + df)) + 1
+            idf = np.log((1 + len(self._rows)) / (1 + self._document_frequency[counts.indices])) + 1
+
+        weighted = counts.astype(np.float64)
+        weighted.data *= idf
+        weighted = normalize(weighted, norm="l2", copy=False)
+        matrix = (weighted @ weighted.T).toarray()
+        empty = np.diff(counts.indptr) == 0
+        matrix[empty, :] = np.nan
+        matrix[:, empty] = np.nan
+        return doc_ids, matrix
+
+    def _remove(self, doc_id: str) -> None:
+        row = self._rows.pop(doc_id, None)
+        if row is not None:
+            self._document_frequency[row.indices] -= 1
+
+
+def model_agreement(matrix: np.ndarray, models: List[str], articles: List[str]) -> List[Dict[str, Any]]:
+    """
+    Accord textuel par paire de modèles : cosinus moyen entre leurs analyses d'un même
+    article (paires d'analyses de modèles différents), du plus fort au plus faible.
+    """
+    models = np.asarray(models, dtype=object)
+    articles = np.asarray(articles, dtype=object)
+    same_article = articles[:, None] == articles[None, :]
+    upper = np.triu(np.ones(matrix.shape, dtype=bool), k=1)
+
+    unique_models = np.unique(models)
+    rows = []
+    for i, model_a in enumerate(unique_models):
+        for model_b in unique_models[i + 1:]:
+            pair = ((models[:, None] == model_a) & (models[None, :] == model_b) |
+                    (models[:, None] == model_b) & (models[None, :] == model_a))
+            values = matrix[pair & same_article & upper & ~np.isnan(matrix)]
+            if values.size:
+                rows.append({"model_a": model_a, "model_b": model_b,
+                             "similarity": float(values.mean()), "pairs": int(values.size)})
+    return sorted(rows, key=lambda row: -row["similarity"])
@@ -0,0 +1,236 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+# En-tête de chaque fichier : signature, version, capacité (enregistrements), total écrit depuis la création
+_HEADER = struct.Struct("<8sIIQ")
+_MAGIC = b"SICTSv1\0"
+_VERSION = 1
+
+# Échantillon brut : horodatage (s epoch), série, valeur — 20 octets
+RAW_RECORD = struct.Struct("<dId")
+# Agrégat d'un intervalle : début, série, nombre, somme, min, max — 40 octets
+ROLLUP_RECORD = struct.Struct("<dIIddd")
+
+
+class RingFile:
+    """
+    Anneau d'enregistrements de taille fixe dans un fichier projeté en mémoire (mmap).
+    Un ajout écrit un enregistrement et met à jour l'en-tête : O(1) quelle que soit la
+    taille de l'historique ; une fois plein, les plus anciens enregistrements sont écrasés.
+    Les enregistrements sont rangés par horodatage croissant (premier champ).
+    """
+
+    def __init__(self, path: str, record: struct.Struct, capacity: int):
+        self.path = path
+        self.record = record
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, _VERSION, capacity, 0))
+                # Fichier creux : l'espace disque n'est alloué qu'au fil des écritures
+                f.truncate(_HEADER.size + capacity * record.size)
+        self._file = open(path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, version, self.capacity, self.total = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Fichier de séries temporelles invalide: {path}")
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def append(self, values: tuple) -> int:
+        """Ajoute un enregistrement ; retourne son emplacement physique"""
+        slot = self.total % self.capacity
+        self.write(slot, values)
+        self.total += 1
+        _HEADER.pack_into(self._map, 0, _MAGIC, _VERSION, self.capacity, self.total)
+        return slot
+
+    def write(self, slot: int, values: tuple) -> None:
+        self.record.pack_into(self._map, _HEADER.size + slot * self.record.size, *values)
+
+    def read(self, slot: int) -> tuple:
+        return self.record.unpack_from(self._map, _HEADER.size + slot * self.record.size)
+
+    def slot_of(self, index: int) -> int:
+        """Emplacement physique du index-ième enregistrement conservé (0 = le plus ancien)"""
+        return (self.total - len(self) + index) % self.capacity
+
+    def get(self, index: int) -> tuple:
+        return self.read(self.slot_of(index))
+
+    def bisect(self, timestamp: float) -> int:
+        """Index du premier enregistrement d'horodatage >= timestamp (recherche dichotomique)"""
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.get(middle)[0] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def range(self, start: Optional[float], end: Optional[float]) -> Iterator[tuple]:
+        """Enregistrements d'horodatage dans [start, end)"""
+        index = self.bisect(start) if start is not None else 0
+        while index < len(self):
+            values = self.get(index)
+            if end is not None and values[0] >= end:
+                return
+            yield values
+            index += 1
+
+    def oldest(self) -> Optional[float]:
+        return self.get(0)[0] if len(self) else None
+
+    def flush(self) -> None:
+        self._map.flush()
+
+    def close(self) -> None:
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+
+
+class TimeSeriesStore:
+    """
+    Séries temporelles de métriques opérationnelles à coût d'écriture constant.
+
+    Chaque valeur est ajoutée à un anneau d'échantillons bruts et cumulée dans trois
+    anneaux d'agrégats (minute, heure, jour) : l'agrégat de l'intervalle en cours est mis
+    à jour sur place, un nouvel intervalle ajoute un enregistrement. Les échantillons bruts
+    couvrent les dernières heures, les agrégats journaliers plusieurs années. Les requêtes
+    par plage lisent le niveau le plus fin qui couvre encore le début de la plage.
+
+    Un seul processus écrivain est supposé (comme les autres fichiers du répertoire data/).
+    """
+
+    RAW_CAPACITY = 50000
+    ROLLUP_CAPACITIES = {"minute": 100000, "hour": 50000, "day": 20000}
+    TIERS = [("minute", 60), ("hour", 3600), ("day", 86400)]
+    # Enregistrements relus à l'ouverture pour retrouver les intervalles en cours
+    OPEN_BUCKET_SCAN = 4096
+
+    def __init__(self, directory: str, raw_capacity: Optional[int] = None,
+                 rollup_capacities: Optional[Dict[str, int]] = None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._series_path = os.path.join(directory, "series.json")
+        self._series = self._read_series()
+        capacities = dict(self.ROLLUP_CAPACITIES, **(rollup_capacities or {}))
+        self._raw = RingFile(os.path.join(directory, "raw.bin"), RAW_RECORD,
+                             raw_capacity or self.RAW_CAPACITY)
+        self._rollups = {tier: RingFile(os.path.join(directory, f"{tier}.bin"), ROLLUP_RECORD, capacities[tier])
+                         for tier, _ in self.TIERS}
+        self._last_timestamp = self._raw.get(len(self._raw) - 1)[0] if len(self._raw) else 0.0
+        # (niveau, série) -> emplacement de l'agrégat de l'intervalle le plus récent
+        self._open_buckets: Dict[Tuple[str, int], int] = {}
+        for tier, ring in self._rollups.items():
+            for index in range(len(ring) - 1, max(-1, len(ring) - 1 - self.OPEN_BUCKET_SCAN), -1):
+                series_id = ring.get(index)[1]
+                self._open_buckets.setdefault((tier, series_id), ring.slot_of(index))
+
+    def append(self, name: str, value: float, timestamp: Optional[float] = None) -> None:
+        """Ajoute une valeur à la série name (horodatage epoch, maintenant par défaut)"""
+        self.append_many({name: value}, timestamp)
+
+    def append_many(self, values: Dict[str, float], timestamp: Optional[float] = None) -> None:
+        """Ajoute plusieurs séries au même instant ; O(1) par valeur"""
+        with self._lock:
+            # Les anneaux restent triés : un horodatage antérieur au dernier est ramené à celui-ci
+            timestamp = max(time.time() if timestamp is None else timestamp, self._last_timestamp)
+            self._last_timestamp = timestamp
+            for name, value in values.items():
+                series_id = self._series_id(name)
+                value = float(value)
+                self._raw.append((timestamp, series_id, value))
+                for tier, width in self.TIERS:
+                    self._add_to_bucket(tier, timestamp - timestamp % width, series_id, value)
+
+    def _add_to_bucket(self, tier: str, bucket: float, series_id: int, value: float) -> None:
+        ring = self._rollups[tier]
+        slot = self._open_buckets.get((tier, series_id))
+        if slot is not None:
+            start, stored_id, count, total, low, high = ring.read(slot)
+            # L'emplacement peut avoir été réutilisé si l'anneau a fait le tour
+            if start == bucket and stored_id == series_id:
+                ring.write(slot, (start, series_id, count + 1, total + value, min(low, value), max(high, value)))
+                return
+        self._open_buckets[(tier, series_id)] = ring.append((bucket, series_id, 1, value, value, value))
+
+    def query(self, name: str, start: Optional[float] = None, end: Optional[float] = None,
+              resolution: str = "auto") -> List[Dict[str, Any]]:
+        """
+        Points de la série name dans [start, end) : {"timestamp", "count", "sum", "min", "max", "mean"}.
+        resolution : "raw", "minute", "hour", "day" ou "auto" (niveau le plus fin couvrant start).
+        """
+        with self._lock:
+            series_id = self._series.get(name)
+            if series_id is None:
+                return []
+            if resolution == "auto":
+                resolution = self._auto_resolution(start)
+            if resolution == "raw":
+                return [{"timestamp": ts, "count": 1, "sum": value, "min": value, "max": value, "mean": value}
+                        for ts, sid, value in self._raw.range(start, end) if sid == series_id]
+            if resolution not in self._rollups:
+                raise ValueError(f"Résolution inconnue: {resolution}")
+            # Le début est aligné sur l'intervalle qui le contient
+            width = dict(self.TIERS)[resolution]
+            aligned = start - start % width if start is not None else None
+            return [{"timestamp": ts, "count": count, "sum": total, "min": low, "max": high,
+                     "mean": total / count}
+                    for ts, sid, count, total, low, high in self._rollups[resolution].range(aligned, end)
+                    if sid == series_id]
+
+    def latest(self, limit: int) -> List[Tuple[float, str, float]]:
+        """Derniers échantillons bruts (horodatage, série, valeur), du plus ancien au plus récent"""
+        with self._lock:
+            names = {series_id: name for name, series_id in self._series.items()}
+            count = min(limit, len(self._raw))
+            return [(ts, names.get(sid, str(sid)), value)
+                    for ts, sid, value in (self._raw.get(i) for i in range(len(self._raw) - count, len(self._raw)))]
+
+    def series(self) -> List[str]:
+        with self._lock:
+            return sorted(self._series)
+
+    def flush(self) -> None:
+        """Force l'écriture sur disque (sinon assurée par le système, même si le processus s'arrête)"""
+        with self._lock:
+            for ring in [self._raw, *self._rollups.values()]:
+                ring.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            for ring in [self._raw, *self._rollups.values()]:
+                ring.close()
+
+    def _auto_resolution(self, start: Optional[float]) -> str:
+        """Niveau le plus fin qui n'a rien perdu depuis start (ou depuis le début si start est None)"""
+        for level, ring in [("raw", self._raw)] + list(self._rollups.items()):
+            complete = ring.total <= ring.capacity
+            if complete or (start is not None and ring.oldest() <= start):
+                return level
+        return "day"
+
+    def _series_id(self, name: str) -> int:
+        series_id = self._series.get(name)
+        if series_id is None:
+            series_id = self._series[name] = len(self._series)
+            tmp_path = f"{self._series_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._series, f, ensure_ascii=False)
+            os.replace(tmp_path, self._series_path)
+        return series_id
+
+    def _read_series(self) -> Dict[str, int]:
+        if not os.path.exists(self._series_path):
+            return {}
+        with open(self._series_path, "r", encoding="utf-8") as f:
+            return json.load(f)
@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+# Bornes (secondes) des histogrammes de durée exportés au format Prometheus
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Attributs numériques cumulés par étape (tokens) et exportés comme compteurs
+TOKEN_ATTRIBUTES = ("input_tokens", "cache_read_input_tokens", "cache_creation_input_tokens",
+                    "output_tokens", "estimated_tokens")
+
+
+class Span:
+    """Mesure d'une étape du pipeline : nom, durée, attributs (tokens, cache, modèle...)"""
+
+    __slots__ = ("tracer", "name", "attributes", "start", "duration", "error")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.start = 0.0
+        self.duration = 0.0
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def mark_error(self, exc: BaseException) -> None:
+        """Erreur capturée par l'étape elle-même (sans exception propagée hors du bloc)"""
+        self.error = type(exc).__name__
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.finish(exc)
+        return False
+
+    def finish(self, exc: Optional[BaseException] = None) -> None:
+        self.duration = time.perf_counter() - self.start
+        if exc is not None:
+            self.error = type(exc).__name__
+        self.tracer._record(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "duration_ms": round(self.duration * 1000, 3),
+                "error": self.error, **self.attributes}
+
+
+class _NoopSpan:
+    """Span renvoyé quand l'instrumentation est désactivée : aucune mesure, aucune allocation"""
+
+    __slots__ = ()
+    start = 0.0
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def mark_error(self, exc: BaseException) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def finish(self, exc: Optional[BaseException] = None) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Instrumentation optionnelle des étapes d'une analyse (prompt, appel fournisseur,
+    extraction des métriques, sauvegarde). Désactivée, span() renvoie un objet inerte partagé.
+    Activée, chaque span alimente un histogramme de durée et des compteurs de tokens et de
+    hits de cache par étape, et les derniers spans sont conservés pour le diagnostic.
+    """
+
+    def __init__(self, enabled: bool = False, max_spans: int = 1000):
+        self.enabled = enabled
+        self._recent: deque = deque(maxlen=max_spans)
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **attributes):
+        """Contexte mesurant une étape ; attributs complétables en cours de route via span.set()"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def start_span(self, name: str, **attributes):
+        """Span démarré sans bloc with (flux) : à terminer par span.finish()"""
+        return self.span(name, **attributes).__enter__()
+
+    def _record(self, span: Span) -> None:
+        with self._lock:
+            self._recent.append(span)
+            stage = self._stages.get(span.name)
+            if stage is None:
+                stage = self._stages[span.name] = {
+                    "count": 0, "errors": 0, "sum": 0.0, "cache_hits": 0,
+                    "buckets": [0] * len(DURATION_BUCKETS), "tokens": dict.fromkeys(TOKEN_ATTRIBUTES, 0),
+                }
+            stage["count"] += 1
+            stage["sum"] += span.duration
+            stage["errors"] += span.error is not None
+            stage["cache_hits"] += bool(span.attributes.get("cache_hit"))
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if span.duration <= bound:
+                    stage["buckets"][i] += 1
+            for key in TOKEN_ATTRIBUTES:
+                stage["tokens"][key] += span.attributes.get(key) or 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self._stages.clear()
+
+    def recent_spans(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Derniers spans terminés, du plus ancien au plus récent"""
+        with self._lock:
+            spans = list(self._recent)
+        return [span.to_dict() for span in spans[-limit if limit else 0:]]
+
+    def stage_summary(self) -> List[Dict[str, Any]]:
+        """Par étape : nombre, durée moyenne, p50/p95 (sur les spans récents), tokens et hits de cache"""
+        with self._lock:
+            stages = {name: dict(stage, tokens=dict(stage["tokens"])) for name, stage in self._stages.items()}
+            durations: Dict[str, List[float]] = {}
+            for span in self._recent:
+                durations.setdefault(span.name, []).append(span.duration)
+
+        summary = []
+        for name, stage in stages.items():
+            recent = sorted(durations.get(name, []))
+            summary.append({
+                "stage": name,
+                "count": stage["count"],
+                "errors": stage["errors"],
+                "mean_ms": round(stage["sum"] / stage["count"] * 1000, 3),
+                "p50_ms": round(recent[len(recent) // 2] * 1000, 3) if recent else None,
+                "p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000, 3) if recent else None,
+                "cache_hits": stage["cache_hits"],
+                **{key: value for key, value in stage["tokens"].items() if value},
+            })
+        return summary
+
+    def to_prometheus(self) -> str:
+        """Exposition au format texte Prometheus (histogrammes de durée et compteurs par étape)"""
+        with self._lock:
+            stages = sorted((name, dict(stage, tokens=dict(stage["tokens"]), buckets=list(stage["buckets"])))
+                            for name, stage in self._stages.items())
+
+        lines = ["# HELP analysis_stage_duration_seconds Durée des étapes du pipeline d'analyse",
+                 "# TYPE analysis_stage_duration_seconds histogram"]
+        for name, stage in stages:
+            for bound, count in zip(DURATION_BUCKETS, stage["buckets"]):
+                lines.append(f'analysis_stage_duration_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+            lines.append(f'analysis_stage_duration_seconds_bucket{{stage="{name}",le="+Inf"}} {stage["count"]}')
+            lines.append(f'analysis_stage_duration_seconds_sum{{stage="{name}"}} {stage["sum"]:.6f}')
+            lines.append(f'analysis_stage_duration_seconds_count{{stage="{name}"}} {stage["count"]}')
+
+        counters: List[Tuple[str, str, str]] = [
+            ("analysis_stage_errors_total", "Étapes terminées en erreur", "errors"),
+            ("analysis_stage_cache_hits_total", "Étapes servies par le cache de réponses", "cache_hits"),
+        ]
+        for metric, help_text, key in counters:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{stage="{name}"}} {stage[key]}' for name, stage in stages]
+
+        lines += ["# HELP analysis_stage_tokens_total Tokens par étape et par nature",
+                  "# TYPE analysis_stage_tokens_total counter"]
+        for name, stage in stages:
+            lines += [f'analysis_stage_tokens_total{{stage="{name}",kind="{kind}"}} {value}'
+                      for kind, value in stage["tokens"].items() if value]
+        return "\n".join(lines) + "\n"
+
+    def to_jsonl(self) -> str:
+        """Derniers spans, un objet JSON par ligne"""
+        return "".join(json.dumps(span, ensure_ascii=False) + "\n" for span in self.recent_spans())
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Instrumentation du processus, activée au démarrage si TRACING_ENABLED=true"""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer(enabled=os.getenv("TRACING_ENABLED", "false").lower() == "true")
+    return _tracer